@@ -0,0 +1,134 @@
+### 종료된 대회 보관 (Parquet 아카이브)
+
+# 끝난 대회의 매치를 matches 테이블에서 빼서 대회별 Parquet 파일로 옮긴다.
+# 라이브 DB 는 작게 유지하고, 지난 시즌 조회는 아카이브 파일만 읽는다.
+
+import os
+import re
+import live_score
+import match_store
+import shards
+import storage
+
+# pandas/pyarrow 는 보관하거나 읽을 때만 import (관리자 페이지 첫 로딩을 가볍게)
+
+# 데이터베이스 설정
+DB_FOLDER = "db"
+DB_FILE = "db.sqlite"
+DB_PATH = os.path.join(DB_FOLDER, DB_FILE)
+
+# 아카이브 설정
+ARCHIVE_FOLDER = os.path.join(DB_FOLDER, "archive")
+
+# 반복되는 값이 많은 컬럼은 category 로 저장 (Parquet 사전 인코딩)
+CATEGORY_COLUMNS = [
+    "tournament_title",
+    "place",
+    "court",
+    "round_type",
+    "gender",
+    "match_type",
+    "status",
+]
+
+
+def archive_path(tournament_title):
+    file_name = re.sub(r'[\\/:*?"<>|]', "_", tournament_title)
+    return os.path.join(ARCHIVE_FOLDER, f"{file_name}.parquet")
+
+
+def list_archived_tournaments():
+    if not os.path.exists(ARCHIVE_FOLDER):
+        return []
+    return sorted(
+        os.path.splitext(name)[0]
+        for name in os.listdir(ARCHIVE_FOLDER)
+        if name.endswith(".parquet")
+    )
+
+
+# 대기 중인 매치가 없는 대회만 보관 가능
+def get_archivable_tournaments():
+    query = """SELECT tournament_title
+               FROM matches
+               GROUP BY tournament_title
+               HAVING SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) = 0"""
+    # 샤딩 중이면 대회마다 파일이 다르므로 대회 샤드를 모두 조회
+    if shards.enabled():
+        rows = shards.fan_out(query, paths=shards.all_paths(match_store.OFFICIAL))
+        return [row[0] for row in rows]
+    conn = storage.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute(query)
+    titles = [row[0] for row in c.fetchall()]
+    conn.close()
+    return titles
+
+
+def archive_tournament(tournament_title):
+    if not os.path.exists(ARCHIVE_FOLDER):
+        os.makedirs(ARCHIVE_FOLDER)
+    live_score.init_db()
+    import pandas as pd
+
+    conn = storage.connect(
+        match_store.event_db_path(match_store.OFFICIAL, tournament_title)
+    )
+    c = conn.cursor()
+    # 보관하는 동안 다른 쓰기가 끼어들지 않도록 잠금
+    c.execute("BEGIN IMMEDIATE")
+    try:
+        df = storage.read_frame(
+            "SELECT * FROM matches WHERE tournament_title = ? ORDER BY id",
+            (tournament_title,),
+            conn=conn,
+        )
+        if df.empty:
+            conn.rollback()
+            return 0
+        if (df["status"] == "pending").any():
+            raise ValueError("대기 중인 매치가 있는 대회는 보관할 수 없습니다.")
+
+        match_ids = df["id"].tolist()
+        path = archive_path(tournament_title)
+        # 이미 보관된 대회면 기존 아카이브 뒤에 이어 붙임
+        if os.path.exists(path):
+            df = pd.concat([load_archive(tournament_title), df], ignore_index=True)
+
+        for column in CATEGORY_COLUMNS:
+            df[column] = df[column].astype("category")
+
+        # 임시 파일에 쓴 뒤 교체해서 중간에 실패해도 기존 아카이브가 깨지지 않게 함
+        tmp_path = path + ".tmp"
+        df.to_parquet(tmp_path, engine="pyarrow", index=False)
+        os.replace(tmp_path, path)
+
+        c.execute(
+            """DELETE FROM match_store
+                     WHERE event_type = 'official' AND event_name = ?""",
+            (tournament_title,),
+        )
+        c.executemany(
+            "DELETE FROM score_events WHERE match_id = ?",
+            [(match_id,) for match_id in match_ids],
+        )
+        c.executemany(
+            "DELETE FROM score_snapshots WHERE match_id = ?",
+            [(match_id,) for match_id in match_ids],
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return len(match_ids)
+
+
+# 아카이브 읽기 (memory-map 으로 필요한 페이지만 읽음)
+def load_archive(tournament_title):
+    import pandas as pd
+
+    return pd.read_parquet(
+        archive_path(tournament_title), engine="pyarrow", memory_map=True
+    )
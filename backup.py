@@ -0,0 +1,282 @@
+### 데이터베이스 백업 / 복원
+
+# sqlite3.Connection.backup 으로 페이지 단위로 나눠서 복사하므로
+# 백업 중에도 코트 페이지의 쓰기가 오래 막히지 않는다.
+# 원본 연결에서 읽기 트랜잭션을 잡고 복사하기 때문에 (WAL 모드)
+# 중간에 다른 쓰기가 있어도 백업이 처음부터 다시 시작되지 않고
+# 백업 시작 시점의 일관된 스냅샷이 저장된다.
+#
+# 샤딩 중에는 카탈로그와 모든 샤드 파일을 db-...-<reason>.shards/ 폴더에 함께 백업하고,
+# 복원도 기존 DB + 카탈로그 + 샤드를 한 묶음으로 되돌린다.
+
+import logging
+import sqlite3
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+import pytz
+import shards
+import storage
+
+# 데이터베이스 설정
+DB_FOLDER = "db"
+DB_FILE = "db.sqlite"
+DB_PATH = os.path.join(DB_FOLDER, DB_FILE)
+
+# 백업 설정 (샤딩 중이면 카탈로그와 샤드도 백업 폴더에 함께 복사)
+CATALOG_FILE = os.path.basename(shards.CATALOG_PATH)
+BACKUP_FOLDER = os.path.join(DB_FOLDER, "backups")
+PAGES_PER_STEP = 256  # 한 번에 복사할 페이지 수
+STEP_SLEEP = 0.005  # 단계 사이 쉬는 시간 (초)
+SCHEDULE_INTERVAL = 10 * 60  # 정기 백업 간격 (초)
+KEEP_SCHEDULED = 24  # 보관할 정기 백업 수
+KEEP_OTHER = 20  # 보관할 수동/삭제 전 백업 수
+
+# 서울 시간대 설정
+seoul_tz = pytz.timezone("Asia/Seoul")
+
+logger = logging.getLogger(__name__)
+
+_scheduler_lock = threading.Lock()
+_scheduler_started = False
+
+
+def backup_name(reason):
+    stamp = datetime.now(seoul_tz).strftime("%Y%m%d-%H%M%S-%f")
+    return f"db-{stamp}-{reason}.sqlite"
+
+
+# 백업에 함께 들어가는 카탈로그 / 샤드 파일 폴더 (db-...-<reason>.shards)
+def shard_folder(path):
+    return path[: -len(".sqlite")] + ".shards"
+
+
+# 카탈로그와 거기 기록된 샤드 파일 [(원본 경로, 백업 폴더 안의 상대 경로)]
+def shard_files(catalog):
+    files = [(shards.CATALOG_PATH, CATALOG_FILE)]
+    for (shard_id,) in catalog.execute("SELECT id FROM shards ORDER BY id"):
+        path = shards.shard_file(shard_id)
+        if os.path.exists(path):
+            files.append((path, os.path.join("shards", os.path.basename(path))))
+    return files
+
+
+# 백업 폴더 안의 파일 (상대 경로 목록)
+def backed_up_shard_files(folder):
+    if not os.path.exists(folder):
+        return []
+    files = []
+    for root, _, names in os.walk(folder):
+        for name in names:
+            if name.endswith(".sqlite"):
+                files.append(os.path.relpath(os.path.join(root, name), folder))
+    return sorted(files)
+
+
+def list_backups():
+    if not os.path.exists(BACKUP_FOLDER):
+        return []
+    backups = []
+    for name in os.listdir(BACKUP_FOLDER):
+        if not (name.startswith("db-") and name.endswith(".sqlite")):
+            continue
+        path = os.path.join(BACKUP_FOLDER, name)
+        folder = shard_folder(path)
+        shard_paths = [
+            os.path.join(folder, file) for file in backed_up_shard_files(folder)
+        ]
+        # db-YYYYmmdd-HHMMSS-ffffff-<reason>.sqlite
+        reason = name[: -len(".sqlite")].split("-", 4)[-1]
+        backups.append(
+            {
+                "name": name,
+                "path": path,
+                "reason": reason,
+                "created_at": os.path.getmtime(path),
+                "size": os.path.getsize(path)
+                + sum(os.path.getsize(p) for p in shard_paths),
+                # 카탈로그를 뺀 샤드 파일 수
+                "shards": max(len(shard_paths) - 1, 0),
+            }
+        )
+    return sorted(backups, key=lambda backup: backup["name"], reverse=True)
+
+
+# 오래된 백업 정리 (정기 백업과 나머지를 따로 센다)
+def rotate_backups():
+    scheduled = 0
+    other = 0
+    removed = []
+    for backup in list_backups():
+        if backup["reason"] == "scheduled":
+            scheduled += 1
+            keep = scheduled <= KEEP_SCHEDULED
+        else:
+            other += 1
+            keep = other <= KEEP_OTHER
+        if not keep:
+            os.remove(backup["path"])
+            shutil.rmtree(shard_folder(backup["path"]), ignore_errors=True)
+            removed.append(backup["name"])
+    return removed
+
+
+# 읽기 트랜잭션을 먼저 잡아서 백업 전체가 같은 스냅샷을 보도록 함
+def _begin_snapshot(source):
+    source.execute("BEGIN")
+    source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+
+
+def _copy(source, target, pages, sleep):
+    # 단계마다 잠깐 쉬어서 다른 연결의 쓰기가 끼어들 틈을 줌
+    # (backup 의 sleep 인자는 BUSY/LOCKED 일 때만 적용되므로 progress 에서 쉰다)
+    def progress(status, remaining, total):
+        if remaining and sleep:
+            time.sleep(sleep)
+
+    try:
+        source.backup(target, pages=pages, progress=progress)
+    finally:
+        source.execute("COMMIT")
+
+
+def create_backup(
+    reason="manual", pages=PAGES_PER_STEP, sleep=STEP_SLEEP, rotate=True
+):
+    if not os.path.exists(DB_PATH):
+        return None
+    if not os.path.exists(BACKUP_FOLDER):
+        os.makedirs(BACKUP_FOLDER)
+
+    name = backup_name(reason)
+    path = os.path.join(BACKUP_FOLDER, name)
+    folder = shard_folder(path)
+    tmp_path = path + ".tmp"
+    tmp_folder = folder + ".tmp"
+
+    # [(원본 연결, 백업 파일)]. 샤딩 중이면 카탈로그 쓰기 잠금을 잡은 채로 모든 파일의
+    # 읽기 트랜잭션을 시작하고 카탈로그를 복사해서, 샤드를 만드는 중
+    # (기존 DB -> 샤드로 옮기는 중)의 상태가 섞이지 않게 함
+    copies = []
+    lock = None
+    try:
+        files = [(DB_PATH, tmp_path)]
+        if os.path.exists(shards.CATALOG_PATH):
+            lock = sqlite3.connect(
+                shards.CATALOG_PATH, timeout=30, isolation_level=None
+            )
+            lock.execute("BEGIN IMMEDIATE")
+            files = [
+                (source, os.path.join(tmp_folder, target))
+                for source, target in shard_files(lock)
+            ] + files
+        for source_path, target_path in files:
+            source = sqlite3.connect(source_path, isolation_level=None)
+            copies.append((source, target_path))
+            _begin_snapshot(source)
+        for i, (source, target_path) in enumerate(copies):
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            target = sqlite3.connect(target_path)
+            try:
+                _copy(source, target, pages, sleep)
+            finally:
+                target.close()
+            # 카탈로그(첫 번째)를 복사한 뒤에는 샤드를 새로 만들어도 됨
+            if i == 0 and lock is not None:
+                lock.execute("ROLLBACK")
+    finally:
+        for source, _ in copies:
+            source.close()
+        if lock is not None:
+            lock.close()
+    if os.path.exists(tmp_folder):
+        os.replace(tmp_folder, folder)
+    os.replace(tmp_path, path)
+    if rotate:
+        rotate_backups()
+    return name
+
+
+# 백업 파일 하나를 라이브 파일로 복사 (한 번에 복사해서 중간 상태가 보이지 않게 함)
+def _restore_file(path, live_path):
+    folder = os.path.dirname(live_path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    source = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    target = sqlite3.connect(live_path, timeout=30)
+    try:
+        source.backup(target, pages=-1)
+    finally:
+        target.close()
+        source.close()
+
+
+def _remove_db_file(path):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+# 백업 파일을 라이브 DB 로 복원 (복원 직전 상태도 백업해 둠)
+def restore_backup(name):
+    path = os.path.join(BACKUP_FOLDER, os.path.basename(name))
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    # 정리(rotate)로 복원할 파일이 지워지지 않도록 복원이 끝난 뒤에 정리
+    create_backup("before-restore", rotate=False)
+
+    # 열려 있는 샤드 연결과 이름 -> 번호 캐시를 비움 (카탈로그가 바뀜)
+    shards.reset()
+    folder = shard_folder(path)
+    backed_up = backed_up_shard_files(folder)
+    live = {}
+    if os.path.exists(shards.CATALOG_PATH):
+        catalog = shards.connect_catalog()
+        live = {target: source for source, target in shard_files(catalog)}
+        catalog.close()
+    _restore_file(path, DB_PATH)
+    for file in backed_up:
+        _restore_file(
+            os.path.join(folder, file), os.path.join(shards.DB_FOLDER, file)
+        )
+    # 백업 뒤에 생긴 샤드(와 카탈로그)는 그 시점에 없던 데이터이므로 지움
+    # (복원 직전 백업에는 들어 있음)
+    for file, live_path in live.items():
+        if file not in backed_up:
+            _remove_db_file(live_path)
+    shards.reset()
+    rotate_backups()
+
+
+def latest_backup_time(reason="scheduled"):
+    times = [b["created_at"] for b in list_backups() if b["reason"] == reason]
+    return max(times, default=0)
+
+
+def _run_scheduler(interval):
+    while True:
+        try:
+            if time.time() - latest_backup_time() >= interval:
+                create_backup("scheduled")
+        except Exception:
+            logger.exception("정기 백업 실패")
+        time.sleep(min(interval, 60))
+
+
+# 정기 백업 스레드 시작 (프로세스당 한 번)
+# SQLite 백업 API 를 쓰므로 PostgreSQL 저장소에서는 시작하지 않음 (pg_dump 등 서버 백업)
+def start_scheduler(interval=SCHEDULE_INTERVAL):
+    global _scheduler_started
+    if storage.backend() != storage.SQLITE:
+        return False
+    with _scheduler_lock:
+        if _scheduler_started:
+            return False
+        thread = threading.Thread(
+            target=_run_scheduler, args=(interval,), name="db-backup", daemon=True
+        )
+        thread.start()
+        _scheduler_started = True
+        return True
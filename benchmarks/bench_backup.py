@@ -0,0 +1,92 @@
+### 백업 중 쓰기 지연 벤치마크
+# 큰 DB 를 백업하는 동안 다른 스레드가 코트 페이지처럼 계속 매치를 기록하고,
+# 쓰기 한 건이 얼마나 오래 멈추는지(최대 지연)를 백업 방식별로 비교한다.
+#
+# 실행: python benchmarks/bench_backup.py --rows 500000
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backup  # noqa: E402
+import match_store  # noqa: E402
+
+
+def fill(rows):
+    conn = sqlite3.connect(match_store.DB_PATH)
+    conn.execute("PRAGMA synchronous = OFF")
+    now = int(time.time())
+    conn.executemany(
+        """INSERT INTO match_store (event_type, event_name, place, court, round_type,
+                 gender, match_type, player1, player2, score1, score2, status, created_at)
+                 VALUES ('official', '벤치마크 대회', '중화', ?, '예선', '남', '새내기',
+                         ?, ?, 21, ?, 'finished', ?)""",
+        (
+            ("ABC"[i % 3], f"선수{i}", f"선수{i + 1}", i % 20, now - i)
+            for i in range(rows)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def writer(stop, latencies):
+    while not stop.is_set():
+        start = time.perf_counter()
+        match_store.register_match(
+            match_store.OFFICIAL, "벤치마크 대회", "김", "이", "중화", "A"
+        )
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.01)
+
+
+def measure(label, pages, sleep):
+    stop = threading.Event()
+    latencies = []
+    thread = threading.Thread(target=writer, args=(stop, latencies))
+    thread.start()
+    time.sleep(0.2)
+
+    start = time.perf_counter()
+    backup.create_backup(f"bench{pages}", pages=pages, sleep=sleep)
+    elapsed = time.perf_counter() - start
+
+    time.sleep(0.2)
+    stop.set()
+    thread.join()
+    ms = sorted(latency * 1000 for latency in latencies)
+    print(
+        f"{label:<24} 백업 {elapsed:6.2f}s | 쓰기 {len(ms):4}건 "
+        f"p50={ms[len(ms) // 2]:.2f}ms max={ms[-1]:.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for module in (match_store, backup):
+            module.DB_FOLDER = tmp
+            module.DB_PATH = os.path.join(tmp, "bench.sqlite")
+        backup.BACKUP_FOLDER = os.path.join(tmp, "backups")
+
+        match_store.init_db()
+        fill(args.rows)
+        size = os.path.getsize(match_store.DB_PATH) / 1024 / 1024
+        print(f"매치 {args.rows}건, DB {size:.1f}MB")
+
+        measure("한 번에 복사", -1, 0)
+        measure("256 페이지씩", 256, backup.STEP_SLEEP)
+        measure("1024 페이지씩", 1024, backup.STEP_SLEEP)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+### 변경 기록 오버헤드 벤치마크
+# update_match / input_result 한 건에 변경 기록이 더하는 시간을 잰다.
+# 같은 쓰기를 change_log.record 를 끈 상태와 켠 상태로 반복해서 비교한다.
+#
+# 실행: python benchmarks/bench_change_log.py --writes 2000
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import change_log  # noqa: E402
+import match_store  # noqa: E402
+
+
+def run(writes):
+    match_ids = [
+        match_store.register_match(
+            match_store.OFFICIAL, "벤치마크", f"선수{i}", f"선수{i + 1}", "중화", "A"
+        )
+        for i in range(writes)
+    ]
+    start = time.perf_counter()
+    for i, match_id in enumerate(match_ids):
+        match_store.update_match(match_id, player1=f"수정{i}")
+        match_store.input_result(match_id, 21, i % 20)
+    return (time.perf_counter() - start) / (writes * 2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writes", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for module in (match_store, change_log):
+            module.DB_FOLDER = tmp
+            module.DB_PATH = os.path.join(tmp, "bench.sqlite")
+        match_store.init_db()
+
+        record = change_log.record
+        change_log.record = lambda *args, **kwargs: False
+        without_log = run(args.writes)
+        change_log.record = record
+        with_log = run(args.writes)
+
+        print(f"쓰기 {args.writes * 2}건")
+        print(f"기록 없음  {without_log * 1000:.3f}ms/건")
+        print(f"기록 있음  {with_log * 1000:.3f}ms/건")
+        print(f"오버헤드   {(with_log - without_log) * 1000:.3f}ms/건")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+### 페이지별 콜드 스타트 벤치마크 / import 시간 분석
+# 페이지마다 서버를 새로 띄워서 첫 접속(콜드)과 두 번째 접속(웜)의 렌더링 시간을 잰다.
+# --profile 을 주면 각 페이지를 bare 모드로 실행하면서 python -X importtime 결과를
+# 최상위 모듈별로 묶어 오래 걸린 순으로 보여 주고, pandas 등 무거운 모듈이
+# 실제로 로드됐는지도 함께 표시한다.
+#
+# 실행: python benchmarks/bench_cold_start.py --config config.yaml --matches 50 --profile
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import match_store  # noqa: E402
+from bench_session_memory import fill, open_session, start_server  # noqa: E402
+
+HEAVY_MODULES = ("pandas", "pyarrow", "numpy", "plotly")
+
+PROFILE_CODE = """
+import json, runpy, sys
+sys.path.insert(0, {root!r})
+runpy.run_path({page!r}, run_name="__main__")
+print(json.dumps([m for m in {heavy!r} if m in sys.modules]))
+"""
+
+
+def pages():
+    return [os.path.join(ROOT, "🏠홈.py")] + sorted(
+        glob.glob(os.path.join(ROOT, "pages", "*.py"))
+    )
+
+
+async def render_times(port, page):
+    times = []
+    for _ in range(2):
+        start = time.perf_counter()
+        (await open_session(port, page)).close()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def measure(cwd, page, port):
+    start = time.perf_counter()
+    server = start_server(cwd, port)
+    ready = time.perf_counter() - start
+    try:
+        cold, warm = asyncio.run(render_times(port, page))
+    finally:
+        server.terminate()
+        server.wait()
+    return ready, cold, warm
+
+
+# bare 모드 실행의 import 시간 (최상위 모듈별 누적 시간, 로드된 무거운 모듈)
+def import_profile(cwd, page):
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            PROFILE_CODE.format(root=ROOT, page=page, heavy=HEAVY_MODULES),
+        ],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+    )
+    totals = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # 들여쓰기가 없는 줄이 최상위 import
+        if name.startswith(" ") and not name.startswith("  "):
+            totals.append((int(cumulative) / 1000, name.strip()))
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return sorted(totals, reverse=True), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default=os.path.join(ROOT, "config.yaml"))
+    parser.add_argument("--matches", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8598)
+    parser.add_argument("--profile", action="store_true")
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    with open(args.config) as file:
+        title = yaml.safe_load(file)["tournament_titles"][0]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copy(args.config, os.path.join(tmp, "config.yaml"))
+        match_store.DB_FOLDER = os.path.join(tmp, "db")
+        match_store.DB_PATH = os.path.join(match_store.DB_FOLDER, "db.sqlite")
+        os.makedirs(match_store.DB_FOLDER)
+        match_store.init_db()
+        fill(title, args.matches)
+
+        print(f"{'페이지':<20} {'서버 시작':>9} {'첫 렌더링':>9} {'두 번째':>9}")
+        for page in pages():
+            name = os.path.basename(page)[: -len(".py")]
+            ready, cold, warm = measure(tmp, page, args.port)
+            print(
+                f"{name:<20} {ready * 1000:7.0f}ms {cold * 1000:7.0f}ms "
+                f"{warm * 1000:7.0f}ms"
+            )
+
+        if args.profile:
+            for page in pages():
+                totals, loaded = import_profile(tmp, page)
+                print(f"\n{os.path.basename(page)}  (로드된 무거운 모듈: {', '.join(loaded) or '없음'})")
+                for ms, module in totals[: args.top]:
+                    print(f"  {ms:8.1f}ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
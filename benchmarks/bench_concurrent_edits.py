@@ -0,0 +1,96 @@
+### 동시 수정 벤치마크 (낙관적 동시성 제어 검증)
+# 여러 스레드가 같은 매치들을 동시에 읽고 version 조건부 UPDATE 로 수정한다.
+# 충돌 시 다시 읽고 재시도하며, 끝난 뒤 각 매치의 version 이
+# 성공한 수정 횟수와 정확히 같은지(잃어버린 수정이 없는지) 확인한다.
+#
+# 실행: python benchmarks/bench_concurrent_edits.py --threads 16 --rows 4 --edits 200
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import match_store  # noqa: E402
+
+
+def editor(worker, match_ids, edits, successes, conflicts, lock):
+    local_successes = Counter()
+    local_conflicts = 0
+    for i in range(edits):
+        match_id = match_ids[i % len(match_ids)]
+        while True:
+            version = match_store.get_match_info(match_id)["version"]
+            if match_store.update_match(
+                match_id, version, player1=f"worker{worker}-{i}"
+            ):
+                local_successes[match_id] += 1
+                break
+            local_conflicts += 1
+    with lock:
+        successes.update(local_successes)
+        conflicts[0] += local_conflicts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=4)
+    parser.add_argument("--edits", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        match_store.DB_FOLDER = tmp
+        match_store.DB_PATH = os.path.join(tmp, "bench.sqlite")
+        match_store.init_db()
+        for i in range(args.rows):
+            match_store.register_match(
+                match_store.OFFICIAL, "벤치마크", f"선수{i}A", f"선수{i}B", "중화", "A"
+            )
+        match_ids = [
+            match[0]
+            for match in match_store.get_pending_matches(
+                match_store.OFFICIAL, "벤치마크", "중화", "A"
+            )
+        ]
+
+        successes = Counter()
+        conflicts = [0]
+        lock = threading.Lock()
+        threads = [
+            threading.Thread(
+                target=editor,
+                args=(worker, match_ids, args.edits, successes, conflicts, lock),
+            )
+            for worker in range(args.threads)
+        ]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        total = sum(successes.values())
+        print(f"스레드 {args.threads}개 x 수정 {args.edits}개, 대상 매치 {args.rows}개")
+        print(f"성공 {total}건, 충돌 후 재시도 {conflicts[0]}건")
+        print(f"총 {elapsed:.2f}s, 초당 {total / elapsed:.0f}건 수정")
+
+        lost = 0
+        for match_id in match_ids:
+            version = match_store.get_match_info(match_id)["version"]
+            if version != successes[match_id]:
+                lost += successes[match_id] - version
+                print(f"매치 {match_id}: version {version} != 성공 {successes[match_id]}")
+        if lost:
+            print(f"잃어버린 수정 {lost}건")
+            sys.exit(1)
+        print("잃어버린 수정 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+### 실시간 점수 기록 벤치마크
+# 모든 코트에서 동시에 몇 초마다 포인트가 기록되는 상황을 가정하고
+# add_point / get_live_score 지연 시간을 측정한다.
+#
+# 실행: python benchmarks/bench_live_score.py --courts 6 --points 200
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import live_score  # noqa: E402
+
+
+def run_court(match_id, points, write_times, read_times, lock):
+    local_writes = []
+    local_reads = []
+    for i in range(points):
+        start = time.perf_counter()
+        live_score.add_point(match_id, 1 + i % 2)
+        local_writes.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        live_score.get_live_score(match_id)
+        local_reads.append(time.perf_counter() - start)
+    with lock:
+        write_times.extend(local_writes)
+        read_times.extend(local_reads)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def report(name, values):
+    ms = [v * 1000 for v in values]
+    print(
+        f"{name:<16} n={len(ms):<6} mean={statistics.mean(ms):.3f}ms "
+        f"p50={percentile(ms, 0.5):.3f}ms p99={percentile(ms, 0.99):.3f}ms "
+        f"max={max(ms):.3f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--courts", type=int, default=6)
+    parser.add_argument("--points", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        live_score.DB_FOLDER = tmp
+        live_score.DB_PATH = os.path.join(tmp, "bench.sqlite")
+        live_score.init_db()
+
+        write_times, read_times = [], []
+        lock = threading.Lock()
+        threads = [
+            threading.Thread(
+                target=run_court,
+                args=(court + 1, args.points, write_times, read_times, lock),
+            )
+            for court in range(args.courts)
+        ]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        total = args.courts * args.points
+        print(f"코트 {args.courts}개 x 포인트 {args.points}개 = {total}건")
+        print(f"총 {elapsed:.2f}s, 초당 {total / elapsed:.0f}건 기록")
+        report("add_point", write_times)
+        report("get_live_score", read_times)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+### 대기열 순서 바꾸기 / 일괄 결과 입력 벤치마크
+# 1) 대기열 순서 바꾸기: queue_position 간격(가운데 값) 방식과
+#    옮긴 위치 뒤의 매치 등록 시각을 모두 다시 쓰는 방식의 이동당 쓰는 행 수와 시간
+# 2) 결과 N건 저장: 매치마다 input_result 로 저장하는 경우와
+#    일괄 입력처럼 한 번에 apply_results 로 저장하는 경우의 시간과 트랜잭션 수
+#
+# 실행: python benchmarks/bench_queue_order.py --config config.yaml --queue 40 --moves 200
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import change_log  # noqa: E402
+import match_store  # noqa: E402
+import result_queue  # noqa: E402
+import shards  # noqa: E402
+import storage  # noqa: E402
+
+TITLE = "대기열 벤치마크"
+
+
+def register(court, count):
+    return match_store.register_matches(
+        match_store.OFFICIAL,
+        TITLE,
+        [
+            {
+                "place": "중화",
+                "court": court,
+                "player1": f"선수{i}",
+                "player2": f"상대{i}",
+            }
+            for i in range(count)
+        ],
+    )
+
+
+def pending_ids(court):
+    return [
+        match[0]
+        for match in match_store.get_pending_matches(
+            match_store.OFFICIAL, TITLE, "중화", court
+        )
+    ]
+
+
+# 비교 대상: 옮긴 뒤 순서대로 created_at 을 다시 매김 (순서가 바뀐 행은 모두 씀)
+def rewrite_created_at(match_id, index):
+    conn = storage.connect(match_store.DB_PATH)
+    c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
+    c.execute("SELECT place, court FROM match_store WHERE id = ?", (match_id,))
+    condition, params = match_store.queue_condition(
+        match_store.OFFICIAL, TITLE, *c.fetchone()
+    )
+    c.execute(
+        f"""SELECT id, created_at FROM match_store
+                 WHERE {condition} ORDER BY created_at, id""",
+        params,
+    )
+    rows = c.fetchall()
+    queue = [row_id for row_id, _ in rows if row_id != match_id]
+    queue.insert(index, match_id)
+    start = rows[0][1]
+    written = 0
+    for i, (queue_id, (row_id, created_at)) in enumerate(zip(queue, rows)):
+        if queue_id == row_id and created_at == start + i:
+            continue
+        old = change_log.read_row(c, queue_id)
+        c.execute(
+            "UPDATE match_store SET created_at = ? WHERE id = ?", (start + i, queue_id)
+        )
+        change_log.record(c, queue_id, "move", old, change_log.read_row(c, queue_id))
+        written += 1
+    conn.commit()
+    conn.close()
+    return written
+
+
+def count_moves():
+    conn = storage.connect(match_store.DB_PATH)
+    count = conn.execute(
+        "SELECT COUNT(*) FROM change_log WHERE action = 'move'"
+    ).fetchone()[0]
+    conn.close()
+    return count
+
+
+def move_benchmark(move, court, queue_size, moves, seed):
+    register(court, queue_size)
+    rng = random.Random(seed)
+    before = count_moves()
+    start = time.perf_counter()
+    for _ in range(moves):
+        match_ids = pending_ids(court)
+        move(rng.choice(match_ids), rng.randrange(queue_size))
+    elapsed = time.perf_counter() - start
+    return (count_moves() - before) / moves, elapsed / moves
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--queue", type=int, default=40, help="코트 대기열 길이")
+    parser.add_argument("--moves", type=int, default=200, help="순서 바꾸기 횟수")
+    parser.add_argument("--results", type=int, default=40, help="한 번에 입력할 결과 수")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.config, "r") as file:
+        config = yaml.safe_load(file)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            with open("config.yaml", "w") as file:
+                yaml.safe_dump({**config, "sharding": False}, file, allow_unicode=True)
+            shards.reset()
+            storage.reset()
+            match_store.init_db()
+
+            print(f"대기열 {args.queue}경기, 무작위 이동 {args.moves}회")
+            print(f"{'':<14} {'이동당 쓰기':>10} {'이동당 시간':>10}")
+            for label, move, court in (
+                ("간격 순서 값", match_store.move_match, "A"),
+                ("등록 시각 재기록", rewrite_created_at, "B"),
+            ):
+                rows, seconds = move_benchmark(
+                    move, court, args.queue, args.moves, args.seed
+                )
+                print(f"{label:<14} {rows:8.2f}행 {seconds * 1000:8.2f}ms")
+
+            print(f"\n결과 {args.results}건 저장")
+            print(f"{'':<14} {'시간':>9} {'트랜잭션':>8}")
+            match_ids = register("C", args.results)
+            start = time.perf_counter()
+            for match_id in match_ids:
+                match_store.input_result(match_id, 11, 7, version=0)
+            elapsed = time.perf_counter() - start
+            print(f"{'매치마다 저장':<14} {elapsed * 1000:7.1f}ms {len(match_ids):8d}")
+
+            match_ids = register("D", args.results)
+            state = {}
+            for match_id in match_ids:
+                result_queue.queue_result(state, match_id, 11, 7, version=0)
+            entries = list(result_queue.queued_results(state).values())
+            start = time.perf_counter()
+            result_queue.apply_results(entries)
+            elapsed = time.perf_counter() - start
+            print(f"{'일괄 저장':<14} {elapsed * 1000:7.1f}ms {1:8d}")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+### 결과 입력 대기열 벤치마크
+# 여러 코트 심판이 거의 동시에 결과를 저장할 때 (경기 종료가 몰리는 시간대)
+# 1) 요청마다 input_result 로 바로 쓰는 경우와
+# 2) ResultBatcher 가 모아서 한 트랜잭션으로 쓰는 경우의
+# 처리량, 저장 지연 p50 / p95, 트랜잭션(커밋) 수를 비교한다.
+#
+# 실행: python benchmarks/bench_result_queue.py --config config.yaml --referees 32 --rounds 20
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import match_store  # noqa: E402
+import result_queue  # noqa: E402
+import shards  # noqa: E402
+
+TITLE = "대기열 벤치마크"
+
+
+def register(count):
+    return match_store.register_matches(
+        match_store.OFFICIAL,
+        TITLE,
+        [
+            {
+                "place": "중화",
+                "court": str(i % 20),
+                "player1": f"선수{i}",
+                "player2": f"상대{i}",
+            }
+            for i in range(count)
+        ],
+    )
+
+
+def direct(match_id, state, batcher):
+    match_store.input_result(match_id, 11, 7, version=0)
+
+
+def queued(match_id, state, batcher):
+    result_queue.queue_result(state, match_id, 11, 7, version=0)
+    result_queue.sync(state, batcher)
+
+
+# 심판 referees 명이 동시에 저장하는 묶음을 rounds 번 반복
+def burst(save, referees, rounds, batcher=None):
+    match_ids = register(referees * rounds)
+    latencies = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(referees)
+
+    def referee(index):
+        state = {}
+        for r in range(rounds):
+            match_id = match_ids[r * referees + index]
+            barrier.wait()
+            start = time.perf_counter()
+            save(match_id, state, batcher)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=referee, args=(i,)) for i in range(referees)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total = time.perf_counter() - start
+    latencies.sort()
+    return (
+        len(latencies) / total,
+        latencies[len(latencies) // 2],
+        latencies[int(len(latencies) * 0.95) - 1],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--referees", type=int, default=32, help="동시에 저장하는 심판 수")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.config, "r") as file:
+        config = yaml.safe_load(file)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            with open("config.yaml", "w") as file:
+                yaml.safe_dump({**config, "sharding": False}, file, allow_unicode=True)
+            shards.reset()
+            match_store.init_db()
+
+            total = args.referees * args.rounds
+            print(f"심판 {args.referees}명 동시 저장 x {args.rounds}회")
+            print(f"{'':<10} {'처리량':>9} {'p50':>8} {'p95':>8} {'커밋':>6}")
+            throughput, p50, p95 = burst(direct, args.referees, args.rounds)
+            print(
+                f"{'바로 저장':<10} {throughput:7.0f}/s {p50 * 1000:6.1f}ms "
+                f"{p95 * 1000:6.1f}ms {total:6d}"
+            )
+            batcher = result_queue.ResultBatcher()
+            throughput, p50, p95 = burst(queued, args.referees, args.rounds, batcher)
+            print(
+                f"{'묶음 저장':<10} {throughput:7.0f}/s {p50 * 1000:6.1f}ms "
+                f"{p95 * 1000:6.1f}ms {batcher.batches:6d}"
+            )
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+### 매치 검색 지연 시간 벤치마크 (FTS5 trigram vs LIKE 전체 스캔)
+# datagen 으로 만든 대용량 DB 에서 선수 이름 / 이름 일부 / 대회명 / 장소 검색을
+# search.search 로 반복해서 재고, 같은 조건의 LIKE 전체 스캔과 비교한다.
+# 등록 한 건에 검색 색인 트리거가 더하는 시간도 함께 잰다.
+#
+# 실행: python benchmarks/bench_search.py --config config.yaml --tournaments 200 --matches 5000
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datagen  # noqa: E402
+import match_store  # noqa: E402
+import search  # noqa: E402
+
+
+def like_scan(db_path, text, limit):
+    pattern = f"%{text}%"
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    c.execute(
+        """SELECT id FROM match_store
+                 WHERE player1 LIKE ? OR player2 LIKE ? OR event_name LIKE ? OR place LIKE ?
+                 ORDER BY id DESC LIMIT ?""",
+        (pattern, pattern, pattern, pattern, limit),
+    )
+    results = c.fetchall()
+    conn.close()
+    return results
+
+
+def timings(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(function())
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return count, statistics.median(times), times[int(len(times) * 0.95) - 1]
+
+
+def queries(db_path):
+    conn = sqlite3.connect(db_path)
+    c = conn.cursor()
+    player = c.execute(
+        "SELECT player1 FROM match_store ORDER BY id DESC LIMIT 1"
+    ).fetchone()[0]
+    title = c.execute(
+        "SELECT event_name FROM match_store ORDER BY id LIMIT 1"
+    ).fetchone()[0]
+    conn.close()
+    return [
+        ("선수 이름", player),
+        ("이름 두 글자", player[1:]),
+        ("대회명", title),
+        ("장소", datagen.PLACE),
+        ("대회명 + 선수", f"{title} {player}"),
+        ("없는 이름", "없는사람"),
+    ]
+
+
+def write_overhead(writes):
+    def register():
+        start = time.perf_counter()
+        for i in range(writes):
+            match_store.register_match(
+                match_store.OFFICIAL, "벤치마크", f"선수{i}", f"선수{i + 1}", "중화", "A"
+            )
+        return (time.perf_counter() - start) / writes
+
+    with_index = register()
+    conn = sqlite3.connect(match_store.DB_PATH)
+    search.drop_triggers(conn.cursor())
+    conn.commit()
+    without_index = register()
+    search.create_triggers(conn.cursor())
+    search.rebuild(conn.cursor())
+    conn.commit()
+    conn.close()
+    return with_index, without_index
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--db", help="이미 만든 DB 를 사용 (없으면 임시 DB 생성)")
+    parser.add_argument("--tournaments", type=int, default=200)
+    parser.add_argument("--matches", type=int, default=5000)
+    parser.add_argument("--players", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--writes", type=int, default=500)
+    args = parser.parse_args()
+
+    with open(args.config, "r") as file:
+        config = yaml.safe_load(file)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or os.path.join(tmp, "bench.sqlite")
+        if not args.db:
+            elapsed = datagen.generate(
+                config,
+                db_path,
+                tournaments=args.tournaments,
+                matches=args.matches,
+                players=args.players,
+                seed=1,
+            )
+            print(f"데이터 생성 {elapsed:.1f}s")
+        match_store.DB_FOLDER = os.path.dirname(db_path) or "."
+        match_store.DB_PATH = search.DB_PATH = db_path
+        match_store.init_db()
+
+        conn = sqlite3.connect(db_path)
+        total = conn.execute("SELECT COUNT(*) FROM match_store").fetchone()[0]
+        conn.close()
+        print(f"매치 {total}건, 반복 {args.repeat}회, 최대 {args.limit}건")
+        print(f"{'검색':<12} {'결과':>5} {'FTS p50':>9} {'FTS p95':>9} {'LIKE p50':>9} {'LIKE p95':>9}")
+        for label, text in queries(db_path):
+            count, fts50, fts95 = timings(
+                lambda: search.search(text, limit=args.limit), args.repeat
+            )
+            _, like50, like95 = timings(
+                lambda: like_scan(db_path, text, args.limit), max(args.repeat // 5, 1)
+            )
+            print(
+                f"{label:<12} {count:>5} {fts50 * 1000:>7.1f}ms {fts95 * 1000:>7.1f}ms "
+                f"{like50 * 1000:>7.1f}ms {like95 * 1000:>7.1f}ms"
+            )
+
+        with_index, without_index = write_overhead(args.writes)
+        print(f"등록 (색인 트리거 있음) {with_index * 1000:.3f}ms/건")
+        print(f"등록 (색인 트리거 없음) {without_index * 1000:.3f}ms/건")
+
+
+if __name__ == "__main__":
+    main()
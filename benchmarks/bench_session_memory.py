@@ -0,0 +1,143 @@
+### 동시 접속 세션별 서버 메모리 벤치마크
+# 실제 Streamlit 서버를 띄우고 웹소켓 세션 여러 개가 같은 코트 페이지를 연 상태에서
+# 서버 프로세스의 RSS 를 잰다. 대기열이 긴 코트를 보는 관람객이 늘어날 때
+# 세션 하나가 서버 메모리를 얼마나 쓰는지 확인하는 용도.
+#
+# 실행: python benchmarks/bench_session_memory.py --config config.yaml --sessions 200 --matches 50
+
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import match_store  # noqa: E402
+import session_memory  # noqa: E402
+from streamlit.proto.BackMsg_pb2 import BackMsg  # noqa: E402
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg  # noqa: E402
+from streamlit.util import calc_md5  # noqa: E402
+from tornado.websocket import websocket_connect  # noqa: E402
+
+PAGE = os.path.join(ROOT, "pages", "1_🟣중화 A 코트.py")
+
+
+def fill(title, matches):
+    for i in range(matches):
+        match_store.register_match(
+            match_store.OFFICIAL,
+            title,
+            f"선수{i}A",
+            f"선수{i}B",
+            place="중화",
+            court="A",
+            round_type="예선",
+            gender="남",
+            match_type="새내기부",
+        )
+
+
+def start_server(cwd, port):
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "streamlit",
+            "run",
+            os.path.join(ROOT, "🏠홈.py"),
+            "--server.headless=true",
+            f"--server.port={port}",
+            "--browser.gatherUsageStats=false",
+        ],
+        cwd=cwd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health")
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("서버가 시작되지 않았습니다")
+
+
+# 세션 하나를 열고 코트 페이지 실행이 끝날 때까지 기다림
+async def open_session(port, page=PAGE):
+    conn = await websocket_connect(f"ws://127.0.0.1:{port}/_stcore/stream")
+    msg = BackMsg()
+    msg.rerun_script.page_script_hash = calc_md5(page)
+    conn.write_message(msg.SerializeToString(), binary=True)
+    while True:
+        data = await conn.read_message()
+        if data is None:
+            raise RuntimeError("세션 연결이 끊어졌습니다")
+        if ForwardMsg.FromString(data).WhichOneof("type") == "script_finished":
+            return conn
+
+
+async def measure(port, pid, sessions):
+    # 첫 세션으로 모듈 import / 캐시를 미리 채움
+    (await open_session(port)).close()
+    await asyncio.sleep(1)
+    baseline = session_memory.process_rss(pid)
+
+    conns = []
+    start = time.perf_counter()
+    for _ in range(sessions):
+        conns.append(await open_session(port))
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(1)
+    loaded = session_memory.process_rss(pid)
+
+    for conn in conns:
+        conn.close()
+    return baseline, loaded, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default=os.path.join(ROOT, "config.yaml"))
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--matches", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8599)
+    args = parser.parse_args()
+
+    with open(args.config) as file:
+        title = yaml.safe_load(file)["tournament_titles"][0]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copy(args.config, os.path.join(tmp, "config.yaml"))
+        match_store.DB_FOLDER = os.path.join(tmp, "db")
+        match_store.DB_PATH = os.path.join(match_store.DB_FOLDER, "db.sqlite")
+        os.makedirs(match_store.DB_FOLDER)
+        match_store.init_db()
+        fill(title, args.matches)
+
+        server = start_server(tmp, args.port)
+        try:
+            baseline, loaded, elapsed = asyncio.run(
+                measure(args.port, server.pid, args.sessions)
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+    per_session = (loaded - baseline) / args.sessions
+    print(f"세션 {args.sessions}개, 대기 매치 {args.matches}개 (세션 열기 {elapsed:.1f}s)")
+    print(f"기준 RSS   {baseline / 1024 / 1024:.1f}MB")
+    print(f"접속 후    {loaded / 1024 / 1024:.1f}MB")
+    print(f"세션당     {per_session / 1024:.1f}KB")
+
+
+if __name__ == "__main__":
+    main()
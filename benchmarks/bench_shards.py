@@ -0,0 +1,155 @@
+### 대회별 샤딩 벤치마크
+# 1) 쓰기: 대회마다 작업자(스레드 / 프로세스) 하나가 매치 등록 + 결과 입력을 반복할 때
+#    단일 DB 와 샤딩(대회별 파일)의 처리량과 쓰기 지연 p95 를 비교한다.
+# 2) 읽기: datagen 으로 만든 DB 를 샤드로 나눈 뒤 통계 페이지 조회(완료된 매치 전체)와
+#    선수 전적을 단일 DB / 샤드 순차 조회 / 스레드 풀 동시 조회로 잰다.
+#
+# 실행: python benchmarks/bench_shards.py --config config.yaml --events 8 --tournaments 20 --matches 20000
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datagen  # noqa: E402
+import match_store  # noqa: E402
+import shards  # noqa: E402
+
+STATS_SQL = "SELECT * FROM matches WHERE status = 'finished'"
+
+
+def use_config(config, sharding):
+    with open("config.yaml", "w") as file:
+        yaml.safe_dump({**config, "sharding": sharding}, file, allow_unicode=True)
+    shards.reset()
+
+
+def writer(event, writes):
+    latencies = []
+    for i in range(writes):
+        start = time.perf_counter()
+        match_id = match_store.register_match(
+            match_store.OFFICIAL, event, f"선수{i}", f"선수{i + 1}", "중화", "A"
+        )
+        match_store.input_result(match_id, 11, i % 10)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+# 대회마다 작업자 하나 (processes=True 면 GIL 없이 DB 잠금 경합만 보도록 프로세스로)
+def write_benchmark(events, writes, processes):
+    names = [f"쓰기 {e}" for e in range(events)]
+    # 샤드는 미리 만들어 두고 쓰기만 잼
+    for name in names:
+        match_store.get_pending_matches(match_store.OFFICIAL, name, "중화", "A")
+    executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor_class(max_workers=events) as executor:
+        start = time.perf_counter()
+        results = list(executor.map(writer, names, [writes] * events))
+        elapsed = time.perf_counter() - start
+    latencies = sorted(latency for result in results for latency in result)
+    return len(latencies) / elapsed, latencies[int(len(latencies) * 0.95) - 1]
+
+
+def timed(function, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def read_all(sql, params, paths):
+    rows = []
+    for path in paths:
+        conn = sqlite3.connect(path)
+        rows += conn.execute(sql, params).fetchall()
+        conn.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--events", type=int, default=8, help="동시에 쓰는 대회 수")
+    parser.add_argument("--writes", type=int, default=200, help="대회당 등록 + 결과 입력 수")
+    parser.add_argument("--tournaments", type=int, default=20)
+    parser.add_argument("--matches", type=int, default=20000)
+    args = parser.parse_args()
+
+    with open(args.config, "r") as file:
+        config = yaml.safe_load(file)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            print(f"[쓰기] 대회 {args.events}개 동시, 대회당 {args.writes}회")
+            for processes in (False, True):
+                for sharding in (False, True):
+                    os.makedirs("db", exist_ok=True)
+                    use_config(config, sharding)
+                    match_store.init_db()
+                    throughput, p95 = write_benchmark(args.events, args.writes, processes)
+                    label = ("프로세스 " if processes else "스레드 ") + (
+                        "샤딩" if sharding else "단일 DB"
+                    )
+                    print(f"{label:<14} {throughput:8.0f}건/s  p95 {p95 * 1000:6.1f}ms")
+                    shards.reset()
+                    for root, _, files in os.walk("db", topdown=False):
+                        for name in files:
+                            os.remove(os.path.join(root, name))
+
+            use_config(config, False)
+            elapsed = datagen.generate(
+                config,
+                match_store.DB_PATH,
+                tournaments=args.tournaments,
+                matches=args.matches,
+                players=3000,
+                seed=1,
+            )
+            total = args.tournaments * args.matches
+            print(f"\n[읽기] 매치 {total}건 생성 {elapsed:.1f}s")
+            conn = sqlite3.connect(match_store.DB_PATH)
+            player = conn.execute("SELECT player1 FROM match_store LIMIT 1").fetchone()[0]
+            conn.close()
+
+            single, rows = timed(lambda: read_all(STATS_SQL, (), [match_store.DB_PATH]))
+            single_player, _ = timed(lambda: match_store.get_player_matches(player))
+
+            use_config(config, True)
+            start = time.perf_counter()
+            shards.split_all()
+            print(f"샤드 {args.tournaments}개로 나누기 {time.perf_counter() - start:.1f}s")
+            paths = shards.all_paths()
+            sequential, _ = timed(lambda: read_all(STATS_SQL, (), paths))
+            parallel, sharded_rows = timed(lambda: shards.fan_out(STATS_SQL, (), paths))
+            sharded_player, _ = timed(lambda: match_store.get_player_matches(player))
+            assert len(rows) == len(sharded_rows)
+
+            print(f"{'':<14} {'단일 DB':>9} {'샤드 순차':>9} {'샤드 동시':>9}")
+            print(
+                f"{'완료 매치 전체':<14} {single * 1000:7.0f}ms {sequential * 1000:7.0f}ms "
+                f"{parallel * 1000:7.0f}ms"
+            )
+            print(
+                f"{'선수 전적':<14} {single_player * 1000:7.1f}ms {'':>9} "
+                f"{sharded_player * 1000:7.1f}ms"
+            )
+            shards.reset()
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+### 저장소 백엔드 벤치마크 (SQLite / PostgreSQL)
+# 작업자(코트) 여러 개가 동시에 매치 등록 + 결과 입력을 반복할 때
+# 저장소별 처리량과 쓰기 지연 p50 / p95 를 비교한다.
+# --dsn 을 주지 않으면 SQLite 만 잰다 (PostgreSQL 은 psycopg 필요, 테이블을 지우고 다시 만듦).
+#
+# 실행: python benchmarks/bench_storage.py --config config.yaml --writers 8 --writes 200 \
+#           --dsn postgresql://postgres@localhost/squash_bench
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import match_store  # noqa: E402
+import storage  # noqa: E402
+
+
+def use_storage(config, storage_config):
+    with open("config.yaml", "w") as file:
+        yaml.safe_dump({**config, "storage": storage_config}, file, allow_unicode=True)
+    storage.reset()
+
+
+def reset_postgres():
+    conn = storage.connect()
+    conn.execute("DROP VIEW IF EXISTS matches, unofficial_group_matches")
+    conn.execute(
+        """DROP TABLE IF EXISTS match_store, change_log, applied_results,
+                 score_events, score_snapshots"""
+    )
+    conn.close()
+
+
+def writer(court, writes):
+    latencies = []
+    for i in range(writes):
+        start = time.perf_counter()
+        match_id = match_store.register_match(
+            match_store.OFFICIAL,
+            "저장소 벤치마크",
+            f"선수{i}",
+            f"선수{i + 1}",
+            "중화",
+            court,
+        )
+        match_store.input_result(match_id, 11, i % 10)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def write_benchmark(writers, writes):
+    courts = [str(court) for court in range(writers)]
+    with ThreadPoolExecutor(max_workers=writers) as executor:
+        start = time.perf_counter()
+        results = list(executor.map(writer, courts, [writes] * writers))
+        elapsed = time.perf_counter() - start
+    latencies = sorted(latency for result in results for latency in result)
+    return (
+        len(latencies) / elapsed,
+        latencies[len(latencies) // 2],
+        latencies[int(len(latencies) * 0.95) - 1],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--writers", type=int, default=8, help="동시에 쓰는 작업자 수")
+    parser.add_argument("--writes", type=int, default=200, help="작업자당 등록 + 결과 입력 수")
+    parser.add_argument("--dsn", help="PostgreSQL 접속 정보 (없으면 SQLite 만)")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as file:
+        config = yaml.safe_load(file)
+
+    backends = [("SQLite", {"backend": storage.SQLITE})]
+    if args.dsn:
+        postgres = {
+            "backend": storage.POSTGRES,
+            "dsn": args.dsn,
+            "pool_size": args.writers,
+        }
+        backends.append(("PostgreSQL", postgres))
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            print(f"작업자 {args.writers}개 동시, 작업자당 {args.writes}회 (등록 + 결과 입력)")
+            print(f"{'':<12} {'처리량':>9} {'p50':>8} {'p95':>8}")
+            for label, storage_config in backends:
+                use_storage(config, storage_config)
+                if storage_config["backend"] == storage.POSTGRES:
+                    reset_postgres()
+                match_store.init_db()
+                throughput, p50, p95 = write_benchmark(args.writers, args.writes)
+                print(
+                    f"{label:<12} {throughput:7.0f}/s {p50 * 1000:6.1f}ms {p95 * 1000:6.1f}ms"
+                )
+            storage.reset()
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
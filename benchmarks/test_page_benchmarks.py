@@ -0,0 +1,29 @@
+### 페이지 스크립트 실행 시간 벤치마크 (pytest-benchmark)
+# 매치 10 / 1,000 / 100,000건일 때 각 페이지를 AppTest 로 다시 실행하는 시간을 잰다.
+# 첫 실행으로 캐시를 채운 뒤 같은 세션에서 반복 실행하므로 새로고침(rerun) 경로를 잰다.
+#
+# 실행: python -m pytest benchmarks/test_page_benchmarks.py --benchmark-group-by=param:page
+
+import pytest
+
+import match_store
+from conftest import GROUP_NAME
+
+pytest.importorskip("pytest_benchmark")
+
+SIZES = [10, 1_000, 100_000]
+PAGES = ["court", "group", "analytics", "stats", "admin"]
+PENDING = 20
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("page", PAGES)
+def test_page_rerun(benchmark, run_page, seed_matches, page, size):
+    seed_matches(size, pending=PENDING)
+    seed_matches(size, pending=PENDING, event_type=match_store.GROUP, event_name=GROUP_NAME)
+    at = run_page(page, admin=page == "admin")
+    assert not at.exception
+
+    benchmark.extra_info["matches"] = size
+    benchmark.pedantic(at.run, rounds=5, iterations=1)
+    assert not at.exception
@@ -0,0 +1,152 @@
+### 매치 변경 기록 (추가만 하는 로그)
+
+# 쓰기 경로(match_store, 실시간 점수, 관리자 페이지)가 같은 트랜잭션 안에서
+# 바뀐 컬럼만 {"컬럼": [이전 값, 새 값]} 형태로 남긴다.
+# 특정 시점의 매치 상태는 현재 행에서 그 이후의 기록만 거꾸로 되돌려 구한다.
+
+import os
+import json
+import time
+import shards
+import storage
+
+# 데이터베이스 설정
+DB_FOLDER = "db"
+DB_FILE = "db.sqlite"
+DB_PATH = os.path.join(DB_FOLDER, DB_FILE)
+
+# 기록 대상 컬럼 (version 은 매번 바뀌므로 제외)
+TRACKED_COLUMNS = (
+    "event_type",
+    "event_name",
+    "place",
+    "court",
+    "round_type",
+    "gender",
+    "match_type",
+    "player1",
+    "player2",
+    "score1",
+    "score2",
+    "status",
+    "created_at",
+    "started_at",
+    "finished_at",
+    "queue_position",
+)
+
+CHANGE_LOG_TABLE_SQL = """CREATE TABLE IF NOT EXISTS change_log
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  match_id INTEGER NOT NULL,
+                  changed_at REAL NOT NULL,
+                  actor TEXT,
+                  action TEXT NOT NULL,
+                  diff TEXT NOT NULL)"""
+
+
+def init_db(conn):
+    conn.execute(CHANGE_LOG_TABLE_SQL)
+    conn.execute(
+        """CREATE INDEX IF NOT EXISTS idx_change_log_match
+                 ON change_log (match_id, id)"""
+    )
+    conn.execute(
+        """CREATE INDEX IF NOT EXISTS idx_change_log_time
+                 ON change_log (changed_at, match_id, id)"""
+    )
+
+
+# 기록에 필요한 현재 값 읽기 (쓰기 트랜잭션 안에서 호출)
+def read_row(c, match_id, columns=TRACKED_COLUMNS):
+    c.execute(
+        f"SELECT {', '.join(columns)} FROM match_store WHERE id = ?", (match_id,)
+    )
+    row = c.fetchone()
+    return dict(zip(columns, row)) if row else None
+
+
+def record(c, match_id, action, old, new, actor=None):
+    old = old or {}
+    new = new or {}
+    diff = {
+        column: [old.get(column), new.get(column)]
+        for column in TRACKED_COLUMNS
+        if (column in old or column in new)
+        and old.get(column) != new.get(column)
+    }
+    if not diff and action != "delete":
+        return False
+    c.execute(
+        """INSERT INTO change_log (match_id, changed_at, actor, action, diff)
+                 VALUES (?, ?, ?, ?, ?)""",
+        (match_id, time.time(), actor, action, json.dumps(diff, ensure_ascii=False)),
+    )
+    return True
+
+
+def match_db_path(match_id):
+    if shards.enabled() and match_id is not None:
+        return shards.match_path(match_id)
+    return DB_PATH
+
+
+def change_key(change):
+    return (change[2], change[1], change[0])
+
+
+# 변경 기록 조회 (keyset 페이지: before 는 이전 페이지의 마지막 기록, 그보다 오래된 limit 건)
+# 샤드마다 id 를 따로 매기므로 순서는 (changed_at, match_id, id) 로 정함
+def list_changes(match_id=None, before=None, limit=50):
+    conditions = []
+    params = []
+    if match_id is not None:
+        conditions.append("match_id = ?")
+        params.append(match_id)
+    if before is not None:
+        conditions.append("(changed_at, match_id, id) < (?, ?, ?)")
+        params.extend(change_key(before))
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    sql = f"""SELECT id, match_id, changed_at, actor, action, diff
+                 FROM change_log
+                 {where}
+                 ORDER BY changed_at DESC, match_id DESC, id DESC
+                 LIMIT ?"""
+    params = (*params, limit)
+
+    # 샤딩 중에 매치를 지정하지 않으면 모든 샤드에서 limit 건씩 읽어 합침
+    if shards.enabled() and match_id is None:
+        changes = sorted(shards.fan_out(sql, params), key=change_key, reverse=True)
+        return changes[:limit]
+    conn = storage.connect(match_db_path(match_id))
+    c = conn.cursor()
+    c.execute(sql, params)
+    changes = c.fetchall()
+    conn.close()
+    return changes
+
+
+# 특정 시점(epoch 초)의 매치 상태. 그 시점에 없던 매치면 None
+def get_match_state_at(match_id, timestamp):
+    conn = storage.connect(match_db_path(match_id))
+    c = conn.cursor()
+    c.execute("BEGIN")
+    state = read_row(c, match_id)
+    c.execute(
+        """SELECT action, diff
+                 FROM change_log
+                 WHERE match_id = ? AND changed_at > ?
+                 ORDER BY id DESC""",
+        (match_id, timestamp),
+    )
+    # 현재 상태에서 그 시점 이후의 변경을 최신 것부터 되돌림
+    for action, diff in c.fetchall():
+        diff = json.loads(diff)
+        if action == "insert":
+            state = None
+        else:
+            state = dict(state or {})
+            for column, (old_value, _) in diff.items():
+                state[column] = old_value
+    conn.rollback()
+    conn.close()
+    return state
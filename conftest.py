@@ -0,0 +1,152 @@
+### pytest 공통 설정 (tests/, benchmarks/ 가 함께 사용)
+
+# 각 테스트는 임시 폴더를 작업 디렉터리로 삼아 config.yaml 과 db/db.sqlite 를 새로 만든다.
+# 페이지와 모듈은 상대 경로(db/db.sqlite, config.yaml)를 쓰므로 chdir 만으로 격리된다.
+
+import os
+import sqlite3
+import sys
+import time
+
+import pytest
+import streamlit as st
+import yaml
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+import match_store  # noqa: E402
+import shards  # noqa: E402
+import storage  # noqa: E402
+
+CONFIG = {
+    "admin_password": "admin",
+    "db_admin_password": "dbadmin",
+    "tournament_titles": ["테스트 대회"],
+    "round_types": ["예선", "본선", "결승"],
+    "genders": ["남", "여"],
+    "match_types": ["새내기부", "미니엄부", "베테랑부"],
+}
+TITLE = CONFIG["tournament_titles"][0]
+GROUP_NAME = "중화랭킹전"
+
+PAGES = {
+    "home": "🏠홈.py",
+    "court": os.path.join("pages", "1_🟣중화 A 코트.py"),
+    "group": os.path.join("pages", "5_중화 랭킹전.py"),
+    "analytics": os.path.join("pages", "7_📈대회 분석.py"),
+    "stats": os.path.join("pages", "8_📊정보확인 페이지.py"),
+    "admin": os.path.join("pages", "9_🚧관리자페이지.py"),
+}
+
+
+@pytest.fixture(autouse=True)
+def app_dir(tmp_path, monkeypatch):
+    with open(tmp_path / "config.yaml", "w") as file:
+        yaml.safe_dump(CONFIG, file, allow_unicode=True)
+    monkeypatch.chdir(tmp_path)
+    storage.reset()
+    match_store.init_db()
+    # 이전 테스트의 DB 를 잡고 있는 캐시(대기 시간 예측기 등)를 비움
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    shards.reset()
+    yield tmp_path
+    shards.reset()
+    storage.reset()
+
+
+# 샤딩을 켠 설정 (대회 / 모임마다 db/shards/ 아래 파일)
+@pytest.fixture
+def sharded(app_dir):
+    with open(app_dir / "config.yaml", "w") as file:
+        yaml.safe_dump({**CONFIG, "sharding": True}, file, allow_unicode=True)
+    shards.reset()
+    return app_dir
+
+
+# 페이지 실행 (admin=True 면 관리자 모드 + DB 관리자 로그인 상태)
+@pytest.fixture
+def run_page():
+    def run(page, admin=False, **state):
+        at = AppTest.from_file(os.path.join(ROOT, PAGES[page]), default_timeout=60)
+        at.session_state["admin_mode"] = admin
+        at.session_state["password_correct"] = admin
+        for key, value in state.items():
+            at.session_state[key] = value
+        return at.run()
+
+    return run
+
+
+# 매치 대량 생성 (A/B/C 코트에 종료된 매치 + A 코트 대기 매치)
+@pytest.fixture
+def seed_matches():
+    def seed(finished, pending=0, event_type=match_store.OFFICIAL, event_name=TITLE):
+        now = int(time.time())
+        rows = [
+            (
+                event_type,
+                event_name,
+                "중화",
+                "ABC"[i % 3],
+                CONFIG["round_types"][i % 3],
+                CONFIG["genders"][i % 2],
+                CONFIG["match_types"][i % 3],
+                f"선수{i % 500}",
+                f"선수{(i + 1) % 500}",
+                21,
+                i % 20,
+                "finished",
+                now - (finished - i) * 60,
+                now - (finished - i) * 60,
+                now - (finished - i) * 60 + 900,
+            )
+            for i in range(finished)
+        ]
+        rows += [
+            (
+                event_type,
+                event_name,
+                "중화",
+                "A",
+                "예선",
+                "남",
+                "새내기부",
+                f"대기{i}A",
+                f"대기{i}B",
+                None,
+                None,
+                "pending",
+                now + i,
+                None,
+                None,
+            )
+            for i in range(pending)
+        ]
+        conn = sqlite3.connect(match_store.DB_PATH)
+        conn.executemany(
+            """INSERT INTO match_store (event_type, event_name, place, court,
+                     round_type, gender, match_type, player1, player2, score1, score2,
+                     status, created_at, started_at, finished_at)
+                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            rows,
+        )
+        conn.commit()
+        conn.close()
+
+    return seed
+
+
+# 다이얼로그 안의 버튼 누르기
+# (AppTest 는 다이얼로그만 다시 실행하지 못하므로 여는 버튼과 함께 눌러서 한 번에 실행)
+def click_in_dialog(at, open_key, button_key):
+    at.button(key=open_key).click()
+    at.button(key=button_key).click()
+    return at.run()
+
+
+# 라벨로 위젯 찾기 (AppTest 는 key 로만 찾을 수 있음)
+def by_label(widgets, label):
+    return next(widget for widget in widgets if widget.label == label)
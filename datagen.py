@@ -0,0 +1,309 @@
+### 벤치마크 / 용량 산정용 가상 대회 데이터 생성기
+
+# 실제 대회처럼 코트별로 이어지는 경기 시간, config 의 라운드/성별/타입,
+# 한국어 선수 이름을 가진 공식 대회 매치와 모임 매치를 match_store 에 채운다.
+# 같은 seed 면 항상 같은 데이터가 나오고, 한 트랜잭션에 묶어 넣으면서
+# 보조 인덱스와 검색 색인은 다 넣은 뒤에 한 번에 만들어서 100만 건도 수 초 안에 끝난다.
+#
+# 실행: python datagen.py --tournaments 200 --matches 5000 --groups 2 --group-matches 5000 --seed 1
+
+import argparse
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import pytz
+import yaml
+import match_store
+import search
+
+# 데이터베이스 설정
+DB_FOLDER = "db"
+DB_FILE = "db.sqlite"
+DB_PATH = os.path.join(DB_FOLDER, DB_FILE)
+
+# 서울 시간대 설정
+seoul_tz = pytz.timezone("Asia/Seoul")
+
+# 이름 재료
+SURNAMES = "김이박최정강조윤장임한오서신권황안송류홍전고문양손배백허남심노"
+GIVEN_NAMES = "민서준지현우예도하윤수진영재성호경태연은시유주원승혜동상나리"
+
+# 공식 대회 코트 / 시간 설정
+PLACE = "중화"
+COURTS = ("A", "B", "C")
+DAY_START_HOUR = 10  # 대회 시작 시각
+DAY_HOURS = 10  # 하루 진행 시간
+MATCH_MINUTES = (18, 5)  # 경기 시간 평균, 표준편차 (분)
+MIN_MATCH_MINUTES = 8
+GAP_SECONDS = (60, 300)  # 경기 사이 쉬는 시간
+QUEUE_SECONDS = (5 * 60, 60 * 60)  # 등록부터 시작까지 대기 시간
+TOURNAMENT_INTERVAL_DAYS = 7
+GROUP_MATCHES_PER_NIGHT = 40
+
+# 모든 행을 한 번에 넣는 INSERT (version 은 기본값 0)
+INSERT_SQL = """INSERT INTO match_store (event_type, event_name, place, court,
+                 round_type, gender, match_type, player1, player2, score1, score2,
+                 status, created_at, started_at, finished_at)
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+
+# 겹치지 않는 선수 이름 count 개 (조합이 모자라면 숫자를 붙여서 구분)
+def player_names(rng, count):
+    names = [
+        surname + first + second
+        for surname in SURNAMES
+        for first in GIVEN_NAMES
+        for second in GIVEN_NAMES
+    ]
+    rng.shuffle(names)
+    return [
+        names[i % len(names)] + (str(i // len(names)) if i >= len(names) else "")
+        for i in range(count)
+    ]
+
+
+# 11점제 점수 count 개 (15% 는 듀스라서 2점 차까지)
+def match_scores(rng, count):
+    deuce = rng.random(count) < 0.15
+    loser = np.where(deuce, rng.integers(10, 15, count), rng.integers(0, 10, count))
+    winner = np.where(deuce, loser + 2, 11)
+    swap = rng.random(count) < 0.5
+    return np.where(swap, loser, winner), np.where(swap, winner, loser)
+
+
+def match_seconds(rng, count):
+    minutes = np.maximum(MIN_MATCH_MINUTES, rng.normal(*MATCH_MINUTES, count))
+    return (minutes * 60).astype(np.int64)
+
+
+# 서로 다른 두 선수 count 쌍
+def player_pairs(rng, roster, count):
+    first = rng.integers(0, len(roster), count)
+    second = (first + rng.integers(1, len(roster), count)) % len(roster)
+    names = np.array(roster, dtype=object)
+    return names[first], names[second]
+
+
+def pick(rng, values, count):
+    return np.array(values, dtype=object)[rng.integers(0, len(values), count)]
+
+
+# 대회 매치. 코트마다 앞 경기가 끝나면 다음 경기가 시작되고,
+# 하루 DAY_HOURS 시간이 넘으면 다음 날 같은 시각에 이어서 진행
+# 마지막 pending 개는 코트 대기열에 남김
+def tournament_rows(rng, name, day_start, matches, roster, config, pending=0):
+    order = np.arange(matches)
+    courts = order % len(COURTS)
+    durations = match_seconds(rng, matches)
+    gaps = rng.integers(GAP_SECONDS[0], GAP_SECONDS[1] + 1, matches)
+
+    started_at = np.empty(matches, dtype=np.int64)
+    for court in range(len(COURTS)):
+        mask = courts == court
+        elapsed = np.cumsum(gaps[mask] + durations[mask]) - durations[mask]
+        days = elapsed // (DAY_HOURS * 3600)
+        started_at[mask] = day_start + elapsed + days * (24 - DAY_HOURS) * 3600
+    finished_at = started_at + durations
+    day_of_match = day_start + (started_at - day_start) // 86400 * 86400
+    created_at = np.maximum(
+        day_of_match - 3600,
+        started_at - rng.integers(QUEUE_SECONDS[0], QUEUE_SECONDS[1] + 1, matches),
+    )
+
+    # 예선 -> 본선 -> 결승 순서로 진행
+    round_types = np.array(config["round_types"], dtype=object)
+    rounds = round_types[order * len(round_types) // max(matches, 1)]
+    player1, player2 = player_pairs(rng, roster, matches)
+    score1, score2 = match_scores(rng, matches)
+
+    rows = list(
+        zip(
+            [match_store.OFFICIAL] * matches,
+            [name] * matches,
+            [PLACE] * matches,
+            np.array(COURTS, dtype=object)[courts].tolist(),
+            rounds.tolist(),
+            pick(rng, config["genders"], matches).tolist(),
+            pick(rng, config["match_types"], matches).tolist(),
+            player1.tolist(),
+            player2.tolist(),
+            score1.tolist(),
+            score2.tolist(),
+            ["finished"] * matches,
+            created_at.tolist(),
+            started_at.tolist(),
+            finished_at.tolist(),
+        )
+    )
+    for i in range(max(matches - pending, 0), matches):
+        row = rows[i]
+        rows[i] = row[:9] + (None, None, "pending", row[12], None, None)
+    return rows
+
+
+# 모임 매치 (매주 저녁 GROUP_MATCHES_PER_NIGHT 경기씩)
+def group_rows(rng, name, first_night, matches, roster):
+    order = np.arange(matches)
+    started_at = (
+        first_night
+        + (order // GROUP_MATCHES_PER_NIGHT) * 7 * 86400
+        + (order % GROUP_MATCHES_PER_NIGHT) * 6 * 60
+    )
+    created_at = started_at - rng.integers(60, 601, matches)
+    finished_at = started_at + match_seconds(rng, matches)
+    player1, player2 = player_pairs(rng, roster, matches)
+    score1, score2 = match_scores(rng, matches)
+    empty = [None] * matches
+    return zip(
+        [match_store.GROUP] * matches,
+        [name] * matches,
+        empty,
+        empty,
+        empty,
+        empty,
+        empty,
+        player1.tolist(),
+        player2.tolist(),
+        score1.tolist(),
+        score2.tolist(),
+        ["finished"] * matches,
+        created_at.tolist(),
+        started_at.tolist(),
+        finished_at.tolist(),
+    )
+
+
+def index_names():
+    return [
+        re.search(r"INDEX IF NOT EXISTS (\w+)", sql).group(1)
+        for sql in match_store.MATCH_STORE_INDEX_SQL
+    ]
+
+
+def generate(
+    config,
+    db_path=DB_PATH,
+    tournaments=1,
+    matches=1000,
+    groups=0,
+    group_matches=0,
+    players=300,
+    pending=0,
+    seed=0,
+    end_date=None,
+):
+    rng = np.random.default_rng(seed)
+    # 스키마는 match_store 가 만듦 (폴더도 함께)
+    match_store.init_db(db_path)
+
+    roster = player_names(rng, players)
+    end_date = end_date or datetime.now(seoul_tz).date()
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    c = conn.cursor()
+    # 생성 중에는 안정성보다 속도 (실패하면 DB 를 다시 만들면 됨)
+    c.execute("PRAGMA synchronous = OFF")
+    c.execute("PRAGMA temp_store = MEMORY")
+    c.execute("PRAGMA cache_size = -262144")
+    start = time.perf_counter()
+    c.execute("BEGIN IMMEDIATE")
+    try:
+        # 인덱스는 다 넣은 뒤 한 번에 정렬해서 만드는 편이 훨씬 빠름
+        for name in index_names():
+            c.execute(f"DROP INDEX IF EXISTS {name}")
+        # 검색 색인도 행마다 갱신하지 않고 끝에 한 번에 다시 만듦
+        search.drop_triggers(c)
+
+        titles = config["tournament_titles"]
+        for t in range(tournaments):
+            # 가장 최근 대회가 config 의 현재 대회
+            age = tournaments - 1 - t
+            name = titles[0] if age == 0 else f"가상 대회 {t + 1}"
+            day = end_date - timedelta(days=age * TOURNAMENT_INTERVAL_DAYS)
+            day_start = int(
+                seoul_tz.localize(
+                    datetime.combine(day, datetime.min.time())
+                    + timedelta(hours=DAY_START_HOUR)
+                ).timestamp()
+            )
+            c.executemany(
+                INSERT_SQL,
+                tournament_rows(
+                    rng,
+                    name,
+                    day_start,
+                    matches,
+                    roster,
+                    config,
+                    pending if age == 0 else 0,
+                ),
+            )
+
+        for g in range(groups):
+            name = "중화랭킹전" if g == 0 else f"가상 모임 {g + 1}"
+            weeks = -(-group_matches // GROUP_MATCHES_PER_NIGHT)
+            first_night = int(
+                seoul_tz.localize(
+                    datetime.combine(end_date - timedelta(weeks=weeks), datetime.min.time())
+                    + timedelta(hours=19)
+                ).timestamp()
+            )
+            c.executemany(
+                INSERT_SQL, group_rows(rng, name, first_night, group_matches, roster)
+            )
+
+        for sql in match_store.MATCH_STORE_INDEX_SQL:
+            c.execute(sql)
+        search.rebuild(c)
+        search.create_triggers(c)
+        c.execute("COMMIT")
+    except Exception:
+        c.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가상 대회 데이터 생성")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--tournaments", type=int, default=1)
+    parser.add_argument("--matches", type=int, default=1000, help="대회당 매치 수")
+    parser.add_argument("--groups", type=int, default=0)
+    parser.add_argument("--group-matches", type=int, default=0, help="모임당 매치 수")
+    parser.add_argument("--players", type=int, default=300)
+    parser.add_argument("--pending", type=int, default=0, help="현재 대회 대기 매치 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--end-date",
+        type=lambda value: datetime.strptime(value, "%Y-%m-%d").date(),
+        help="마지막(현재) 대회 날짜 YYYY-MM-DD (기본: 오늘)",
+    )
+    args = parser.parse_args()
+
+    with open(args.config, "r") as file:
+        config = yaml.safe_load(file)
+
+    elapsed = generate(
+        config,
+        args.db,
+        tournaments=args.tournaments,
+        matches=args.matches,
+        groups=args.groups,
+        group_matches=args.group_matches,
+        players=args.players,
+        pending=args.pending,
+        seed=args.seed,
+        end_date=args.end_date,
+    )
+    total = args.tournaments * args.matches + args.groups * args.group_matches
+    print(f"매치 {total}건 생성 {elapsed:.2f}s ({args.db})")
+
+
+if __name__ == "__main__":
+    main()
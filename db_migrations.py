@@ -0,0 +1,111 @@
+### 데이터베이스 스키마 마이그레이션
+
+# 이전 버전의 matches / unofficial_group_matches 테이블을 match_store 로 옮긴다.
+# 더 오래된 버전의 "%Y-%m-%d %H:%M:%S" (서울 시간) 문자열 date 컬럼은
+# 옮기면서 정수 epoch(created_at)로 변환한다.
+
+SEOUL_UTC_OFFSET = 9 * 60 * 60
+
+# (기존 테이블, event_type, event_name 컬럼, id 유지 여부)
+# 공식 대회 매치는 score_events 가 id 를 참조하므로 그대로 유지
+LEGACY_TABLES = [
+    ("matches", "official", "tournament_title", True),
+    ("unofficial_group_matches", "group", "group_name", False),
+]
+
+STORE_COLUMNS = [
+    "place",
+    "court",
+    "round_type",
+    "gender",
+    "match_type",
+    "player1",
+    "player2",
+    "score1",
+    "score2",
+    "status",
+    "started_at",
+    "finished_at",
+]
+
+
+def get_columns(conn, table_name):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table_name})")]
+
+
+def is_table(conn, name):
+    row = conn.execute(
+        "SELECT type FROM sqlite_master WHERE name = ?", (name,)
+    ).fetchone()
+    return row is not None and row[0] == "table"
+
+
+def legacy_tables(conn):
+    return [table for table in LEGACY_TABLES if is_table(conn, table[0])]
+
+
+# init_db 는 페이지를 실행할 때마다 돌므로 처음 뜰 때 여러 세션이 함께 올 수 있음.
+# 잠금 없이 먼저 보고(평소에는 여기서 끝), 쓰기 잠금을 잡은 뒤 다시 확인해서
+# 다른 세션이 이미 옮겼으면 그대로 끝냄
+def migrate_to_match_store(conn):
+    if not legacy_tables(conn):
+        return False
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        legacy = legacy_tables(conn)
+        if not legacy:
+            conn.execute("ROLLBACK")
+            return False
+        for table_name, event_type, name_column, keep_id in legacy:
+            columns = get_columns(conn, table_name)
+            copied = [column for column in STORE_COLUMNS if column in columns]
+            if "created_at" in columns:
+                created_at = "created_at"
+            else:
+                created_at = (
+                    f"CAST(strftime('%s', date) AS INTEGER) - {SEOUL_UTC_OFFSET}"
+                )
+            target = ["event_type", "event_name", "created_at"] + copied
+            source = ["?", name_column, created_at] + copied
+            if keep_id:
+                target.insert(0, "id")
+                source.insert(0, "id")
+            conn.execute(
+                f"""INSERT INTO match_store ({", ".join(target)})
+                         SELECT {", ".join(source)}
+                         FROM {table_name}
+                         ORDER BY id""",
+                (event_type,),
+            )
+            conn.execute(f"DROP TABLE {table_name}")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return True
+
+
+# 동시 수정 감지를 위한 version 컬럼 추가
+def add_version_column(conn):
+    if "version" in get_columns(conn, "match_store"):
+        return False
+    conn.execute(
+        "ALTER TABLE match_store ADD COLUMN version INTEGER NOT NULL DEFAULT 0"
+    )
+    # 호환용 뷰의 UPDATE 트리거가 version 을 올리도록 다시 만들게 함
+    conn.execute("DROP TRIGGER IF EXISTS matches_update")
+    conn.execute("DROP TRIGGER IF EXISTS unofficial_group_matches_update")
+    return True
+
+
+# 대기열 순서(queue_position) 컬럼 추가. 기존 매치는 0 이라 지금처럼 등록 순서를 따름
+def add_queue_position_column(conn):
+    if "queue_position" in get_columns(conn, "match_store"):
+        return False
+    conn.execute(
+        "ALTER TABLE match_store ADD COLUMN queue_position INTEGER NOT NULL DEFAULT 0"
+    )
+    # 대기열 색인은 queue_position 기준으로 새로 만듦
+    conn.execute("DROP INDEX IF EXISTS idx_match_store_queue")
+    return True
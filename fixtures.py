@@ -0,0 +1,143 @@
+### 모임 대진표 생성 (라운드 로빈 / 스위스 첫 라운드) 및 코트·시간 배정
+
+# 라운드 로빈은 원형 방식(한 명을 고정하고 나머지를 돌림)이라 라운드 수만 정하면
+# 모든 선수의 경기 수가 같아진다. 홀수 인원이면 라운드마다 한 명씩 쉬므로,
+# 라운드 수를 줄였을 때는 쉰 선수끼리 보충 라운드를 한 번 더 둬서 경기 수를 맞춘다.
+# 코트 배정은 시간 순서대로 슬롯을 채우는 탐욕법으로, 직전 슬롯에 뛴 선수는
+# 가능한 한 다음 슬롯에 넣지 않는다. 100명 이상도 수십 ms 안에 끝난다.
+
+import match_store
+
+ROUND_ROBIN = "라운드 로빈"
+SWISS = "스위스 1라운드"
+BYE = None
+
+
+# 원형 방식 라운드 로빈. rounds 를 주면 앞에서부터 그만큼만 (선수당 rounds 경기)
+# 홀수 인원이면 그 라운드들에서 쉰 선수끼리 아직 안 붙은 매치를 뒤 라운드에서 골라
+# 보충 라운드로 붙임 (인원과 rounds 가 모두 홀수면 한 명은 rounds - 1 경기)
+def round_robin_rounds(players, rounds=None):
+    players = list(players)
+    if len(players) % 2:
+        players.append(BYE)
+    count = len(players)
+    total = count - 1
+    rounds = total if rounds is None else min(rounds, total)
+
+    fixed, rotating = players[0], players[1:]
+    all_rounds = []
+    rested = []
+    for r in range(total):
+        line = [fixed] + rotating
+        pairs = [(line[i], line[count - 1 - i]) for i in range(count // 2)]
+        # 고정 선수가 매번 선수1 이 되지 않도록 라운드마다 좌우를 바꿈
+        if r % 2:
+            pairs[0] = pairs[0][::-1]
+        rested += [p2 if p1 is BYE else p1 for p1, p2 in pairs if BYE in (p1, p2)]
+        all_rounds.append([pair for pair in pairs if BYE not in pair])
+        rotating = rotating[-1:] + rotating[:-1]
+
+    result = all_rounds[:rounds]
+    waiting = set(rested[:rounds]) if rounds < total else set()
+    makeup = []
+    for pairs in all_rounds[rounds:]:
+        for player1, player2 in pairs:
+            if player1 in waiting and player2 in waiting:
+                makeup.append((player1, player2))
+                waiting -= {player1, player2}
+    if makeup:
+        result.append(makeup)
+    return result
+
+
+# 스위스 첫 라운드: 시드(명단 순서) 상위 절반과 하위 절반을 차례로 맞붙임
+def swiss_first_round(players):
+    players = list(players)
+    half = len(players) // 2
+    return [list(zip(players[:half], players[half : half * 2]))]
+
+
+# 라운드 순서를 지키면서 슬롯마다 코트 수만큼 매치를 채움
+# 직전 슬롯에 뛴 선수의 매치는 건너뛰고, 그러면 한 경기도 못 넣는 경우에만 허용
+# 배정된 매치는 지우지 않고 표시만 해서 (head 이후만 훑음) 매 슬롯 목록을 다시 만들지 않음
+def schedule(rounds, courts, start_at, slot_seconds):
+    matches = [
+        (round_no, player1, player2)
+        for round_no, pairs in enumerate(rounds, start=1)
+        for player1, player2 in pairs
+    ]
+    done = [False] * len(matches)
+    head = 0
+    fixtures = []
+    last_players = set()
+    slot = 0
+    while head < len(matches):
+        busy = set()
+        chosen = []
+        for rest_ok in (False, True):
+            index = head
+            while index < len(matches) and len(chosen) < courts:
+                _, player1, player2 = matches[index]
+                if not (
+                    done[index]
+                    or player1 in busy
+                    or player2 in busy
+                    or (
+                        not rest_ok
+                        and (player1 in last_players or player2 in last_players)
+                    )
+                ):
+                    chosen.append(index)
+                    done[index] = True
+                    busy.update((player1, player2))
+                index += 1
+            if chosen:
+                break
+
+        for court, index in enumerate(chosen, start=1):
+            round_no, player1, player2 = matches[index]
+            fixtures.append(
+                {
+                    "slot": slot + 1,
+                    "court": court,
+                    "start_at": start_at + slot * slot_seconds,
+                    "round": round_no,
+                    "player1": player1,
+                    "player2": player2,
+                }
+            )
+        while head < len(matches) and done[head]:
+            head += 1
+        last_players = busy
+        slot += 1
+    return fixtures
+
+
+def make_fixtures(players, mode, courts, start_at, slot_seconds, rounds=None):
+    players = [player for player in dict.fromkeys(players) if player]
+    if len(players) < 2:
+        return []
+    if mode == SWISS:
+        pairs = swiss_first_round(players)
+    else:
+        pairs = round_robin_rounds(players, rounds)
+    return schedule(pairs, courts, start_at, slot_seconds)
+
+
+# 배정 순서대로 한 트랜잭션에 등록 (대기열은 등록 순서 = 배정 순서)
+# 모임 매치는 코트 없이 그룹 대기열 하나로 진행하고 예정 시각 컬럼도 없으므로
+# 배정한 코트와 시작 시각은 저장하지 않음 (미리보기 표에서만 안내용으로 보여 줌)
+def register_fixtures(group_name, fixtures, actor=None):
+    return match_store.register_matches(
+        match_store.GROUP,
+        group_name,
+        [
+            {
+                "player1": fixture["player1"],
+                "player2": fixture["player2"],
+                "round_type": f"{fixture['round']}라운드",
+            }
+            for fixture in fixtures
+        ],
+        actor=actor,
+    )
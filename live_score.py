@@ -0,0 +1,210 @@
+### 실시간 점수 기록 (포인트 단위 이벤트 로그)
+
+import os
+import time
+import change_log
+import shards
+import storage
+
+# 데이터베이스 설정
+DB_FOLDER = "db"
+DB_FILE = "db.sqlite"
+DB_PATH = os.path.join(DB_FOLDER, DB_FILE)
+
+# 이벤트 몇 개마다 스냅샷을 갱신할지 (현재 점수 계산 시 읽는 꼬리 이벤트 수의 상한)
+SNAPSHOT_INTERVAL = 10
+
+
+# 샤딩을 켜면 매치 id 로 샤드 파일을 찾음
+def match_db_path(match_id):
+    if shards.enabled():
+        return shards.match_path(match_id)
+    return DB_PATH
+
+
+def connect_db(db_path=None):
+    # 코트마다 동시에 쓰기가 일어나므로 잠금 대기 시간을 넉넉하게 둔다
+    conn = storage.connect(db_path or DB_PATH, timeout=10, isolation_level=None)
+    if storage.backend() == storage.SQLITE:
+        conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+
+# 이벤트 로그 / 스냅샷 테이블 생성 (db_path: 샤드 파일을 만들 때)
+def init_db(db_path=None):
+    if storage.backend() == storage.POSTGRES:
+        storage.init_postgres()
+        return
+    if not os.path.exists(DB_FOLDER):
+        os.makedirs(DB_FOLDER)
+    conn = connect_db(db_path)
+    # WAL 모드: 점수 기록 중에도 코트 페이지 조회가 막히지 않도록
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS score_events
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  match_id INTEGER NOT NULL,
+                  player INTEGER NOT NULL,
+                  delta INTEGER NOT NULL,
+                  created_at REAL NOT NULL)"""
+    )
+    conn.execute(
+        """CREATE INDEX IF NOT EXISTS idx_score_events_match
+                 ON score_events (match_id, id)"""
+    )
+    conn.execute(
+        """CREATE TABLE IF NOT EXISTS score_snapshots
+                 (match_id INTEGER PRIMARY KEY,
+                  last_event_id INTEGER NOT NULL,
+                  score1 INTEGER NOT NULL,
+                  score2 INTEGER NOT NULL,
+                  updated_at REAL NOT NULL)"""
+    )
+    conn.close()
+
+
+# 스냅샷 + 스냅샷 이후 이벤트로 현재 점수 계산
+def _read_score(c, match_id):
+    c.execute(
+        """SELECT last_event_id, score1, score2
+                 FROM score_snapshots
+                 WHERE match_id = ?""",
+        (match_id,),
+    )
+    snapshot = c.fetchone()
+    last_event_id, score1, score2 = snapshot if snapshot else (0, 0, 0)
+
+    c.execute(
+        """SELECT COUNT(*), MAX(id),
+                  COALESCE(SUM(CASE WHEN player = 1 THEN delta END), 0),
+                  COALESCE(SUM(CASE WHEN player = 2 THEN delta END), 0)
+                 FROM score_events
+                 WHERE match_id = ? AND id > ?""",
+        (match_id, last_event_id),
+    )
+    tail_count, tail_last_id, tail1, tail2 = c.fetchone()
+    return {
+        "score1": score1 + tail1,
+        "score2": score2 + tail2,
+        "tail_count": tail_count,
+        "last_event_id": tail_last_id or last_event_id,
+    }
+
+
+def get_live_score(match_id):
+    conn = connect_db(match_db_path(match_id))
+    c = conn.cursor()
+    score = _read_score(c, match_id)
+    conn.close()
+    return score["score1"], score["score2"]
+
+
+# 포인트 기록 (delta = -1 은 직전 포인트 취소)
+def add_point(match_id, player, delta=1):
+    if player not in (1, 2):
+        raise ValueError("player는 1 또는 2 이어야 합니다.")
+
+    conn = connect_db(match_db_path(match_id))
+    c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
+    try:
+        score = _read_score(c, match_id)
+        current = score[f"score{player}"]
+        # 0점 아래로는 내려가지 않음
+        if current + delta < 0:
+            c.execute("ROLLBACK")
+            return score["score1"], score["score2"]
+
+        c.execute(
+            """INSERT INTO score_events (match_id, player, delta, created_at)
+                     VALUES (?, ?, ?, ?)""",
+            (match_id, player, delta, time.time()),
+        )
+        score[f"score{player}"] = current + delta
+        score["tail_count"] += 1
+        score["last_event_id"] = c.lastrowid
+
+        # 꼬리 이벤트가 쌓이면 스냅샷으로 접어서 조회 비용을 일정하게 유지
+        if score["tail_count"] >= SNAPSHOT_INTERVAL:
+            c.execute(
+                """INSERT INTO score_snapshots
+                         (match_id, last_event_id, score1, score2, updated_at)
+                         VALUES (?, ?, ?, ?, ?)
+                         ON CONFLICT (match_id) DO UPDATE
+                         SET last_event_id = excluded.last_event_id,
+                             score1 = excluded.score1, score2 = excluded.score2,
+                             updated_at = excluded.updated_at""",
+                (
+                    match_id,
+                    score["last_event_id"],
+                    score["score1"],
+                    score["score2"],
+                    time.time(),
+                ),
+            )
+        c.execute("COMMIT")
+    except Exception:
+        c.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return score["score1"], score["score2"]
+
+
+def get_score_events(match_id):
+    conn = connect_db(match_db_path(match_id))
+    c = conn.cursor()
+    c.execute(
+        """SELECT id, player, delta, created_at
+                 FROM score_events
+                 WHERE match_id = ?
+                 ORDER BY id""",
+        (match_id,),
+    )
+    events = c.fetchall()
+    conn.close()
+    return events
+
+
+# 경기 종료: 최종 점수를 match_store 에 기록 (이미 끝난 매치면 None)
+# 기록된 포인트가 없으면(0:0) 종료하지 않음
+def finish_live_match(match_id, actor=None):
+    conn = connect_db(match_db_path(match_id))
+    c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
+    try:
+        score = _read_score(c, match_id)
+        old = change_log.read_row(c, match_id)
+        # 첫 포인트 시각을 경기 시작 시각으로 기록
+        c.execute(
+            """SELECT created_at FROM score_events
+                     WHERE match_id = ? ORDER BY id LIMIT 1""",
+            (match_id,),
+        )
+        first_event = c.fetchone()
+        if first_event is None or score["score1"] == score["score2"] == 0:
+            raise ValueError("기록된 점수가 없어 경기를 종료할 수 없습니다.")
+        now = int(time.time())
+        started_at = int(first_event[0]) if first_event else now
+        c.execute(
+            """UPDATE match_store
+                     SET score1 = ?, score2 = ?, status = 'finished',
+                         started_at = COALESCE(started_at, ?), finished_at = ?,
+                         version = version + 1
+                     WHERE id = ? AND status = 'pending'""",
+            (score["score1"], score["score2"], started_at, now, match_id),
+        )
+        # 다른 곳에서 이미 결과가 입력(또는 삭제)된 경우
+        if c.rowcount != 1:
+            c.execute("ROLLBACK")
+            return None
+        change_log.record(
+            c, match_id, "result", old, change_log.read_row(c, match_id), actor
+        )
+        c.execute("COMMIT")
+    except Exception:
+        c.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return score["score1"], score["score2"]
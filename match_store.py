@@ -0,0 +1,524 @@
+### 공식 대회 / 비공식 그룹 공통 매치 저장소
+
+# 두 종류의 매치를 하나의 match_store 테이블에 저장하고 event_type 으로 구분한다.
+# 기존 matches / unofficial_group_matches 이름은 호환용 뷰로 남겨서
+# 조회 코드는 그대로 동작하고, 선수 전적은 한 번의 인덱스 조회로 끝난다.
+
+import os
+import time
+import db_migrations
+import change_log
+import search
+import shards
+import storage
+
+# 데이터베이스 설정
+DB_FOLDER = "db"
+DB_FILE = "db.sqlite"
+DB_PATH = os.path.join(DB_FOLDER, DB_FILE)
+
+# 매치 구분
+OFFICIAL = "official"
+GROUP = "group"
+
+# 시간은 모두 epoch 초(정수)로 저장
+MATCH_STORE_TABLE_SQL = """CREATE TABLE IF NOT EXISTS match_store
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  event_type TEXT NOT NULL,
+                  event_name TEXT,
+                  place TEXT,
+                  court TEXT,
+                  round_type TEXT,
+                  gender TEXT,
+                  match_type TEXT,
+                  player1 TEXT,
+                  player2 TEXT,
+                  score1 INTEGER,
+                  score2 INTEGER,
+                  status TEXT,
+                  created_at INTEGER,
+                  started_at INTEGER,
+                  finished_at INTEGER,
+                  version INTEGER NOT NULL DEFAULT 0,
+                  queue_position INTEGER NOT NULL DEFAULT 0)"""
+
+MATCH_STORE_INDEX_SQL = [
+    """CREATE INDEX IF NOT EXISTS idx_match_store_queue_position
+             ON match_store (event_type, event_name, place, court, status, queue_position)""",
+    """CREATE INDEX IF NOT EXISTS idx_match_store_status_created
+             ON match_store (event_type, status, created_at)""",
+    """CREATE INDEX IF NOT EXISTS idx_match_store_status_finished
+             ON match_store (event_type, status, finished_at)""",
+    """CREATE INDEX IF NOT EXISTS idx_match_store_player1
+             ON match_store (player1)""",
+    """CREATE INDEX IF NOT EXISTS idx_match_store_player2
+             ON match_store (player2)""",
+]
+
+# 결과 대기열(result_queue)이 반영한 멱등 키
+APPLIED_RESULTS_SQL = [
+    """CREATE TABLE IF NOT EXISTS applied_results
+             (idempotency_key TEXT PRIMARY KEY,
+              match_id INTEGER NOT NULL,
+              outcome TEXT NOT NULL,
+              applied_at REAL NOT NULL)""",
+    """CREATE INDEX IF NOT EXISTS idx_applied_results_time
+             ON applied_results (applied_at)""",
+]
+
+# 기존 테이블 이름으로 읽고 쓸 수 있도록 하는 호환용 뷰와 트리거
+COMPAT_VIEW_SQL = [
+    """CREATE VIEW IF NOT EXISTS matches AS
+             SELECT id, event_name AS tournament_title, place, court,
+                    round_type, gender, match_type, player1, player2,
+                    score1, score2, status, created_at, started_at, finished_at
+             FROM match_store
+             WHERE event_type = 'official'""",
+    """CREATE TRIGGER IF NOT EXISTS matches_insert
+             INSTEAD OF INSERT ON matches
+             BEGIN
+                 INSERT INTO match_store (id, event_type, event_name, place, court,
+                     round_type, gender, match_type, player1, player2,
+                     score1, score2, status, created_at, started_at, finished_at)
+                 VALUES (NEW.id, 'official', NEW.tournament_title, NEW.place, NEW.court,
+                     NEW.round_type, NEW.gender, NEW.match_type, NEW.player1, NEW.player2,
+                     NEW.score1, NEW.score2, NEW.status, NEW.created_at, NEW.started_at,
+                     NEW.finished_at);
+             END""",
+    """CREATE TRIGGER IF NOT EXISTS matches_update
+             INSTEAD OF UPDATE ON matches
+             BEGIN
+                 UPDATE match_store
+                 SET event_name = NEW.tournament_title, place = NEW.place,
+                     court = NEW.court, round_type = NEW.round_type,
+                     gender = NEW.gender, match_type = NEW.match_type,
+                     player1 = NEW.player1, player2 = NEW.player2,
+                     score1 = NEW.score1, score2 = NEW.score2, status = NEW.status,
+                     created_at = NEW.created_at, started_at = NEW.started_at,
+                     finished_at = NEW.finished_at, version = version + 1
+                 WHERE id = OLD.id;
+             END""",
+    """CREATE TRIGGER IF NOT EXISTS matches_delete
+             INSTEAD OF DELETE ON matches
+             BEGIN
+                 DELETE FROM match_store WHERE id = OLD.id;
+             END""",
+    """CREATE VIEW IF NOT EXISTS unofficial_group_matches AS
+             SELECT id, event_name AS group_name, player1, score1, player2, score2,
+                    status, created_at, started_at, finished_at
+             FROM match_store
+             WHERE event_type = 'group'""",
+    """CREATE TRIGGER IF NOT EXISTS unofficial_group_matches_insert
+             INSTEAD OF INSERT ON unofficial_group_matches
+             BEGIN
+                 INSERT INTO match_store (id, event_type, event_name, player1, score1,
+                     player2, score2, status, created_at, started_at, finished_at)
+                 VALUES (NEW.id, 'group', NEW.group_name, NEW.player1, NEW.score1,
+                     NEW.player2, NEW.score2, NEW.status, NEW.created_at,
+                     NEW.started_at, NEW.finished_at);
+             END""",
+    """CREATE TRIGGER IF NOT EXISTS unofficial_group_matches_update
+             INSTEAD OF UPDATE ON unofficial_group_matches
+             BEGIN
+                 UPDATE match_store
+                 SET event_name = NEW.group_name, player1 = NEW.player1,
+                     score1 = NEW.score1, player2 = NEW.player2, score2 = NEW.score2,
+                     status = NEW.status, created_at = NEW.created_at,
+                     started_at = NEW.started_at, finished_at = NEW.finished_at,
+                     version = version + 1
+                 WHERE id = OLD.id;
+             END""",
+    """CREATE TRIGGER IF NOT EXISTS unofficial_group_matches_delete
+             INSTEAD OF DELETE ON unofficial_group_matches
+             BEGIN
+                 DELETE FROM match_store WHERE id = OLD.id;
+             END""",
+]
+
+
+# 대기열 순서 간격: 새 매치는 맨 뒤 + QUEUE_GAP, 옮길 때는 앞뒤 값의 가운데를 써서
+# 옮긴 매치 한 행만 고친다. 가운데가 남지 않을 때만 그 대기열을 다시 번호 매김
+QUEUE_GAP = 1024
+
+
+# 데이터베이스 연결 및 테이블 생성 함수 (db_path: 샤드 파일을 만들 때)
+def init_db(db_path=None):
+    if storage.backend() == storage.POSTGRES:
+        storage.init_postgres()
+        return
+    db_path = db_path or DB_PATH
+    folder = os.path.dirname(db_path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    conn = storage.connect(db_path)
+    c = conn.cursor()
+    # WAL 모드: 여러 관리자/코트의 쓰기와 조회가 서로 덜 막히도록
+    c.execute("PRAGMA journal_mode = WAL")
+    c.execute(MATCH_STORE_TABLE_SQL)
+    # 이전 버전의 matches / unofficial_group_matches 테이블을 옮김
+    db_migrations.migrate_to_match_store(conn)
+    db_migrations.add_version_column(conn)
+    db_migrations.add_queue_position_column(conn)
+    for sql in MATCH_STORE_INDEX_SQL + COMPAT_VIEW_SQL:
+        c.execute(sql)
+    change_log.init_db(conn)
+    search.init_db(conn)
+    for sql in APPLIED_RESULTS_SQL:
+        c.execute(sql)
+    conn.commit()
+    conn.close()
+
+
+# 샤딩을 켜면 대회/모임별 파일, 아니면 기존 단일 DB
+def event_db_path(event_type, event_name):
+    if shards.enabled():
+        return shards.event_path(event_type, event_name)
+    return DB_PATH
+
+
+def match_db_path(match_id):
+    if shards.enabled():
+        return shards.match_path(match_id)
+    return DB_PATH
+
+
+def register_match(
+    event_type,
+    event_name,
+    player1,
+    player2,
+    place=None,
+    court=None,
+    round_type=None,
+    gender=None,
+    match_type=None,
+    actor=None,
+):
+    conn = storage.connect(event_db_path(event_type, event_name))
+    c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
+    c.execute(
+        """INSERT INTO match_store (event_type, event_name, place, court, round_type, gender, match_type, player1, player2, created_at, status, queue_position)
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (
+            event_type,
+            event_name,
+            place,
+            court,
+            round_type,
+            gender,
+            match_type,
+            player1,
+            player2,
+            int(time.time()),
+            "pending",
+            next_queue_position(c, event_type, event_name, place, court),
+        ),
+    )
+    match_id = c.lastrowid
+    change_log.record(
+        c, match_id, "insert", None, change_log.read_row(c, match_id), actor
+    )
+    conn.commit()
+    conn.close()
+    return match_id
+
+
+# 여러 매치를 한 트랜잭션으로 등록 (matches: register_match 인자 dict 목록)
+# 대기열은 목록 순서를 그대로 따른다
+def register_matches(event_type, event_name, matches, actor=None):
+    now = int(time.time())
+    conn = storage.connect(event_db_path(event_type, event_name))
+    c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
+    match_ids = []
+    for match in matches:
+        c.execute(
+            """INSERT INTO match_store (event_type, event_name, place, court, round_type, gender, match_type, player1, player2, created_at, status, queue_position)
+                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (
+                event_type,
+                event_name,
+                match.get("place"),
+                match.get("court"),
+                match.get("round_type"),
+                match.get("gender"),
+                match.get("match_type"),
+                match["player1"],
+                match["player2"],
+                now,
+                "pending",
+                next_queue_position(
+                    c, event_type, event_name, match.get("place"), match.get("court")
+                ),
+            ),
+        )
+        match_id = c.lastrowid
+        change_log.record(
+            c, match_id, "insert", None, change_log.read_row(c, match_id), actor
+        )
+        match_ids.append(match_id)
+    conn.commit()
+    conn.close()
+    return match_ids
+
+
+# NULL 도 같은 값으로 비교하는 조건
+# (PostgreSQL 은 IS ? 를 IS NOT DISTINCT FROM 으로 바꾸는데 이건 색인을 못 타므로 값이 있으면 =)
+def same_value(column, value):
+    if value is None:
+        return f"{column} IS NULL", ()
+    return f"{column} = ?", (value,)
+
+
+# 한 코트(그룹)의 대기열 조건
+def queue_condition(event_type, event_name, place, court):
+    place_condition, place_params = same_value("place", place)
+    court_condition, court_params = same_value("court", court)
+    return (
+        f"""event_type = ? AND event_name = ?
+                   AND {place_condition} AND {court_condition}
+                   AND status = 'pending'""",
+        (event_type, event_name, *place_params, *court_params),
+    )
+
+
+# 대기열 맨 뒤 순서 값 (호출한 쪽의 쓰기 트랜잭션 안에서)
+def next_queue_position(c, event_type, event_name, place, court):
+    condition, params = queue_condition(event_type, event_name, place, court)
+    c.execute(
+        f"SELECT COALESCE(MAX(queue_position), 0) FROM match_store WHERE {condition}",
+        params,
+    )
+    return c.fetchone()[0] + QUEUE_GAP
+
+
+# 같은 순서 값(마이그레이션 전 매치는 모두 0)이면 등록 순서
+def get_pending_matches(event_type, event_name, place=None, court=None):
+    condition, params = queue_condition(event_type, event_name, place, court)
+    conn = storage.connect(event_db_path(event_type, event_name))
+    c = conn.cursor()
+    c.execute(
+        f"""SELECT id, round_type, gender, match_type, player1, player2, version
+                 FROM match_store
+                 WHERE {condition}
+                 ORDER BY queue_position, created_at, id""",
+        params,
+    )
+    matches = c.fetchall()
+    conn.close()
+    return matches
+
+
+# 옮길 위치 앞뒤 순서 값의 가운데. 끝이면 한 간격 바깥, 가운데가 없으면 None
+def position_between(before, after):
+    if before is None and after is None:
+        return QUEUE_GAP
+    if before is None:
+        return after - QUEUE_GAP
+    if after is None:
+        return before + QUEUE_GAP
+    if after - before < 2:
+        return None
+    return (before + after) // 2
+
+
+# 대기 매치를 대기열의 index 번째(0 부터)로 옮김. 대기 중이 아니면 False
+# 보통은 옮긴 매치 한 행만 쓰고, 간격이 다 찬 경우에만 대기열 전체를 QUEUE_GAP 간격으로 다시 매김
+def move_match(match_id, index, actor=None):
+    conn = storage.connect(match_db_path(match_id))
+    c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
+    c.execute(
+        """SELECT event_type, event_name, place, court
+                 FROM match_store
+                 WHERE id = ? AND status = 'pending'""",
+        (match_id,),
+    )
+    row = c.fetchone()
+    if row is None:
+        conn.rollback()
+        conn.close()
+        return False
+    condition, params = queue_condition(*row)
+    c.execute(
+        f"""SELECT id, queue_position
+                 FROM match_store
+                 WHERE {condition} AND id != ?
+                 ORDER BY queue_position, created_at, id""",
+        (*params, match_id),
+    )
+    others = c.fetchall()
+    index = max(0, min(index, len(others)))
+    before = others[index - 1][1] if index > 0 else None
+    after = others[index][1] if index < len(others) else None
+    position = position_between(before, after)
+    if position is None:
+        queue = [other_id for other_id, _ in others]
+        queue.insert(index, match_id)
+        positions = dict(others)
+        moves = [
+            (queue_id, (i + 1) * QUEUE_GAP)
+            for i, queue_id in enumerate(queue)
+            if positions.get(queue_id) != (i + 1) * QUEUE_GAP
+        ]
+    else:
+        moves = [(match_id, position)]
+    # 순서만 바뀌므로 version 은 그대로 (열려 있는 수정/결과 입력 창과 충돌하지 않게)
+    for queue_id, queue_position in moves:
+        old = change_log.read_row(c, queue_id)
+        c.execute(
+            "UPDATE match_store SET queue_position = ? WHERE id = ?",
+            (queue_position, queue_id),
+        )
+        change_log.record(
+            c, queue_id, "move", old, change_log.read_row(c, queue_id), actor
+        )
+    conn.commit()
+    conn.close()
+    return True
+
+
+# 시작 시각이 기록되지 않은 매치는 같은 코트(그룹)의 직전 매치 종료 시각(없으면 등록 시각)을 시작으로 본다
+def finish_times(c, match_id):
+    now = int(time.time())
+    # m 은 한 행이라 MAX(m.created_at) 는 그 값 (PostgreSQL 은 집계 없는 컬럼을 같이 못 씀)
+    c.execute(
+        """SELECT MAX(prev.finished_at), MAX(m.created_at)
+                 FROM match_store m
+                 LEFT JOIN match_store prev
+                   ON prev.event_type = m.event_type
+                  AND prev.event_name = m.event_name
+                  AND prev.place IS m.place
+                  AND prev.court IS m.court
+                  AND prev.status = 'finished'
+                  AND prev.finished_at <= ?
+                 WHERE m.id = ?""",
+        (now, match_id),
+    )
+    prev_finished_at, created_at = c.fetchone()
+    started_at = max(filter(None, (prev_finished_at, created_at)), default=now)
+    return started_at, now
+
+
+# 낙관적 동시성 제어: version 을 넘기면 그 사이 다른 수정이 없을 때만 반영한다.
+# 반영되면 True, 다른 관리자가 먼저 수정(또는 삭제)했으면 False 를 돌려준다.
+def version_condition(version):
+    if version is None:
+        return "", ()
+    return " AND version = ?", (version,)
+
+
+# 변경 전후 값을 읽어서 변경 기록을 남기고 커밋
+def commit_change(conn, c, match_id, action, old, changed, actor):
+    if changed:
+        new = change_log.read_row(c, match_id) if action != "delete" else None
+        change_log.record(c, match_id, action, old, new, actor)
+    conn.commit()
+    conn.close()
+    return changed
+
+
+# 결과 반영 (호출한 쪽의 트랜잭션 안에서, 여러 결과를 한 번에 반영할 때도 사용)
+def apply_result(c, match_id, score1, score2, version=None, actor=None):
+    condition, params = version_condition(version)
+    old = change_log.read_row(c, match_id)
+    c.execute(
+        f"""UPDATE match_store
+                 SET score1 = ?, score2 = ?, status = 'finished',
+                     started_at = COALESCE(started_at, ?), finished_at = ?,
+                     version = version + 1
+                 WHERE id = ?{condition}""",
+        (score1, score2, *finish_times(c, match_id), match_id, *params),
+    )
+    if c.rowcount != 1:
+        return False
+    change_log.record(c, match_id, "result", old, change_log.read_row(c, match_id), actor)
+    return True
+
+
+def input_result(match_id, score1, score2, version=None, actor=None):
+    conn = storage.connect(match_db_path(match_id))
+    c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
+    changed = apply_result(c, match_id, score1, score2, version, actor)
+    conn.commit()
+    conn.close()
+    return changed
+
+
+def delete_match(match_id, version=None, actor=None):
+    condition, params = version_condition(version)
+    conn = storage.connect(match_db_path(match_id))
+    c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
+    old = change_log.read_row(c, match_id)
+    c.execute(f"DELETE FROM match_store WHERE id = ?{condition}", (match_id, *params))
+    return commit_change(conn, c, match_id, "delete", old, c.rowcount == 1, actor)
+
+
+# 수정 가능한 컬럼만 갱신
+EDITABLE_COLUMNS = ("round_type", "gender", "match_type", "player1", "player2")
+
+
+def update_match(match_id, version=None, actor=None, **fields):
+    columns = [column for column in EDITABLE_COLUMNS if column in fields]
+    condition, params = version_condition(version)
+    conn = storage.connect(match_db_path(match_id))
+    c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
+    old = change_log.read_row(c, match_id)
+    c.execute(
+        f"""UPDATE match_store
+                 SET {"".join(f"{column} = ?, " for column in columns)}version = version + 1
+                 WHERE id = ?{condition}""",
+        (*(fields[column] for column in columns), match_id, *params),
+    )
+    return commit_change(conn, c, match_id, "update", old, c.rowcount == 1, actor)
+
+
+def get_match_info(match_id):
+    conn = storage.connect(match_db_path(match_id))
+    c = conn.cursor()
+    c.execute(
+        """SELECT round_type, gender, match_type, player1, player2, version
+                 FROM match_store
+                 WHERE id = ?""",
+        (match_id,),
+    )
+    match = c.fetchone()
+    conn.close()
+    return {
+        "round_type": match[0],
+        "gender": match[1],
+        "match_type": match[2],
+        "player1": match[3],
+        "player2": match[4],
+        "version": match[5],
+    }
+
+
+# 공식 대회와 그룹 매치를 합친 선수 전적 (player1 / player2 인덱스 사용)
+PLAYER_MATCHES_SQL = """SELECT id, event_type, event_name, round_type, player1, score1,
+                  score2, player2, status, finished_at
+                 FROM match_store WHERE player1 = ?
+           UNION ALL
+           SELECT id, event_type, event_name, round_type, player1, score1,
+                  score2, player2, status, finished_at
+                 FROM match_store WHERE player2 = ? AND player1 IS NOT ?
+           ORDER BY finished_at, id"""
+
+
+def get_player_matches(player_name):
+    params = (player_name, player_name, player_name)
+    # 샤딩 중이면 모든 샤드를 동시에 조회해서 같은 순서로 합침
+    if shards.enabled():
+        matches = shards.fan_out(PLAYER_MATCHES_SQL, params)
+        matches.sort(key=lambda match: (match[9] is not None, match[9] or 0, match[0]))
+        return matches
+    conn = storage.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute(PLAYER_MATCHES_SQL, params)
+    matches = c.fetchall()
+    conn.close()
+    return matches
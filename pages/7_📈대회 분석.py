@@ -0,0 +1,289 @@
+import streamlit as st
+import sqlite3
+import pandas as pd
+import os
+import threading
+import pytz
+import plotly.express as px
+import match_store
+import shards
+import storage
+
+# 데이터베이스 설정
+DB_FOLDER = "db"
+DB_FILE = "db.sqlite"
+DB_PATH = os.path.join(DB_FOLDER, DB_FILE)
+
+# 차트 하나에 보내는 최대 포인트 수 (긴 기간은 구간을 넓혀서 줄임)
+MAX_POINTS = 200
+MIN_BUCKET_SECONDS = 15 * 60
+
+# 페이지 설정
+st.set_page_config(page_title="스쿼시 토너먼트 - 분석", page_icon="📈", layout="wide")
+
+# 서울 시간대 설정
+seoul_tz = pytz.timezone("Asia/Seoul")
+
+# 집계 SQL 이 SQLite 함수(date, 두 인자 MIN)를 쓰므로 SQLite 저장소에서만 제공
+if storage.backend() != storage.SQLITE:
+    st.info("대회 분석은 SQLite 저장소에서만 사용할 수 있습니다.")
+    st.stop()
+
+
+# 같은 집계 SQL 을 기존 DB (샤딩 중이면 대회 샤드 모두) 에서 실행해서 이어 붙임
+# 샤드마다 나온 부분 합은 호출한 쪽에서 다시 더함
+def read_all(sql, params=()):
+    if shards.enabled():
+        frames = shards.map_shards(
+            lambda conn: pd.read_sql_query(sql, conn, params=params),
+            shards.all_paths(match_store.OFFICIAL),
+        )
+        return pd.concat(frames, ignore_index=True)
+    conn = sqlite3.connect(DB_PATH)
+    df = pd.read_sql_query(sql, conn, params=params)
+    conn.close()
+    return df
+
+
+# 샤드마다 나온 부분 합을 키별로 더함 (빈 결과에서도 컬럼이 남도록 numeric_only=False)
+def add_up(df, keys, columns):
+    return df.groupby(keys, as_index=False, dropna=False)[columns].sum(
+        numeric_only=False
+    )
+
+
+# 파일마다 계속 열어 두는 연결 (PRAGMA data_version 은 같은 연결에서 비교해야 의미가 있음)
+@st.cache_resource
+def get_version_connection(path):
+    return sqlite3.connect(path, check_same_thread=False), threading.Lock()
+
+
+# 데이터 버전: 파일마다 PRAGMA data_version (다른 연결이 커밋하면 바뀜)
+# 매치 수가 그대로인 점수 / 시각 수정도 감지하고, 테이블을 훑지 않음
+def get_data_version():
+    paths = shards.all_paths(match_store.OFFICIAL) if shards.enabled() else [DB_PATH]
+    version = []
+    for path in paths:
+        conn, lock = get_version_connection(path)
+        with lock:
+            version.append((path, conn.execute("PRAGMA data_version").fetchone()[0]))
+    return tuple(version)
+
+
+# 시간 구간 크기: 전체 기간을 MAX_POINTS 개 이하로 나누는 15분 단위
+def get_bucket_seconds(min_ts, max_ts):
+    if not min_ts or not max_ts:
+        return MIN_BUCKET_SECONDS
+    buckets = -(-(max_ts - min_ts) // (MIN_BUCKET_SECONDS * MAX_POINTS))
+    return MIN_BUCKET_SECONDS * max(1, buckets)
+
+
+# 일정 간격으로 건너뛰며 포인트 수를 줄임 (마지막 값은 유지)
+def downsample(df, max_points=MAX_POINTS):
+    if len(df) <= max_points:
+        return df
+    step = -(-len(df) // max_points)
+    return pd.concat([df.iloc[::step], df.iloc[[-1]]]).drop_duplicates()
+
+
+def to_local_time(series):
+    return pd.to_datetime(series, unit="s", utc=True).dt.tz_convert(seoul_tz)
+
+
+# 요약 데이터는 데이터 버전마다 한 번만 계산 (집계는 SQL 에서)
+@st.cache_data(max_entries=4)
+def load_summaries(version):
+    bounds = read_all(
+        """SELECT MIN(started_at) AS min_ts, MAX(started_at) AS max_ts
+                 FROM matches
+                 WHERE status = 'finished' AND started_at IS NOT NULL"""
+    )
+    min_ts, max_ts = bounds["min_ts"].min(), bounds["max_ts"].max()
+    if pd.isna(min_ts) or pd.isna(max_ts):
+        bucket = MIN_BUCKET_SECONDS
+    else:
+        bucket = get_bucket_seconds(int(min_ts), int(max_ts))
+
+    utilization = read_all(
+        """SELECT place || ' ' || court AS court_name,
+                  (started_at / :bucket) * :bucket AS bucket,
+                  SUM(finished_at - started_at) AS busy_seconds
+           FROM matches
+           WHERE status = 'finished' AND started_at IS NOT NULL
+           GROUP BY place, court, bucket""",
+        {"bucket": bucket},
+    )
+    utilization = add_up(utilization, ["court_name", "bucket"], ["busy_seconds"])
+    utilization = utilization.sort_values("bucket", kind="stable", ignore_index=True)
+    utilization["utilization"] = (utilization.pop("busy_seconds") / bucket).clip(
+        upper=1.0
+    )
+    durations = read_all(
+        """SELECT round_type, gender, match_type,
+                  COUNT(*) AS matches,
+                  SUM(finished_at - started_at) AS total_seconds
+           FROM matches
+           WHERE status = 'finished' AND started_at IS NOT NULL
+           GROUP BY round_type, gender, match_type"""
+    )
+    durations = add_up(
+        durations, ["round_type", "gender", "match_type"], ["matches", "total_seconds"]
+    )
+    durations["avg_minutes"] = durations.pop("total_seconds") / durations["matches"] / 60
+    scores = read_all(
+        """SELECT ABS(score1 - score2) AS margin,
+                  MIN(score1, score2) AS loser_score,
+                  COUNT(*) AS matches
+           FROM matches
+           WHERE status = 'finished'
+           GROUP BY margin, loser_score"""
+    )
+    scores = add_up(scores, ["margin", "loser_score"], ["matches"])
+    progression = read_all(
+        """SELECT player, date(finished_at, 'unixepoch', '+9 hours') AS day,
+                  SUM(won) AS wins, COUNT(*) AS played,
+                  COALESCE(SUM(points_for - points_against), 0) AS point_diff
+           FROM (SELECT player1 AS player, finished_at, score1 > score2 AS won,
+                        score1 AS points_for, score2 AS points_against
+                 FROM matches WHERE status = 'finished'
+                 UNION ALL
+                 SELECT player2, finished_at, score2 > score1,
+                        score2, score1
+                 FROM matches WHERE status = 'finished')
+           WHERE finished_at IS NOT NULL
+           GROUP BY player, day"""
+    )
+    progression = add_up(
+        progression, ["player", "day"], ["wins", "played", "point_diff"]
+    )
+
+    utilization["bucket"] = to_local_time(utilization["bucket"])
+    progression["day"] = pd.to_datetime(progression["day"])
+    progression = progression.astype(
+        {"wins": "int64", "played": "int64", "point_diff": "int64"}
+    )
+    progression["cumulative_wins"] = progression.groupby("player")["wins"].cumsum()
+    progression["cumulative_diff"] = progression.groupby("player")[
+        "point_diff"
+    ].cumsum()
+
+    return {
+        "bucket_minutes": bucket // 60,
+        "utilization": utilization,
+        "durations": durations,
+        "scores": scores,
+        "progression": progression,
+    }
+
+
+st.title("대회 분석")
+
+if st.button("데이터 새로고침", type="primary"):
+    load_summaries.clear()
+    st.rerun()
+
+summaries = load_summaries(get_data_version())
+
+tab1, tab2, tab3, tab4 = st.tabs(["코트 사용률", "경기 시간", "점수 분포", "선수 기록"])
+
+with tab1:
+    st.header("코트 사용률")
+    utilization = summaries["utilization"]
+    if utilization.empty:
+        st.info("시작/종료 시각이 기록된 매치가 없습니다.")
+    else:
+        st.caption(f"{summaries['bucket_minutes']}분 단위")
+        fig = px.line(
+            utilization,
+            x="bucket",
+            y="utilization",
+            color="court_name",
+            labels={"bucket": "시간", "utilization": "사용률", "court_name": "코트"},
+        )
+        fig.update_yaxes(tickformat=".0%", range=[0, 1])
+        st.plotly_chart(fig, use_container_width=True)
+
+with tab2:
+    st.header("평균 경기 시간")
+    durations = summaries["durations"]
+    if durations.empty:
+        st.info("시작/종료 시각이 기록된 매치가 없습니다.")
+    else:
+        group_by = st.selectbox(
+            "기준",
+            ["round_type", "gender", "match_type"],
+            format_func={
+                "round_type": "라운드",
+                "gender": "성별",
+                "match_type": "매치 타입",
+            }.get,
+        )
+        # 가중 평균으로 세부 그룹을 다시 묶음 (원본 데이터는 다시 읽지 않음)
+        grouped = (
+            durations.assign(total=durations["avg_minutes"] * durations["matches"])
+            .groupby(group_by, as_index=False)[["total", "matches"]]
+            .sum()
+        )
+        grouped["avg_minutes"] = grouped["total"] / grouped["matches"]
+        fig = px.bar(
+            grouped,
+            x=group_by,
+            y="avg_minutes",
+            text="matches",
+            labels={group_by: "", "avg_minutes": "평균 경기 시간(분)"},
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+with tab3:
+    st.header("점수 분포")
+    scores = summaries["scores"]
+    if scores.empty:
+        st.info("완료된 매치가 없습니다.")
+    else:
+        col1, col2 = st.columns(2)
+        with col1:
+            fig = px.bar(
+                scores.groupby("margin", as_index=False)["matches"].sum(),
+                x="margin",
+                y="matches",
+                labels={"margin": "점수 차", "matches": "매치 수"},
+            )
+            st.plotly_chart(fig, use_container_width=True)
+        with col2:
+            fig = px.bar(
+                scores.groupby("loser_score", as_index=False)["matches"].sum(),
+                x="loser_score",
+                y="matches",
+                labels={"loser_score": "패자 점수", "matches": "매치 수"},
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+with tab4:
+    st.header("선수 기록")
+    progression = summaries["progression"]
+    players = st.multiselect("선수 선택", sorted(progression["player"].unique()))
+    if players:
+        selected = progression[progression["player"].isin(players)]
+        selected = pd.concat(
+            downsample(rows) for _, rows in selected.groupby("player")
+        )
+        metric = st.radio(
+            "지표",
+            ["cumulative_wins", "cumulative_diff"],
+            format_func={
+                "cumulative_wins": "누적 승수",
+                "cumulative_diff": "누적 득실차",
+            }.get,
+            horizontal=True,
+        )
+        fig = px.line(
+            selected,
+            x="day",
+            y=metric,
+            color="player",
+            markers=True,
+            labels={"day": "날짜", metric: "", "player": "선수"},
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("기록을 볼 선수를 선택하세요.")
@@ -1,7 +1,13 @@
 import streamlit as st
-import sqlite3
 import pandas as pd
 import os
+from datetime import datetime, timedelta
+import pytz
+import archive
+import match_store
+import search
+import shards
+import storage
 
 # 데이터베이스 설정
 DB_FOLDER = "db"
@@ -12,14 +18,67 @@ DB_PATH = os.path.join(DB_FOLDER, DB_FILE)
 st.set_page_config(page_title="스쿼시 토너먼트 - 통계", page_icon="📊", layout="wide")
 
 
-# 데이터베이스에서 데이터 가져오기
-@st.cache_data(ttl=60)  # 1분마다 자동으로 캐시 무효화
-def load_data():
-    conn = sqlite3.connect(DB_PATH)
-    query = "SELECT * FROM matches WHERE status = 'finished'"  # 완료된 매치만 선택
-    df = pd.read_sql_query(query, conn)
+# 서울 시간대 설정
+seoul_tz = pytz.timezone("Asia/Seoul")
+
+
+# 완료된 매치의 날짜 범위 (인덱스만 사용)
+@st.cache_data(ttl=60)
+def load_date_bounds():
+    query = """SELECT MIN(created_at), MAX(created_at)
+               FROM matches
+               WHERE status = 'finished'"""
+    # 샤딩 중이면 대회 샤드마다 구해서 합침
+    if shards.enabled():
+        bounds = shards.fan_out(query, paths=shards.all_paths(match_store.OFFICIAL))
+        starts = [start for start, _ in bounds if start is not None]
+        ends = [end for _, end in bounds if end is not None]
+        return min(starts, default=None), max(ends, default=None)
+    conn = storage.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute(query)
+    bounds = c.fetchone()
     conn.close()
-    df["date"] = pd.to_datetime(df["date"])
+    return bounds
+
+
+# 서울 기준 날짜를 epoch 초로 변환
+def to_epoch(day):
+    return int(seoul_tz.localize(datetime.combine(day, datetime.min.time())).timestamp())
+
+
+# 데이터베이스에서 데이터 가져오기 (기간 필터는 SQL 에서 처리)
+@st.cache_data(ttl=60)  # 1분마다 자동으로 캐시 무효화
+def load_data(start_ts, end_ts):
+    query = """SELECT * FROM matches
+               WHERE status = 'finished' AND created_at >= ? AND created_at < ?"""  # 완료된 매치만 선택
+    # 샤딩 중이면 대회 샤드를 동시에 읽어서 이어 붙임
+    if shards.enabled():
+        frames = shards.map_shards(
+            lambda conn: pd.read_sql_query(query, conn, params=(start_ts, end_ts)),
+            shards.all_paths(match_store.OFFICIAL),
+        )
+        return arrange_columns(pd.concat(frames, ignore_index=True))
+    # 나눠서 받아 행 튜플을 한꺼번에 들고 있지 않음 (PostgreSQL 은 서버 쪽 커서)
+    df = storage.read_frame(query, (start_ts, end_ts), DB_PATH)
+    return arrange_columns(df)
+
+
+# 지난 시즌은 아카이브 파일에서만 읽음 (라이브 DB 를 건드리지 않음)
+# cache_data 는 세션마다 복사본을 돌려주므로 한 사용자의 필터가 다른 사용자에게 새지 않음
+@st.cache_data
+def load_archived_data(tournament_title):
+    df = archive.load_archive(tournament_title)
+    return arrange_columns(df[df["status"] == "finished"])
+
+
+def arrange_columns(df):
+    # 정수 epoch 변환이라 문자열 파싱 비용이 없음
+    df = df.assign(
+        date=pd.to_datetime(df["created_at"], unit="s", utc=True).dt.tz_convert(
+            seoul_tz
+        )
+    )
 
     # 컬럼 순서 변경
     columns_order = [
@@ -42,11 +101,28 @@ def load_data():
     return df
 
 
-# 데이터 로드
-df = load_data()
-
 st.title("데이터 확인 페이지")
 
+# 시즌 선택: 현재 대회는 라이브 DB, 지난 대회는 아카이브에서 조회
+season = st.selectbox("시즌", ["현재 대회"] + archive.list_archived_tournaments())
+
+if season == "현재 대회":
+    # 기간 선택
+    min_ts, max_ts = load_date_bounds()
+    today = datetime.now(seoul_tz).date()
+    min_day = datetime.fromtimestamp(min_ts, seoul_tz).date() if min_ts else today
+    max_day = datetime.fromtimestamp(max_ts, seoul_tz).date() if max_ts else today
+    date_range = st.date_input("기간", value=(min_day, max_day))
+    if len(date_range) == 2:
+        start_day, end_day = date_range
+    else:
+        start_day = end_day = date_range[0]
+
+    # 데이터 로드
+    df = load_data(to_epoch(start_day), to_epoch(end_day + timedelta(days=1)))
+else:
+    df = load_archived_data(season)
+
 # 새로고침 버튼
 if st.button("데이터 새로고침", type="primary"):
     st.cache_data.clear()
@@ -105,7 +181,19 @@ def display_filtered_data(
         filtered_df = filtered_df[filtered_df["gender"] == selected_gender]
     if selected_match_type != "전체":
         filtered_df = filtered_df[filtered_df["match_type"] == selected_match_type]
-    if player_name:
+    if player_name and season == "현재 대회":
+        # 라이브 DB 는 FTS 색인으로 찾고 관련도 순으로 정렬
+        ids = search.search_ids(
+            player_name,
+            event_type=match_store.OFFICIAL,
+            status="finished",
+            columns=search.PLAYER_COLUMNS,
+        )
+        rank = {match_id: i for i, match_id in enumerate(ids)}
+        filtered_df = filtered_df[filtered_df["id"].isin(ids)].sort_values(
+            "id", key=lambda column: column.map(rank)
+        )
+    elif player_name:
         filtered_df = filtered_df[
             (filtered_df["player1"].str.contains(player_name, case=False))
             | (filtered_df["player2"].str.contains(player_name, case=False))
@@ -115,8 +203,43 @@ def display_filtered_data(
     st.dataframe(filtered_df)
 
 
+# 공식 대회 + 그룹 매치를 합친 선수 전적
+def display_player_record(player_name):
+    record = pd.DataFrame(
+        match_store.get_player_matches(player_name),
+        columns=[
+            "id",
+            "event_type",
+            "event_name",
+            "round_type",
+            "player1",
+            "score1",
+            "score2",
+            "player2",
+            "status",
+            "finished_at",
+        ],
+    )
+    finished = record[record["status"] == "finished"]
+    is_player1 = finished["player1"] == player_name
+    wins = (
+        (is_player1 & (finished["score1"] > finished["score2"]))
+        | (~is_player1 & (finished["score2"] > finished["score1"]))
+    ).sum()
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("경기 수", len(finished))
+    col2.metric("승", int(wins))
+    col3.metric("패", len(finished) - int(wins))
+
+    record["finished_at"] = pd.to_datetime(
+        record["finished_at"], unit="s", utc=True
+    ).dt.tz_convert(seoul_tz)
+    st.dataframe(record)
+
+
 # 탭 생성
-tab1, tab2 = st.tabs(["검색 정보", "상세 데이터"])
+tab1, tab2, tab3 = st.tabs(["검색 정보", "상세 데이터", "선수 전적"])
 
 with tab1:
     st.header("필터 옵션")
@@ -129,3 +252,9 @@ with tab1:
 with tab2:
     st.header("전체 데이터")
     st.dataframe(df)
+
+with tab3:
+    st.header("선수 전적 (공식 대회 + 모임)")
+    record_player = st.text_input("선수 이름", key="record_player")
+    if record_player:
+        display_player_record(record_player)
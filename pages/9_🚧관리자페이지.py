@@ -1,8 +1,16 @@
 import streamlit as st
-import sqlite3
-import pandas as pd
 import os
 import yaml
+import archive
+import backup
+import change_log
+import session_memory
+import search
+import shards
+import storage
+import json
+from datetime import datetime
+import pytz
 
 
 # 설정 파일 로드
@@ -18,6 +26,21 @@ DB_FOLDER = "db"
 DB_FILE = "db.sqlite"
 DB_PATH = os.path.join(DB_FOLDER, DB_FILE)
 
+# 서울 시간대 설정
+seoul_tz = pytz.timezone("Asia/Seoul")
+
+# 변경 기록에 남길 작성자
+ADMIN_ACTOR = "관리자페이지"
+
+# 변경 기록 한 페이지에 보여줄 건수
+CHANGE_LOG_PAGE_SIZE = 50
+
+# 매치 검색 결과 최대 건수
+SEARCH_LIMIT = 200
+
+# 편집 / 삭제 대상에서 빼는 감사 기록 테이블 (변경 기록은 아래 조회 화면에서만 봄)
+AUDIT_TABLES = ("change_log", "applied_results")
+
 # 페이지 설정
 st.set_page_config(page_title="데이터베이스 관리", page_icon="🛠️", layout="wide")
 
@@ -44,73 +67,388 @@ def check_password():
     return True
 
 
-# 데이터베이스 연결 함수
-def connect_db():
-    return sqlite3.connect(DB_PATH)
+# 데이터베이스 연결 함수 (샤딩 중에는 db_path 로 샤드 파일을 지정)
+def connect_db(db_path=None):
+    return storage.connect(db_path or DB_PATH)
+
+
+# 테이블이 있는 DB 파일 (샤딩 중이면 기존 DB + 모든 대회 / 모임 샤드)
+def table_paths(table_name):
+    if not shards.enabled():
+        return [DB_PATH]
+
+    def has_table(conn):
+        cursor = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (table_name,),
+        )
+        return cursor.fetchone() is not None
+
+    paths = shards.all_paths()
+    return [
+        path for path, found in zip(paths, shards.map_shards(has_table, paths)) if found
+    ]
+
+
+# 행이 있는 DB 파일. 샤딩 중이면 매치 id 로 샤드를 찾음
+# (match_store 는 id, 실시간 점수 등은 match_id 컬럼)
+def row_path(table_name, row):
+    if not shards.enabled():
+        return DB_PATH
+    match_id = row.get("id") if table_name == "match_store" else row.get("match_id")
+    if match_id is None:
+        return DB_PATH
+    return shards.match_path(to_db_value(match_id))
 
 
 # 테이블 목록 가져오기
 def get_tables():
     conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = cursor.fetchall()
+    tables = storage.tables(conn)
     conn.close()
-    return [table[0] for table in tables]
+    # 검색 색인(FTS 가상 테이블과 내부 테이블)은 트리거가 관리하므로 숨김
+    return [
+        table
+        for table in tables
+        if not table.startswith("match_search") and table not in AUDIT_TABLES
+    ]
 
 
-# 테이블 데이터 가져오기
+# 테이블 데이터 가져오기 (이름은 따옴표로 감싸서 SQL 에 넣음)
+# 샤딩 중이면 모든 샤드를 동시에 읽어서 이어 붙임
 def get_table_data(table_name):
+    import pandas as pd
+
+    sql = f"SELECT * FROM {storage.quote_identifier(table_name)}"
+    if not shards.enabled():
+        return storage.read_frame(sql, db_path=DB_PATH)
+    frames = shards.map_shards(
+        lambda conn: storage.read_frame(sql, conn=conn), table_paths(table_name)
+    )
+    return pd.concat(frames, ignore_index=True).infer_objects()
+
+
+# 테이블의 기본 키 컬럼 (단일 컬럼일 때만)
+def get_primary_key(table_name):
     conn = connect_db()
-    df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
+    key = storage.primary_key(conn, table_name)
     conn.close()
-    return df
+    return key
+
+
+def to_db_value(value):
+    import pandas as pd
+
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+# 데이터 수정 함수: 바뀐 행만 갱신하고, version 컬럼이 있으면
+# 편집을 시작한 뒤 다른 곳(코트 페이지 등)에서 바뀐 행은 덮어쓰지 않는다
+# 샤딩 중이면 행마다 그 매치의 샤드에 쓰고, 트랜잭션은 파일마다 하나
+def update_data(table_name, original_df, updated_df):
+    key = get_primary_key(table_name)
+    if key is None:
+        raise ValueError(f"{table_name} 테이블은 기본 키가 없어 수정할 수 없습니다.")
+    has_version = "version" in original_df.columns
+    is_match_store = table_name == "match_store"
+
+    changed = ~(
+        (original_df == updated_df) | (original_df.isna() & updated_df.isna())
+    )
+    updated_rows = 0
+    conflicts = []
+
+    rows_by_path = {}
+    for idx in changed.index[changed.any(axis=1)]:
+        path = row_path(table_name, original_df.loc[idx])
+        rows_by_path.setdefault(path, []).append(idx)
+
+    for path, indexes in rows_by_path.items():
+        conn = connect_db(path)
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        for idx in indexes:
+            columns = [
+                column
+                for column in changed.columns[changed.loc[idx]]
+                if column not in (key, "version")
+            ]
+            if not columns:
+                continue
+            assignments = ", ".join(
+                f"{storage.quote_identifier(column)} = ?" for column in columns
+            )
+            condition = f"{storage.quote_identifier(key)} = ?"
+            params = [to_db_value(updated_df.at[idx, column]) for column in columns]
+            params.append(to_db_value(original_df.at[idx, key]))
+            if has_version:
+                assignments += ", version = version + 1"
+                condition += " AND version = ?"
+                params.append(to_db_value(original_df.at[idx, "version"]))
+
+            row_id = to_db_value(original_df.at[idx, key])
+            old = change_log.read_row(cursor, row_id) if is_match_store else None
+            cursor.execute(
+                f"UPDATE {storage.quote_identifier(table_name)} SET {assignments} "
+                f"WHERE {condition}",
+                params,
+            )
+            if cursor.rowcount == 1:
+                updated_rows += 1
+                if is_match_store:
+                    new = change_log.read_row(cursor, row_id)
+                    change_log.record(cursor, row_id, "update", old, new, ADMIN_ACTOR)
+            else:
+                conflicts.append(to_db_value(original_df.at[idx, key]))
+        conn.commit()
+        conn.close()
+    return updated_rows, conflicts
 
 
-# 데이터 수정 함수
-def update_data(table_name, updated_df):
-    conn = connect_db()
-    cursor = conn.cursor()
+# 편집을 시작한 시점의 데이터 (저장할 때 비교 기준)
+def get_snapshot(table_name):
+    snapshot = st.session_state.get("admin_snapshot")
+    if snapshot is None or snapshot[0] != table_name:
+        snapshot = (table_name, get_table_data(table_name))
+        st.session_state.admin_snapshot = snapshot
+    return snapshot[1]
 
-    # 기존 데이터 삭제
-    cursor.execute(f"DELETE FROM {table_name}")
 
-    # 새 데이터 삽입
-    updated_df.to_sql(table_name, conn, if_exists="append", index=False)
+def reset_snapshot():
+    st.session_state.pop("admin_snapshot", None)
 
-    conn.commit()
-    conn.close()
+
+# ID 로 지울 행이 있는 DB 파일 (match_store 는 id 로 샤드를 바로 찾고,
+# 나머지 테이블은 id 가 샤드마다 따로 매겨지므로 모든 샤드에서 찾아봄)
+def id_paths(table_name, row_id):
+    if not shards.enabled():
+        return [DB_PATH]
+    if table_name == "match_store":
+        return [shards.match_path(row_id)]
+    sql = f"SELECT 1 FROM {storage.quote_identifier(table_name)} WHERE id = ?"
+    paths = table_paths(table_name)
+    found = shards.map_shards(
+        lambda conn: conn.execute(sql, (row_id,)).fetchone() is not None, paths
+    )
+    return [path for path, hit in zip(paths, found) if hit]
 
 
 # ID로 데이터 삭제 함수
 def delete_by_id(table_name, id_to_delete):
-    conn = connect_db()
+    paths = id_paths(table_name, id_to_delete)
+    if not paths:
+        return 0
+    if len(paths) > 1:
+        raise ValueError(
+            f"ID {id_to_delete}인 행이 샤드 {len(paths)}곳에 있어 ID만으로는 지울 수 없습니다."
+        )
+    conn = connect_db(paths[0])
     cursor = conn.cursor()
-    cursor.execute(f"DELETE FROM {table_name} WHERE id = ?", (id_to_delete,))
+    cursor.execute("BEGIN IMMEDIATE")
+    is_match_store = table_name == "match_store"
+    old = change_log.read_row(cursor, id_to_delete) if is_match_store else None
+    cursor.execute(
+        f"DELETE FROM {storage.quote_identifier(table_name)} WHERE id = ?",
+        (id_to_delete,),
+    )
     deleted_rows = cursor.rowcount
+    if is_match_store and deleted_rows:
+        change_log.record(cursor, id_to_delete, "delete", old, None, ADMIN_ACTOR)
     conn.commit()
     conn.close()
     return deleted_rows
 
 
+# 테이블의 모든 데이터 삭제 (샤딩 중이면 모든 샤드에서)
+# 매치는 지우기 전 값으로 매치마다 삭제 기록을 남김
+def delete_all(table_name):
+    for path in table_paths(table_name):
+        conn = connect_db(path)
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        if table_name == "match_store":
+            columns = change_log.TRACKED_COLUMNS
+            cursor.execute(f"SELECT id, {', '.join(columns)} FROM match_store")
+            for row in cursor.fetchall():
+                old = dict(zip(columns, row[1:]))
+                change_log.record(cursor, row[0], "delete", old, None, ADMIN_ACTOR)
+        cursor.execute(f"DELETE FROM {storage.quote_identifier(table_name)}")
+        conn.commit()
+        conn.close()
+
+
+def format_timestamp(timestamp):
+    return datetime.fromtimestamp(timestamp, seoul_tz).strftime("%Y-%m-%d %H:%M:%S")
+
+
+# 변경 기록 조회 (keyset 페이지: 이전 페이지의 마지막 기록을 기억해서 다음 페이지를 읽음)
+def change_log_section():
+    import pandas as pd
+
+    st.subheader("변경 기록")
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        log_match_id = st.number_input(
+            "매치 ID (0 = 전체)", min_value=0, step=1, key="change_log_match_id"
+        )
+    match_filter = int(log_match_id) or None
+
+    cursors = st.session_state.setdefault("change_log_cursors", [None])
+    if st.session_state.get("change_log_filter") != match_filter:
+        st.session_state.change_log_filter = match_filter
+        cursors[:] = [None]
+
+    changes = change_log.list_changes(
+        match_filter, cursors[-1], CHANGE_LOG_PAGE_SIZE
+    )
+    if changes:
+        st.dataframe(
+            pd.DataFrame(
+                {
+                    "ID": [change[0] for change in changes],
+                    "매치 ID": [change[1] for change in changes],
+                    "시각": [format_timestamp(change[2]) for change in changes],
+                    "작성자": [change[3] for change in changes],
+                    "종류": [change[4] for change in changes],
+                    "변경 내용": [change[5] for change in changes],
+                }
+            ),
+            hide_index=True,
+        )
+    else:
+        st.info("변경 기록이 없습니다.")
+
+    _, col1, col2 = st.columns([4, 1, 1])
+    with col1:
+        if st.button("처음으로", key="change_log_first", disabled=len(cursors) == 1):
+            cursors[:] = [None]
+            st.rerun()
+    with col2:
+        if st.button(
+            "다음",
+            key="change_log_next",
+            disabled=len(changes) < CHANGE_LOG_PAGE_SIZE,
+        ):
+            cursors.append(changes[-1])
+            st.rerun()
+
+    # 특정 시점의 매치 상태 복원 조회
+    if match_filter:
+        col1, col2 = st.columns(2)
+        with col1:
+            state_date = st.date_input("날짜", key="change_log_state_date")
+        with col2:
+            state_time = st.time_input("시각", key="change_log_state_time")
+        timestamp = seoul_tz.localize(
+            datetime.combine(state_date, state_time)
+        ).timestamp()
+        state = change_log.get_match_state_at(match_filter, timestamp)
+        if state:
+            st.code(json.dumps(state, ensure_ascii=False, indent=2), language="json")
+        else:
+            st.info("해당 시점에는 존재하지 않는 매치입니다.")
+
+
+# 세션별 메모리 사용량 (세션 상태 크기 + 서버 프로세스 RSS)
+def session_memory_section():
+    import pandas as pd
+
+    st.subheader("세션 메모리 사용량")
+    stats = session_memory.list_session_stats()
+    rss = session_memory.process_rss()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("접속 세션", len(stats))
+    col2.metric("서버 RSS(MB)", round(rss / 1024 / 1024, 1))
+    col3.metric(
+        "세션 상태 합계(KB)", round(sum(s["bytes"] for s in stats) / 1024, 1)
+    )
+    if stats:
+        st.dataframe(
+            pd.DataFrame(
+                {
+                    "세션": [s["session_id"][:8] for s in stats],
+                    "키 수": [s["keys"] for s in stats],
+                    "매치별 키 수": [s["match_keys"] for s in stats],
+                    "상태 크기(KB)": [round(s["bytes"] / 1024, 1) for s in stats],
+                }
+            ),
+            hide_index=True,
+        )
+
+
+# 선수 이름 / 대회명 / 장소 통합 검색 (공식 대회 + 모임, 관련도 순)
+def search_section():
+    import pandas as pd
+
+    st.subheader("매치 검색")
+    query = st.text_input("선수 이름, 대회명, 장소", key="match_search_query")
+    if not query:
+        return
+    results = search.search(query, limit=SEARCH_LIMIT)
+    if not results:
+        st.info("검색 결과가 없습니다.")
+        return
+    df = pd.DataFrame(
+        results,
+        columns=[
+            "ID",
+            "구분",
+            "대회/모임",
+            "장소",
+            "코트",
+            "라운드",
+            "선수1",
+            "점수1",
+            "점수2",
+            "선수2",
+            "상태",
+            "등록 시각",
+        ],
+    )
+    df["등록 시각"] = df["등록 시각"].map(format_timestamp)
+    st.dataframe(df, hide_index=True)
+    if len(results) == SEARCH_LIMIT:
+        st.caption(f"관련도 상위 {SEARCH_LIMIT}건만 표시합니다.")
+
+
 # 메인 앱
 def main():
     st.title("데이터베이스 관리")
 
     if check_password():
+        # pandas 는 로그인한 뒤에만 import (비밀번호 화면은 가볍게 띄움)
+        # 쓰는 함수마다 그 안에서 import 하므로 모듈 전역에 의존하지 않음
+        import pandas as pd
+
         tables = get_tables()
         selected_table = st.selectbox("테이블 선택", tables)
 
         if selected_table:
             st.subheader(f"{selected_table} 테이블 데이터")
-            df = get_table_data(selected_table)
+            df = get_snapshot(selected_table)
+
+            if st.button("최신 데이터 불러오기"):
+                reset_snapshot()
+                st.rerun()
 
             # 데이터 편집
-            edited_df = st.data_editor(df)
+            edited_df = st.data_editor(
+                df, disabled=["version"] if "version" in df.columns else False
+            )
 
             if st.button("변경사항 저장"):
-                update_data(selected_table, edited_df)
-                st.success("데이터가 성공적으로 업데이트되었습니다.")
+                backup.create_backup("before-save")
+                updated_rows, conflicts = update_data(selected_table, df, edited_df)
+                reset_snapshot()
+                st.success(f"{updated_rows}건의 데이터가 업데이트되었습니다.")
+                if conflicts:
+                    st.error(
+                        f"ID {', '.join(map(str, conflicts))}의 데이터는 편집 중에 "
+                        "다른 곳에서 먼저 수정되어 저장하지 않았습니다. "
+                        "최신 데이터를 불러와 다시 수정하세요."
+                    )
 
             # ID로 데이터 삭제
             st.subheader("ID로 데이터 삭제")
@@ -123,14 +461,22 @@ def main():
 
             if delete_confirmation:
                 if st.button("선택한 ID의 데이터 삭제", key="delete_by_id"):
-                    deleted_rows = delete_by_id(selected_table, id_to_delete)
-                    if deleted_rows > 0:
-                        st.success(
-                            f"ID {id_to_delete}의 데이터가 성공적으로 삭제되었습니다."
-                        )
+                    backup.create_backup("before-delete")
+                    try:
+                        deleted_rows = delete_by_id(selected_table, id_to_delete)
+                    except ValueError as error:
+                        st.error(str(error))
                     else:
-                        st.warning(f"ID {id_to_delete}에 해당하는 데이터가 없습니다.")
-                    st.rerun()
+                        reset_snapshot()
+                        if deleted_rows > 0:
+                            st.success(
+                                f"ID {id_to_delete}의 데이터가 성공적으로 삭제되었습니다."
+                            )
+                        else:
+                            st.warning(
+                                f"ID {id_to_delete}에 해당하는 데이터가 없습니다."
+                            )
+                        st.rerun()
 
             # 데이터 삭제 기능
             st.subheader("모든 데이터 삭제")
@@ -142,16 +488,84 @@ def main():
                     type="secondary",
                     key="delete_all",
                 ):
-                    conn = connect_db()
-                    cursor = conn.cursor()
-                    cursor.execute(f"DELETE FROM {selected_table}")
-                    conn.commit()
-                    conn.close()
+                    backup.create_backup("before-delete-all")
+                    delete_all(selected_table)
+                    reset_snapshot()
                     st.success(
                         f"{selected_table} 테이블의 모든 데이터가 삭제되었습니다."
                     )
                     st.rerun()
 
+        # 종료된 대회 보관
+        st.subheader("종료된 대회 보관")
+        archivable = archive.get_archivable_tournaments()
+        if archivable:
+            archive_title = st.selectbox("보관할 대회", archivable)
+            if st.button("아카이브로 이동", key="archive_tournament"):
+                backup.create_backup("before-archive")
+                archived_rows = archive.archive_tournament(archive_title)
+                reset_snapshot()
+                st.success(
+                    f"{archive_title} 대회의 매치 {archived_rows}건을 아카이브로 옮겼습니다."
+                )
+                st.rerun()
+        else:
+            st.info("보관할 수 있는 대회가 없습니다. (대기 중인 매치가 없는 대회만 가능)")
+
+        archived = archive.list_archived_tournaments()
+        if archived:
+            st.caption("보관된 대회: " + ", ".join(archived))
+
+        # 백업 및 복원
+        st.subheader("백업 및 복원")
+        if storage.backend() != storage.SQLITE:
+            st.info("PostgreSQL 저장소는 pg_dump 등 서버의 백업 기능을 사용하세요.")
+        else:
+            if st.button("지금 백업", key="create_backup"):
+                name = backup.create_backup("manual")
+                st.success(f"{name} 백업을 만들었습니다.")
+
+            backups = backup.list_backups()
+            if backups:
+                st.dataframe(
+                    pd.DataFrame(
+                        {
+                            "백업": [b["name"] for b in backups],
+                            "사유": [b["reason"] for b in backups],
+                            "시각": [
+                                format_timestamp(b["created_at"]) for b in backups
+                            ],
+                            "크기(MB)": [
+                                round(b["size"] / 1024 / 1024, 2) for b in backups
+                            ],
+                            "샤드": [b["shards"] for b in backups],
+                        }
+                    ),
+                    hide_index=True,
+                )
+                restore_name = st.selectbox(
+                    "복원할 백업", [b["name"] for b in backups], key="restore_name"
+                )
+                restore_confirmation = st.checkbox(
+                    f"{restore_name} 시점으로 전체 데이터를 되돌리시겠습니까?"
+                )
+                if restore_confirmation:
+                    if st.button("선택한 백업으로 복원", key="restore_backup"):
+                        backup.restore_backup(restore_name)
+                        reset_snapshot()
+                        st.cache_data.clear()
+                        st.success(
+                            f"{restore_name} 시점으로 복원했습니다. (복원 직전 상태도 백업했습니다)"
+                        )
+            else:
+                st.info("아직 백업이 없습니다.")
+
+        search_section()
+
+        change_log_section()
+
+        session_memory_section()
+
 
 if __name__ == "__main__":
     main()
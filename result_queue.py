@@ -0,0 +1,171 @@
+### 심판 결과 입력 대기열 (멱등 키 + 묶음 반영)
+
+# 결과 저장은 먼저 세션 상태의 대기열에 멱등 키(idempotency key)와 함께 넣고 서버로 보낸다.
+# 서버의 ResultBatcher 는 여러 세션에서 거의 동시에 들어온 결과를 잠깐 모아서
+# 한 트랜잭션에 반영하고, 반영한 키를 applied_results 에 같은 트랜잭션으로 남긴다.
+# 그래서 응답을 받기 전에 연결이 끊겨 다시 보낸 결과도 두 번 반영되지 않는다.
+# DB 가 잠겨 있거나 요청이 실패하면 결과는 세션 대기열에 남고 다음 실행 때 다시 보낸다.
+# applied_results 테이블은 match_store.init_db 가 만들고,
+# 페이지 쪽 작업자 / 재전송 구역은 result_queue_ui 에 있다.
+
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+import match_store
+import storage
+
+# 반영 결과
+APPLIED = "applied"
+CONFLICT = "conflict"
+
+# 한 번에 모을 최대 결과 수 / 첫 결과가 들어온 뒤 더 기다리는 시간 (초)
+BATCH_SIZE = 200
+BATCH_WAIT = 0.02
+# 보낸 쪽이 반영 결과를 기다리는 최대 시간 (초)
+SUBMIT_TIMEOUT = 15
+# 반영한 키를 보관하는 기간 (이보다 오래된 재전송은 없다고 봄)
+KEY_TTL = 7 * 24 * 3600
+
+
+# 세션 대기열에 결과 추가 (매치당 하나, 이미 있으면 키는 그대로 두고 점수만 바꿈)
+def queue_result(session_state, match_id, score1, score2, version=None, actor=None):
+    pending = session_state.setdefault("result_queue", {})
+    entry = pending.get(match_id) or {
+        "key": uuid.uuid4().hex,
+        "match_id": match_id,
+        "queued_at": time.time(),
+        "attempts": 0,
+    }
+    entry.update(score1=score1, score2=score2, version=version, actor=actor)
+    pending[match_id] = entry
+    return entry
+
+
+def queued_results(session_state):
+    return session_state.get("result_queue", {})
+
+
+# 세션 대기열을 서버로 보냄. 반영(또는 충돌)된 것은 대기열에서 빼고 {match_id: 결과},
+# 실패하면 모두 대기열에 남기고 예외를 그대로 올림
+def sync(session_state, batcher):
+    pending = queued_results(session_state)
+    if not pending:
+        return {}
+    entries = list(pending.values())
+    for entry in entries:
+        entry["attempts"] += 1
+    outcomes = batcher.submit(entries)
+    results = {}
+    for entry in entries:
+        if entry["key"] in outcomes:
+            results[entry["match_id"]] = outcomes[entry["key"]]
+            # 보내는 동안 같은 매치 결과를 다시 넣었으면 그건 남겨 둠
+            if pending.get(entry["match_id"]) is entry:
+                del pending[entry["match_id"]]
+    return results
+
+
+# 한 DB 파일에 묶음 반영 (한 트랜잭션). 돌려주는 값: {key: 결과}
+def apply_batch(db_path, entries):
+    conn = storage.connect(db_path, timeout=10)
+    c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
+    try:
+        keys = [entry["key"] for entry in entries]
+        c.execute(
+            f"""SELECT idempotency_key, outcome FROM applied_results
+                     WHERE idempotency_key IN ({", ".join("?" * len(keys))})""",
+            keys,
+        )
+        outcomes = dict(c.fetchall())
+        now = time.time()
+        for entry in entries:
+            # 이미 반영한 키(같은 묶음 안의 중복 포함)는 그때의 결과를 그대로 돌려줌
+            if entry["key"] in outcomes:
+                continue
+            applied = match_store.apply_result(
+                c,
+                entry["match_id"],
+                entry["score1"],
+                entry["score2"],
+                entry["version"],
+                entry["actor"],
+            )
+            outcome = APPLIED if applied else CONFLICT
+            c.execute(
+                """INSERT INTO applied_results (idempotency_key, match_id, outcome, applied_at)
+                         VALUES (?, ?, ?, ?)""",
+                (entry["key"], entry["match_id"], outcome, now),
+            )
+            outcomes[entry["key"]] = outcome
+        c.execute("DELETE FROM applied_results WHERE applied_at < ?", (now - KEY_TTL,))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return outcomes
+
+
+# 매치가 있는 파일(샤딩 중이면 샤드)별로 나눠서 반영
+def apply_results(entries):
+    by_path = {}
+    for entry in entries:
+        by_path.setdefault(match_store.match_db_path(entry["match_id"]), []).append(entry)
+    outcomes = {}
+    for db_path, path_entries in by_path.items():
+        outcomes.update(apply_batch(db_path, path_entries))
+    return outcomes
+
+
+# 여러 세션의 결과를 모아서 반영하는 서버 쪽 작업자 (프로세스에 하나, st.cache_resource)
+class ResultBatcher:
+    def __init__(self, batch_size=BATCH_SIZE, batch_wait=BATCH_WAIT):
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.requests = queue.Queue()
+        self.batches = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    # 결과 목록을 넘기고 반영될 때까지 기다림 {key: 결과}
+    def submit(self, entries, timeout=SUBMIT_TIMEOUT):
+        future = Future()
+        self.requests.put((entries, future))
+        return future.result(timeout)
+
+    def _collect(self):
+        batch = [self.requests.get()]
+        count = len(batch[0][0])
+        deadline = time.monotonic() + self.batch_wait
+        while count < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self.requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            count += len(request[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                outcomes = apply_results(
+                    [entry for entries, _ in batch for entry in entries]
+                )
+            except Exception as error:
+                for _, future in batch:
+                    future.set_exception(error)
+                continue
+            self.batches += 1
+            for entries, future in batch:
+                future.set_result(
+                    {entry["key"]: outcomes[entry["key"]] for entry in entries}
+                )
@@ -0,0 +1,44 @@
+### 결과 대기열 화면 도우미 (공식 대회 / 모임 템플릿 공용)
+
+# 결과 반영 작업자는 프로세스에 하나만 두고 모든 세션이 함께 쓴다.
+# 저장하지 못한 결과는 몇 초마다 도는 fragment 가 자동으로 다시 보낸다.
+
+import streamlit as st
+import result_queue
+
+# 저장하지 못한 결과를 다시 보내는 간격 (초)
+RESULT_RETRY_SECONDS = 5
+
+
+# 결과 반영 작업자 (모든 세션의 결과를 모아서 한 트랜잭션에 반영)
+@st.cache_resource
+def get_result_batcher():
+    return result_queue.ResultBatcher()
+
+
+# 세션 대기열의 결과를 서버로 보냄 {match_id: 결과} (실패하면 None, 대기열에 남음)
+def sync_results():
+    try:
+        return result_queue.sync(st.session_state, get_result_batcher())
+    except Exception:
+        return None
+
+
+# 저장하지 못한 결과는 몇 초마다 자동으로 다시 보냄
+@st.fragment(run_every=RESULT_RETRY_SECONDS)
+def result_queue_section():
+    queued = result_queue.queued_results(st.session_state)
+    if not queued:
+        return
+    outcomes = sync_results()
+    if outcomes:
+        st.session_state.result_conflicts = [
+            match_id
+            for match_id, outcome in outcomes.items()
+            if outcome == result_queue.CONFLICT
+        ]
+        st.rerun()
+    st.warning(
+        f"저장하지 못한 결과 {len(queued)}건이 있습니다. 연결되면 자동으로 저장합니다."
+    )
+    st.button("지금 다시 보내기", key="retry_results")
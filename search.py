@@ -0,0 +1,156 @@
+### 선수 / 대회 이름 전문 검색 (SQLite FTS5)
+
+# match_store 를 원본으로 하는 FTS5 색인(match_search)을 트리거로 같이 갱신한다.
+# trigram 토크나이저는 글자 3개 단위로 색인하므로 띄어쓰기가 없는 한국어 이름도
+# 부분 검색이 된다. 3글자보다 짧은 검색어(예: 이름 두 글자, 장소)는 trigram 으로
+# 찾을 수 없어서 LIKE 로 거른다 (긴 검색어가 함께 있으면 색인 결과 안에서만).
+# PostgreSQL 저장소에는 FTS5 색인이 없으므로 모든 검색어를 LIKE 로 거른다.
+
+import os
+import shards
+import storage
+
+# 데이터베이스 설정
+DB_FOLDER = "db"
+DB_FILE = "db.sqlite"
+DB_PATH = os.path.join(DB_FOLDER, DB_FILE)
+
+SEARCH_COLUMNS = ("player1", "player2", "event_name", "place")
+PLAYER_COLUMNS = ("player1", "player2")
+MIN_TRIGRAM_LENGTH = 3
+
+SEARCH_TABLE_SQL = f"""CREATE VIRTUAL TABLE IF NOT EXISTS match_search
+                 USING fts5({", ".join(SEARCH_COLUMNS)},
+                            content='match_store', content_rowid='id',
+                            tokenize='trigram')"""
+
+_columns = ", ".join(SEARCH_COLUMNS)
+_new_values = ", ".join(f"NEW.{column}" for column in SEARCH_COLUMNS)
+_old_values = ", ".join(f"OLD.{column}" for column in SEARCH_COLUMNS)
+
+SEARCH_TRIGGER_SQL = {
+    "match_search_insert": f"""CREATE TRIGGER IF NOT EXISTS match_search_insert
+             AFTER INSERT ON match_store
+             BEGIN
+                 INSERT INTO match_search (rowid, {_columns})
+                 VALUES (NEW.id, {_new_values});
+             END""",
+    "match_search_delete": f"""CREATE TRIGGER IF NOT EXISTS match_search_delete
+             AFTER DELETE ON match_store
+             BEGIN
+                 INSERT INTO match_search (match_search, rowid, {_columns})
+                 VALUES ('delete', OLD.id, {_old_values});
+             END""",
+    "match_search_update": f"""CREATE TRIGGER IF NOT EXISTS match_search_update
+             AFTER UPDATE OF {_columns} ON match_store
+             BEGIN
+                 INSERT INTO match_search (match_search, rowid, {_columns})
+                 VALUES ('delete', OLD.id, {_old_values});
+                 INSERT INTO match_search (rowid, {_columns})
+                 VALUES (NEW.id, {_new_values});
+             END""",
+}
+
+
+def init_db(conn):
+    c = conn.cursor()
+    c.execute("SELECT 1 FROM sqlite_master WHERE name = 'match_search'")
+    exists = c.fetchone() is not None
+    c.execute(SEARCH_TABLE_SQL)
+    create_triggers(c)
+    # 기존 매치는 처음 만들 때 한 번 색인
+    if not exists:
+        rebuild(c)
+
+
+def create_triggers(c):
+    for sql in SEARCH_TRIGGER_SQL.values():
+        c.execute(sql)
+
+
+# 대량 입력(datagen 등) 중에는 트리거를 끄고 끝나고 rebuild 하는 편이 빠름
+def drop_triggers(c):
+    for name in SEARCH_TRIGGER_SQL:
+        c.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def rebuild(c):
+    c.execute("INSERT INTO match_search (match_search) VALUES ('rebuild')")
+
+
+# 검색어 -> (FTS MATCH 식, LIKE 조건 목록, LIKE 파라미터)
+# 단어마다 columns 중 하나에 들어 있어야 함 (AND)
+def build_query(text, columns=SEARCH_COLUMNS, use_fts=True):
+    phrases = []
+    like_conditions = []
+    like_params = []
+    for word in text.split():
+        if use_fts and len(word) >= MIN_TRIGRAM_LENGTH:
+            phrases.append('"' + word.replace('"', '""') + '"')
+        else:
+            pattern = "%" + word.replace("\\", "\\\\").replace("%", "\\%").replace(
+                "_", "\\_"
+            ) + "%"
+            like_conditions.append(
+                "("
+                + " OR ".join(
+                    f"m.{column} LIKE ? ESCAPE '\\'" for column in columns
+                )
+                + ")"
+            )
+            like_params += [pattern] * len(columns)
+    match_expr = ""
+    if phrases:
+        match_expr = "{" + " ".join(columns) + "} : (" + " ".join(phrases) + ")"
+    return match_expr, like_conditions, like_params
+
+
+# 검색 결과 (관련도 순, 짧은 검색어만 있으면 최신 순)
+# [(id, event_type, event_name, place, court, round_type, player1, score1,
+#   score2, player2, status, created_at)]
+def search(text, event_type=None, status=None, columns=SEARCH_COLUMNS, limit=100):
+    use_fts = storage.backend() == storage.SQLITE
+    match_expr, conditions, params = build_query(text, columns, use_fts)
+    if not match_expr and not conditions:
+        return []
+    if match_expr:
+        conditions.insert(0, "match_search MATCH ?")
+        params.insert(0, match_expr)
+    if event_type is not None:
+        conditions.append("m.event_type = ?")
+        params.append(event_type)
+    if status is not None:
+        conditions.append("m.status = ?")
+        params.append(status)
+    # 짧은 검색어만 있으면 색인을 쓸 수 없으므로 최신 매치부터 훑다가 limit 에서 멈춤
+    if match_expr:
+        source = "match_search JOIN match_store m ON m.id = match_search.rowid"
+        order = sort_key = "match_search.rank"
+    else:
+        source = "match_store m"
+        order, sort_key = "m.id DESC", "-m.id"
+    sql = f"""SELECT m.id, m.event_type, m.event_name, m.place, m.court,
+                   m.round_type, m.player1, m.score1, m.score2, m.player2,
+                   m.status, m.created_at, {sort_key} AS sort_key
+                 FROM {source}
+                 WHERE {" AND ".join(conditions)}
+                 ORDER BY {order}
+                 LIMIT ?"""
+    params.append(limit)
+
+    # 샤딩 중이면 샤드마다 상위 limit 건을 받아서 다시 정렬
+    if shards.enabled():
+        results = sorted(shards.fan_out(sql, params), key=lambda row: row[-1])[:limit]
+    else:
+        conn = storage.connect(DB_PATH)
+        c = conn.cursor()
+        c.execute(sql, params)
+        results = c.fetchall()
+        conn.close()
+    return [row[:-1] for row in results]
+
+
+def search_ids(
+    text, event_type=None, status=None, columns=SEARCH_COLUMNS, limit=1_000_000
+):
+    return [row[0] for row in search(text, event_type, status, columns, limit)]
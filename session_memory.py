@@ -0,0 +1,113 @@
+### 세션별 메모리 사용량 확인 / 오래된 매치 키 정리
+
+# 코트 페이지의 매치별 위젯 키(edit_player1_{id}, score1_{id} 등)는
+# 세션마다 따로 저장되므로 세션 수 x 매치 수만큼 서버 메모리가 늘어난다.
+# 관리자 페이지에서 세션별 상태 크기를 보고, 끝나거나 삭제된 매치의 키는 지운다.
+
+import os
+import re
+import sys
+
+# 매치 id 가 붙는 세션 키 (template.py, template2.py)
+MATCH_KEY_PATTERN = re.compile(
+    r"^(edit_round_type|edit_gender|edit_match_type|edit_player1|edit_player2"
+    r"|edit_cancel|edit_confirm|score1|score2|save_result"
+    r"|update_input|delete_match|result_input|move_up|move_down"
+    r"|live_plus1|live_minus1|live_plus2|live_minus2|live_finish)_(\d+)$"
+)
+
+
+def match_id_of(key):
+    match = MATCH_KEY_PATTERN.match(str(key))
+    return int(match.group(2)) if match else None
+
+
+# 대기 중인 매치(active_ids)가 아닌 매치의 키 삭제
+def cleanup_match_keys(session_state, active_ids):
+    active_ids = set(active_ids)
+    stale = [
+        key
+        for key in list(session_state.keys())
+        if match_id_of(key) is not None and match_id_of(key) not in active_ids
+    ]
+    for key in stale:
+        del session_state[key]
+    return stale
+
+
+# 객체가 차지하는 대략적인 메모리 (중첩된 컨테이너 포함)
+def deep_sizeof(obj, seen=None):
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    # pandas DataFrame/Series 는 실제 데이터 크기를 직접 계산
+    memory_usage = getattr(obj, "memory_usage", None)
+    if callable(memory_usage):
+        try:
+            usage = memory_usage(deep=True)
+            return int(usage.sum() if hasattr(usage, "sum") else usage)
+        except TypeError:
+            pass
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(
+            deep_sizeof(key, seen) + deep_sizeof(value, seen)
+            for key, value in obj.items()
+        )
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+
+# 세션 하나의 상태 요약
+def session_state_stats(session_state):
+    keys = list(session_state.keys())
+    total = 0
+    match_keys = 0
+    for key in keys:
+        if match_id_of(key) is not None:
+            match_keys += 1
+        total += deep_sizeof(key) + deep_sizeof(session_state[key])
+    return {"keys": len(keys), "match_keys": match_keys, "bytes": total}
+
+
+# 서버에 연결된 모든 세션의 상태 요약 (Streamlit 내부 API 사용)
+def list_session_stats():
+    from streamlit.runtime import Runtime
+
+    if not Runtime.exists():
+        return []
+    try:
+        sessions = Runtime.instance()._session_mgr.list_active_sessions()
+    except AttributeError:
+        # 테스트용 런타임처럼 세션 관리자가 없는 경우
+        return []
+    stats = []
+    for info in sessions:
+        session = info.session
+        try:
+            # 다른 세션의 스크립트가 실행 중이면 상태가 바뀌는 중일 수 있음
+            state = session.session_state.filtered_state
+        except (KeyError, RuntimeError):
+            continue
+        stat = session_state_stats(state)
+        stat["session_id"] = session.id
+        stats.append(stat)
+    return sorted(stats, key=lambda stat: stat["bytes"], reverse=True)
+
+
+# 현재 프로세스의 RSS (bytes). /proc 가 없으면 최대 RSS 로 대신함
+def process_rss(pid=None):
+    path = f"/proc/{pid or 'self'}/status"
+    if os.path.exists(path):
+        with open(path) as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
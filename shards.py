@@ -0,0 +1,338 @@
+### 대회 / 모임별 DB 샤딩
+
+# config.yaml 에 sharding: true 를 주면 대회(tournament_title)와 모임(group_name)마다
+# db/shards/<번호>.sqlite 파일을 따로 쓰고, 이름과 번호는 작은 카탈로그 DB 에 기록한다.
+# 한 대회의 쓰기 잠금이 다른 모임을 막지 않고, 파일도 대회마다 나뉘어 커진다.
+# 매치 id 는 샤드 번호 * ID_SPAN 부터 매기므로 id 만으로 샤드를 찾는다
+# (ID_SPAN 보다 작은 id 는 기존 단일 DB).
+# 카탈로그에 없는 이름은 처음 쓰일 때 샤드를 만들면서 기존 DB 에 있던 그 이름의
+# 매치 / 변경 기록 / 실시간 점수를 옮긴다 (id 에 샤드 범위를 더함).
+#
+# 여러 샤드를 읽는 조회(통계, 선수 전적, 검색)는 스레드 풀로 동시에 실행해서 합치고,
+# 읽기 연결은 최대 MAX_OPEN_SHARDS 개까지만 열어 두고 오래 안 쓴 것부터 닫는다.
+#
+# 기존 DB 를 한 번에 나누기: python shards.py
+
+import sqlite3
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import yaml
+import live_score
+import match_store
+import storage
+
+# 데이터베이스 설정
+DB_FOLDER = "db"
+DB_FILE = "db.sqlite"
+DB_PATH = os.path.join(DB_FOLDER, DB_FILE)
+CATALOG_PATH = os.path.join(DB_FOLDER, "catalog.sqlite")
+SHARD_FOLDER = os.path.join(DB_FOLDER, "shards")
+
+# 샤드 하나가 쓰는 매치 id 범위
+ID_SPAN = 10**9
+
+# 동시에 열어 두는 읽기 연결 수 / 동시에 조회하는 샤드 수
+MAX_OPEN_SHARDS = 16
+FAN_OUT_WORKERS = 8
+
+# 옮길 때 그대로 복사하는 match_store 컬럼 (id 제외)
+MATCH_COLUMNS = (
+    "event_type, event_name, place, court, round_type, gender, match_type, "
+    "player1, player2, score1, score2, status, created_at, started_at, "
+    "finished_at, version, queue_position"
+)
+
+CATALOG_TABLE_SQL = """CREATE TABLE IF NOT EXISTS shards
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  event_type TEXT NOT NULL,
+                  event_name TEXT NOT NULL,
+                  created_at INTEGER,
+                  UNIQUE (event_type, event_name))"""
+
+_enabled = None
+# (event_type, event_name) -> 샤드 번호
+_shard_ids = {}
+_shard_ids_lock = threading.Lock()
+_pool = None
+_executor = None
+
+
+def enabled():
+    global _enabled
+    if _enabled is None:
+        try:
+            with open("config.yaml", "r") as file:
+                _enabled = bool((yaml.safe_load(file) or {}).get("sharding"))
+        except FileNotFoundError:
+            _enabled = False
+        # 파일을 나누는 방식이라 SQLite 저장소에서만 사용
+        _enabled = _enabled and storage.backend() == storage.SQLITE
+    return _enabled
+
+
+# 설정을 다시 읽고 열린 연결을 모두 닫음 (테스트 / 설정 변경 후)
+def reset():
+    global _enabled, _pool
+    _enabled = None
+    with _shard_ids_lock:
+        _shard_ids.clear()
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+def shard_file(shard_id):
+    return os.path.join(SHARD_FOLDER, f"{shard_id}.sqlite")
+
+
+def connect_catalog():
+    if not os.path.exists(DB_FOLDER):
+        os.makedirs(DB_FOLDER)
+    conn = sqlite3.connect(CATALOG_PATH, timeout=10)
+    conn.execute(CATALOG_TABLE_SQL)
+    return conn
+
+
+# 이름 -> 샤드 번호 (없으면 만듦)
+def shard_id(event_type, event_name):
+    key = (event_type, event_name)
+    with _shard_ids_lock:
+        if key not in _shard_ids:
+            _shard_ids[key] = _find_or_create(event_type, event_name)
+        return _shard_ids[key]
+
+
+def _find_or_create(event_type, event_name):
+    conn = connect_catalog()
+    c = conn.cursor()
+    # 다른 프로세스가 같은 이름의 샤드를 동시에 만들지 않도록 카탈로그를 잠금
+    c.execute("BEGIN IMMEDIATE")
+    try:
+        c.execute(
+            "SELECT id FROM shards WHERE event_type = ? AND event_name = ?",
+            (event_type, event_name),
+        )
+        row = c.fetchone()
+        if row:
+            conn.rollback()
+            return row[0]
+        c.execute(
+            """INSERT INTO shards (event_type, event_name, created_at)
+                     VALUES (?, ?, ?)""",
+            (event_type, event_name, int(time.time())),
+        )
+        new_id = c.lastrowid
+        create_shard(new_id, event_type, event_name)
+        conn.commit()
+        return new_id
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+# 샤드 파일 생성 + 기존 DB 에서 해당 이름의 데이터 이동
+# 중간에 실패해도 다시 실행하면 이어서 끝나도록 복사는 INSERT OR IGNORE 로 함
+def create_shard(new_id, event_type, event_name):
+    path = shard_file(new_id)
+    match_store.init_db(path)
+    live_score.init_db(path)
+    offset = new_id * ID_SPAN
+
+    conn = sqlite3.connect(path, timeout=10)
+    c = conn.cursor()
+    c.execute("ATTACH DATABASE ? AS legacy", (DB_PATH,))
+    c.execute("BEGIN IMMEDIATE")
+    c.execute("SELECT 1 FROM sqlite_sequence WHERE name = 'match_store'")
+    if c.fetchone() is None:
+        c.execute(
+            "INSERT INTO sqlite_sequence (name, seq) VALUES ('match_store', ?)",
+            (offset,),
+        )
+
+    c.execute("SELECT name FROM legacy.sqlite_master WHERE type = 'table'")
+    legacy_tables = {row[0] for row in c.fetchall()}
+    if "match_store" in legacy_tables:
+        moved = """SELECT id FROM legacy.match_store
+                         WHERE event_type = ? AND event_name = ?"""
+        key = (event_type, event_name)
+        c.execute(
+            f"""INSERT OR IGNORE INTO match_store (id, {MATCH_COLUMNS})
+                     SELECT id + ?, {MATCH_COLUMNS} FROM legacy.match_store
+                     WHERE event_type = ? AND event_name = ?""",
+            (offset, *key),
+        )
+        copies = [
+            (
+                "change_log",
+                """INSERT OR IGNORE INTO change_log (id, match_id, changed_at, actor, action, diff)
+                         SELECT id, match_id + ?, changed_at, actor, action, diff
+                         FROM legacy.change_log WHERE match_id IN ({moved})""",
+            ),
+            (
+                "score_events",
+                """INSERT OR IGNORE INTO score_events (id, match_id, player, delta, created_at)
+                         SELECT id, match_id + ?, player, delta, created_at
+                         FROM legacy.score_events WHERE match_id IN ({moved})""",
+            ),
+            (
+                "score_snapshots",
+                """INSERT OR IGNORE INTO score_snapshots
+                         (match_id, last_event_id, score1, score2, updated_at)
+                         SELECT match_id + ?, last_event_id, score1, score2, updated_at
+                         FROM legacy.score_snapshots WHERE match_id IN ({moved})""",
+            ),
+        ]
+        copies = [(table, sql) for table, sql in copies if table in legacy_tables]
+        for _, sql in copies:
+            c.execute(sql.format(moved=moved), (offset, *key))
+        conn.commit()
+
+        # 샤드에 커밋된 뒤에 기존 DB 에서 지움
+        c.execute("BEGIN IMMEDIATE")
+        for table, _ in copies:
+            c.execute(f"DELETE FROM legacy.{table} WHERE match_id IN ({moved})", key)
+        c.execute(
+            "DELETE FROM legacy.match_store WHERE event_type = ? AND event_name = ?",
+            key,
+        )
+    conn.commit()
+    c.execute("DETACH DATABASE legacy")
+    conn.close()
+
+
+def event_path(event_type, event_name):
+    return shard_file(shard_id(event_type, event_name))
+
+
+def match_path(match_id):
+    number = int(match_id) // ID_SPAN
+    return shard_file(number) if number else DB_PATH
+
+
+# 조회 대상 파일: 기존 DB + 카탈로그의 샤드 (event_type 을 주면 그 종류만)
+def all_paths(event_type=None):
+    conn = connect_catalog()
+    c = conn.cursor()
+    if event_type is None:
+        c.execute("SELECT id FROM shards ORDER BY id")
+    else:
+        c.execute("SELECT id FROM shards WHERE event_type = ? ORDER BY id", (event_type,))
+    paths = [shard_file(row[0]) for row in c.fetchall()]
+    conn.close()
+    return [path for path in [DB_PATH] + paths if os.path.exists(path)]
+
+
+# 샤드별 읽기 연결 풀. 연결은 한 번에 한 스레드만 쓰고,
+# 열린 연결이 max_open 개면 가장 오래 안 쓴 유휴 연결을 닫고 새로 연다
+class ShardPool:
+    def __init__(self, max_open=MAX_OPEN_SHARDS):
+        self.max_open = max_open
+        # path -> [유휴 연결], 오래 안 쓴 순서
+        self.idle = OrderedDict()
+        self.open_count = 0
+        self.condition = threading.Condition()
+
+    def _close_oldest_idle(self):
+        path, connections = next(iter(self.idle.items()))
+        connections.pop().close()
+        if not connections:
+            del self.idle[path]
+        self.open_count -= 1
+
+    def acquire(self, path):
+        with self.condition:
+            while True:
+                connections = self.idle.get(path)
+                if connections:
+                    conn = connections.pop()
+                    if not connections:
+                        del self.idle[path]
+                    return conn
+                if self.open_count >= self.max_open and self.idle:
+                    self._close_oldest_idle()
+                if self.open_count < self.max_open:
+                    self.open_count += 1
+                    break
+                # 모든 연결이 사용 중이면 하나가 반납될 때까지 대기
+                self.condition.wait()
+        try:
+            return sqlite3.connect(path, timeout=10, check_same_thread=False)
+        except Exception:
+            with self.condition:
+                self.open_count -= 1
+                self.condition.notify()
+            raise
+
+    def release(self, path, conn):
+        with self.condition:
+            self.idle.setdefault(path, []).append(conn)
+            self.idle.move_to_end(path)
+            self.condition.notify()
+
+    @contextmanager
+    def connection(self, path):
+        conn = self.acquire(path)
+        try:
+            yield conn
+        finally:
+            self.release(path, conn)
+
+    def close(self):
+        with self.condition:
+            while self.idle:
+                self._close_oldest_idle()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ShardPool()
+    return _pool
+
+
+# function(conn) 을 파일마다 동시에 실행해서 결과 목록을 돌려줌 (paths 순서)
+def map_shards(function, paths=None):
+    global _executor
+    paths = all_paths() if paths is None else paths
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=FAN_OUT_WORKERS, thread_name_prefix="shard"
+        )
+    pool = get_pool()
+
+    def run(path):
+        with pool.connection(path) as conn:
+            return function(conn)
+
+    return list(_executor.map(run, paths))
+
+
+# 같은 SQL 을 모든 샤드에서 실행하고 행을 이어 붙임
+def fan_out(sql, params=(), paths=None):
+    results = map_shards(lambda conn: conn.execute(sql, params).fetchall(), paths)
+    return [row for rows in results for row in rows]
+
+
+# 기존 DB 의 모든 대회 / 모임을 샤드로 옮김
+def split_all():
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("SELECT DISTINCT event_type, event_name FROM match_store")
+    events = c.fetchall()
+    conn.close()
+    for event_type, event_name in events:
+        shard_id(event_type, event_name)
+    return events
+
+
+if __name__ == "__main__":
+    match_store.init_db()
+    live_score.init_db()
+    events = split_all()
+    print(f"대회 / 모임 {len(events)}개를 샤드로 옮겼습니다. ({SHARD_FOLDER})")
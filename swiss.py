@@ -0,0 +1,205 @@
+### 모임 스위스 방식 대진 (실시간 순위 / 레이팅 기반)
+
+# 그룹의 승점, Elo 레이팅, 맞붙은 상대를 메모리에 들고 있고
+# 다른 연결의 커밋은 PRAGMA data_version (PostgreSQL 은 change_log) 으로 감지한다.
+# 바뀐 경우에도 (id, version) 만 비교해서 새로 생기거나 끝난 매치만 반영하고,
+# 이미 반영한 결과가 수정/삭제된 경우에만 그룹 전체를 다시 읽는다.
+
+import os
+import threading
+import storage
+
+# 데이터베이스 설정
+DB_FOLDER = "db"
+DB_FILE = "db.sqlite"
+DB_PATH = os.path.join(DB_FOLDER, DB_FILE)
+
+# Elo 설정
+INITIAL_RATING = 1500
+K_FACTOR = 32
+
+# 한 번에 이보다 많이 바뀌면 증분 대신 전체 재구성
+MAX_INCREMENTAL = 500
+
+
+def pair_key(player1, player2):
+    return frozenset((player1, player2))
+
+
+class SwissPairing:
+    def __init__(self, group_name, db_path=DB_PATH):
+        self.group_name = group_name
+        self.conn = storage.connect_shared(db_path)
+        self.lock = threading.Lock()
+        self.data_version = None
+        self._reset()
+
+    def _reset(self):
+        # id -> (version, status, player1, player2)
+        self.rows = {}
+        self.points = {}
+        self.games = {}
+        self.rating = {}
+        self.opponents = {}
+        # 대기 중인 매치도 포함 (같은 대진을 다시 만들지 않도록)
+        self.played = set()
+
+    def _add_player(self, player):
+        if player not in self.rating:
+            self.points[player] = 0
+            self.games[player] = 0
+            self.rating[player] = INITIAL_RATING
+            self.opponents[player] = []
+
+    def _add_match(self, player1, player2):
+        self._add_player(player1)
+        self._add_player(player2)
+        self.played.add(pair_key(player1, player2))
+
+    def _add_result(self, player1, player2, score1, score2):
+        expected1 = 1 / (1 + 10 ** ((self.rating[player2] - self.rating[player1]) / 400))
+        result1 = 1 if score1 > score2 else 0 if score1 < score2 else 0.5
+        self.rating[player1] += K_FACTOR * (result1 - expected1)
+        self.rating[player2] -= K_FACTOR * (result1 - expected1)
+        self.points[player1] += result1
+        self.points[player2] += 1 - result1
+        for player, opponent in ((player1, player2), (player2, player1)):
+            self.games[player] += 1
+            self.opponents[player].append(opponent)
+
+    def _read_rows(self, c, match_ids=None):
+        query = """SELECT id, version, status, player1, player2, score1, score2
+                   FROM match_store
+                   WHERE event_type = 'group' AND event_name = ?"""
+        params = [self.group_name]
+        if match_ids is not None:
+            query += f" AND id IN ({', '.join('?' * len(match_ids))})"
+            params += match_ids
+        # 결과는 끝난 순서대로 반영해야 레이팅이 재구성과 같아짐
+        c.execute(query + " ORDER BY finished_at IS NULL, finished_at, id", params)
+        return c.fetchall()
+
+    def _apply(self, row):
+        match_id, version, status, player1, player2, score1, score2 = row
+        if status == "finished" and self.rows.get(match_id, (None, None))[1] != "finished":
+            self._add_match(player1, player2)
+            self._add_result(player1, player2, score1, score2)
+        elif match_id not in self.rows:
+            self._add_match(player1, player2)
+        self.rows[match_id] = (version, status, player1, player2)
+
+    def _rebuild(self, c):
+        self._reset()
+        for row in self._read_rows(c):
+            self._apply(row)
+
+    def refresh(self):
+        with self.lock:
+            c = self.conn.cursor()
+            data_version = storage.data_version(c)
+            if data_version == self.data_version:
+                return
+            c.execute(
+                """SELECT id, version FROM match_store
+                         WHERE event_type = 'group' AND event_name = ?""",
+                (self.group_name,),
+            )
+            versions = dict(c.fetchall())
+            changed = [
+                match_id
+                for match_id, version in versions.items()
+                if self.rows.get(match_id, (None,))[0] != version
+            ]
+            removed = self.rows.keys() - versions.keys()
+
+            # 처음 읽거나 한꺼번에 많이 바뀌었으면 그냥 전체를 다시 읽음
+            if not self.rows or len(changed) > MAX_INCREMENTAL:
+                self._rebuild(c)
+                self.data_version = data_version
+                return
+
+            rows = self._read_rows(c, changed) if changed else []
+            # 새 매치 추가나 대기 -> 종료 외의 변경은 누적값을 되돌릴 수 없으므로 재구성
+            needs_rebuild = bool(removed) or any(
+                match_id in self.rows
+                and (
+                    self.rows[match_id][1] == "finished"
+                    or self.rows[match_id][2:] != (player1, player2)
+                )
+                for match_id, _, _, player1, player2, _, _ in rows
+            )
+            if needs_rebuild:
+                self._rebuild(c)
+            else:
+                for row in rows:
+                    self._apply(row)
+            self.data_version = data_version
+
+    # 아직 경기가 없는 선수(출석만 한 선수)는 기본값으로 계산 (self 에는 넣지 않음)
+    def ranking_key(self, player):
+        buchholz = sum(
+            self.points[opponent] for opponent in self.opponents.get(player, ())
+        )
+        return (
+            -self.points.get(player, 0),
+            -buchholz,
+            -self.rating.get(player, INITIAL_RATING),
+            player,
+        )
+
+    # 순위표 [(선수, 승점, 경기 수, 부크홀츠, 레이팅)]
+    def standings(self, players=None):
+        self.refresh()
+        with self.lock:
+            players = [p for p in (players or self.rating) if p in self.rating]
+            ranked = sorted(players, key=self.ranking_key)
+            return [
+                (
+                    player,
+                    self.points[player],
+                    self.games[player],
+                    -self.ranking_key(player)[1],
+                    round(self.rating[player]),
+                )
+                for player in ranked
+            ]
+
+    # 다음 라운드 대진: 순위가 가까운 선수끼리, 이미 만난 상대는 피함
+    # 홀수면 가장 아래 순위 중 경기를 가장 많이 한 선수가 쉰다
+    # 여러 세션이 같은 객체를 쓰므로 출석한 선수를 순위표에 추가하지 않음
+    # 돌려주는 값: (대진 목록, 쉬는 선수)
+    def next_round(self, players=None):
+        self.refresh()
+        with self.lock:
+            players = list(dict.fromkeys(players or self.rating))
+            ranked = sorted(players, key=self.ranking_key)
+
+            bye = None
+            if len(ranked) % 2:
+                bye = max(
+                    reversed(ranked), key=lambda player: self.games.get(player, 0)
+                )
+                ranked.remove(bye)
+
+            pairs = []
+            while ranked:
+                player = ranked.pop(0)
+                opponent = next(
+                    (
+                        candidate
+                        for candidate in ranked
+                        if pair_key(player, candidate) not in self.played
+                    ),
+                    ranked[0],
+                )
+                ranked.remove(opponent)
+                pairs.append((player, opponent))
+            return pairs, bye
+
+    def round_number(self, players=None):
+        self.refresh()
+        with self.lock:
+            return 1 + max(
+                (self.games.get(player, 0) for player in players or self.games),
+                default=0,
+            )
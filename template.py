@@ -1,11 +1,17 @@
 ### 공식 토너먼트 대회 템플릿
 
 import streamlit as st
-import sqlite3
 import os
 from datetime import datetime
 import pytz
 import yaml
+import backup
+import live_score
+import match_store
+import result_queue
+import result_queue_ui
+import session_memory
+import wait_time
 
 
 # 설정 파일 로드
@@ -24,125 +30,218 @@ DB_PATH = os.path.join(DB_FOLDER, DB_FILE)
 # 서울 시간대 설정
 seoul_tz = pytz.timezone("Asia/Seoul")
 
+# 관람 화면의 실시간 점수를 다시 읽는 간격 (초)
+LIVE_SCORE_REFRESH_SECONDS = 2
+
 
 # 데이터베이스 연결 및 테이블 생성 함수
 def init_db():
-    if not os.path.exists(DB_FOLDER):
-        os.makedirs(DB_FOLDER)
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """CREATE TABLE IF NOT EXISTS matches
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  tournament_title TEXT,
-                  place TEXT,
-                  court TEXT,
-                  round_type TEXT,
-                  gender TEXT,
-                  match_type TEXT,
-                  player1 TEXT,
-                  player2 TEXT,
-                  score1 INTEGER,
-                  score2 INTEGER,
-                  date TEXT,
-                  status TEXT)"""
-    )
-    conn.commit()
-    conn.close()
+    match_store.init_db()
+    backup.start_scheduler()
+    live_score.init_db()
+
+
+# 변경 기록에 남길 작성자 (코트 페이지)
+def court_actor(place, court):
+    return f"{place} {court} 코트"
 
 
 def register_match(
     tournament_title, place, court, round_type, gender, match_type, player1, player2
 ):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """INSERT INTO matches (tournament_title, place, court, round_type, gender, match_type, player1, player2, date, status)
-                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (
-            tournament_title,
-            place,
-            court,
-            round_type,
-            gender,
-            match_type,
-            player1,
-            player2,
-            datetime.now(seoul_tz).strftime("%Y-%m-%d %H:%M:%S"),
-            "pending",
-        ),
+    match_store.register_match(
+        match_store.OFFICIAL,
+        tournament_title,
+        player1,
+        player2,
+        place=place,
+        court=court,
+        round_type=round_type,
+        gender=gender,
+        match_type=match_type,
+        actor=court_actor(place, court),
     )
-    conn.commit()
-    conn.close()
 
 
 def get_pending_matches(tournament_title, place, court):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """SELECT id, round_type, gender, match_type, player1, player2 
-                 FROM matches 
-                 WHERE tournament_title = ? AND place = ? AND court = ? AND status = 'pending'
-                 ORDER BY date""",
-        (tournament_title, place, court),
+    return match_store.get_pending_matches(
+        match_store.OFFICIAL, tournament_title, place, court
     )
-    matches = c.fetchall()
-    conn.close()
-    return matches
-
-
-def input_result(match_id, score1, score2):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """UPDATE matches 
-                 SET score1 = ?, score2 = ?, status = 'finished' 
-                 WHERE id = ?""",
-        (score1, score2, match_id),
-    )
-    conn.commit()
-    conn.close()
-
-
-def delete_match(match_id):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("DELETE FROM matches WHERE id = ?", (match_id,))
-    conn.commit()
-    conn.close()
-
-
-def update_match(match_id, round_type, gender, match_type, player1, player2):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """UPDATE matches 
-                 SET round_type = ?, gender = ?, match_type = ?, player1 = ?, player2 = ? 
-                 WHERE id = ?""",
-        (round_type, gender, match_type, player1, player2, match_id),
+
+
+def delete_match(match_id, version=None, actor=None):
+    return match_store.delete_match(match_id, version, actor)
+
+
+def update_match(
+    match_id,
+    round_type,
+    gender,
+    match_type,
+    player1,
+    player2,
+    version=None,
+    actor=None,
+):
+    return match_store.update_match(
+        match_id,
+        version,
+        actor,
+        round_type=round_type,
+        gender=gender,
+        match_type=match_type,
+        player1=player1,
+        player2=player2,
     )
-    conn.commit()
-    conn.close()
 
 
 def get_match_info(match_id):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """SELECT round_type, gender, match_type, player1, player2 
-                 FROM matches 
-                 WHERE id = ?""",
-        (match_id,),
+    return match_store.get_match_info(match_id)
+
+
+# 대기 시간 예측기 (모든 세션이 공유, 샤딩 중이면 대회 샤드마다 하나)
+@st.cache_resource
+def get_wait_time_predictor(db_path):
+    return wait_time.WaitTimePredictor(db_path)
+
+
+# 일괄 입력 표에서 두 점수가 모두 입력된 행만 [(match_id, score1, score2, version)]
+def batch_results(pending_matches, edited):
+    import pandas as pd
+
+    versions = {match[0]: match[6] for match in pending_matches}
+    results = []
+    for row in edited.itertuples(index=False):
+        if pd.isna(row.점수1) or pd.isna(row.점수2) or row.ID not in versions:
+            continue
+        results.append(
+            (int(row.ID), int(row.점수1), int(row.점수2), versions[row.ID])
+        )
+    return results
+
+
+# 대기열 전체를 한 표에서 입력하고 한 번에 저장 (한 묶음 = 한 트랜잭션)
+# (pandas 는 일괄 입력을 켤 때만 불러옴, 코트 페이지 콜드 스타트에 넣지 않음)
+def batch_result_section(pending_matches, actor):
+    import pandas as pd
+
+    grid = pd.DataFrame(
+        {
+            "ID": [match[0] for match in pending_matches],
+            "라운드": [match[1] for match in pending_matches],
+            "선수1": [match[4] for match in pending_matches],
+            "선수2": [match[5] for match in pending_matches],
+            "점수1": [None] * len(pending_matches),
+            "점수2": [None] * len(pending_matches),
+        }
     )
-    match = c.fetchone()
-    conn.close()
-    return {
-        "round_type": match[0],
-        "gender": match[1],
-        "match_type": match[2],
-        "player1": match[3],
-        "player2": match[4],
-    }
+    # 저장할 때마다 키를 바꿔서 이전 입력이 새 대기열의 다른 행에 남지 않게 함
+    editor_key = f"batch_results_{st.session_state.get('batch_round', 0)}"
+    score_column = st.column_config.NumberColumn(min_value=0, max_value=21, step=1)
+    edited = st.data_editor(
+        grid,
+        key=editor_key,
+        hide_index=True,
+        disabled=["ID", "라운드", "선수1", "선수2"],
+        column_config={"점수1": score_column, "점수2": score_column},
+    )
+    if st.button("일괄 저장", type="primary", key="save_batch_results"):
+        results = batch_results(pending_matches, edited)
+        if not results:
+            st.toast("입력된 결과가 없습니다.")
+            return
+        # 대기열에 모두 넣은 뒤 한 번에 보냄 (실패하면 대기열에 남아 자동으로 다시 보냄)
+        for match_id, score1, score2, version in results:
+            result_queue.queue_result(
+                st.session_state, match_id, score1, score2, version, actor
+            )
+        outcomes = result_queue_ui.sync_results() or {}
+        applied = [m for m, o in outcomes.items() if o == result_queue.APPLIED]
+        st.session_state.result_conflicts = [
+            m for m, o in outcomes.items() if o == result_queue.CONFLICT
+        ]
+        if applied:
+            st.toast(f"결과 {len(applied)}건이 저장되었습니다.")
+        st.session_state.batch_round = st.session_state.get("batch_round", 0) + 1
+        st.rerun()
+
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp, seoul_tz).strftime("%H:%M")
+
+
+# 선수 이름으로 모든 코트의 다음 경기 찾기
+def find_next_match_section(tournament_title):
+    with st.expander("🔎 내 다음 경기 찾기"):
+        player_name = st.text_input("선수 이름", key="find_next_match")
+        if player_name:
+            predictor = get_wait_time_predictor(
+                match_store.event_db_path(match_store.OFFICIAL, tournament_title)
+            )
+            next_matches = predictor.find_next_matches(player_name)
+            if next_matches:
+                for match in next_matches:
+                    st.markdown(
+                        f"**{match['place']} {match['court']} 코트** "
+                        f"{match['position']}번째 | {match['round_type']} "
+                        f"| {match['player1']} VS {match['player2']} "
+                        f"| 예상 시작 **{format_time(match['expected_start'])}**"
+                    )
+            else:
+                st.info("대기 중인 경기가 없습니다.")
+
+
+# 실시간 점수 표시 및 심판 입력
+# 점수판만 몇 초마다 다시 그려서 관람자도 새로고침 없이 점수를 봄
+@st.fragment(run_every=LIVE_SCORE_REFRESH_SECONDS)
+def live_score_board(match_id):
+    score1, score2 = live_score.get_live_score(match_id)
+
+    col1, col2, col3 = st.columns([2, 1, 2])
+    with col1:
+        st.markdown(f"## :blue[{score1}]")
+    with col2:
+        st.markdown("## :")
+    with col3:
+        st.markdown(f"## :blue[{score2}]")
+
+
+def live_score_section(match_id, player1, player2, is_admin, actor=None):
+    live_score_board(match_id)
+
+    if is_admin:
+        col1, col2, col3, col4, col5 = st.columns([1, 1, 3, 1, 1])
+        with col1:
+            if st.button("+1", key=f"live_plus1_{match_id}", type="primary"):
+                live_score.add_point(match_id, 1)
+                st.rerun()
+        with col2:
+            if st.button("-1", key=f"live_minus1_{match_id}"):
+                live_score.add_point(match_id, 1, -1)
+                st.rerun()
+        with col3:
+            if st.button("경기 종료", key=f"live_finish_{match_id}"):
+                try:
+                    final_score = live_score.finish_live_match(match_id, actor)
+                except ValueError as error:
+                    st.toast(str(error))
+                    return
+                if final_score:
+                    final1, final2 = final_score
+                    st.toast(
+                        f"{player1} {final1} : {final2} {player2} 결과가 저장되었습니다."
+                    )
+                else:
+                    st.toast("이미 결과가 입력된 매치입니다.")
+                st.rerun()
+        with col4:
+            if st.button("+1", key=f"live_plus2_{match_id}", type="primary"):
+                live_score.add_point(match_id, 2)
+                st.rerun()
+        with col5:
+            if st.button("-1", key=f"live_minus2_{match_id}"):
+                live_score.add_point(match_id, 2, -1)
+                st.rerun()
 
 
 def create_court_page(tournament_title, place, court):
@@ -160,11 +259,12 @@ def create_court_page(tournament_title, place, court):
 
     # 관리자 모드 확인
     is_admin = st.session_state.get("admin_mode", False)
+    actor = court_actor(place, court)
 
     if is_admin:
         # 정보 수정 다이얼로그
         @st.dialog("매치 정보 수정")
-        def edit_match_info(match_id):
+        def edit_match_info(match_id, version):
             match_info = get_match_info(match_id)
 
             edited_round_type = st.selectbox(
@@ -202,20 +302,24 @@ def create_court_page(tournament_title, place, court):
                     st.rerun()
             with col2:
                 if st.button("수정", type="primary", key=f"edit_confirm_{match_id}"):
-                    update_match(
+                    if update_match(
                         match_id,
                         edited_round_type,
                         edited_gender,
                         edited_match_type,
                         edited_player1,
                         edited_player2,
-                    )
-                    st.toast("매치 정보가 수정되었습니다.")
-                    st.rerun()
+                        version,
+                        actor,
+                    ):
+                        st.toast("매치 정보가 수정되었습니다.")
+                        st.rerun()
+                    else:
+                        st.error("다른 관리자가 먼저 수정했습니다. 창을 닫고 다시 시도하세요.")
 
         # 결과 입력 다이얼로그
         @st.dialog("결과 입력")
-        def input_result_dialog(match_id):
+        def input_result_dialog(match_id, version):
             match_info = get_match_info(match_id)
             st.subheader(f"{match_info['player1']} VS {match_info['player2']}")
 
@@ -238,9 +342,17 @@ def create_court_page(tournament_title, place, court):
                 )
 
             if st.button("결과 저장", type="primary", key=f"save_result_{match_id}"):
-                input_result(match_id, score1, score2)
-                st.toast("결과가 저장되었습니다.")
-                st.rerun()
+                # 대기열에 먼저 넣어서 저장 중에 연결이 끊겨도 결과를 잃지 않음
+                result_queue.queue_result(
+                    st.session_state, match_id, score1, score2, version, actor
+                )
+                outcome = (result_queue_ui.sync_results() or {}).get(match_id)
+                if outcome == result_queue.CONFLICT:
+                    st.error("다른 관리자가 먼저 수정했습니다. 창을 닫고 다시 시도하세요.")
+                else:
+                    if outcome == result_queue.APPLIED:
+                        st.toast("결과가 저장되었습니다.")
+                    st.rerun()
 
         # 입력 섹션
         st.subheader("매치 정보 입력")
@@ -283,15 +395,40 @@ def create_court_page(tournament_title, place, court):
                 else:
                     st.toast("플레이어 이름을 모두 입력해주세요.")
 
+    if is_admin:
+        for match_id in st.session_state.pop("result_conflicts", []):
+            st.error(
+                f"ID {match_id} 매치는 다른 관리자가 먼저 수정해서 결과를 저장하지 않았습니다."
+            )
+        result_queue_ui.result_queue_section()
+
+    find_next_match_section(tournament_title)
+
     # 대기열 표시
     pending_matches = get_pending_matches(tournament_title, place, court)
-    if pending_matches:
+
+    # 끝나거나 삭제된 매치의 위젯 키 정리
+    session_memory.cleanup_match_keys(
+        st.session_state, [match[0] for match in pending_matches]
+    )
+    batch_mode = is_admin and st.toggle("일괄 결과 입력", key="batch_mode")
+    if pending_matches and batch_mode:
+        st.markdown("---")
+        batch_result_section(pending_matches, actor)
+    elif pending_matches:
+        predictor = get_wait_time_predictor(
+            match_store.event_db_path(match_store.OFFICIAL, tournament_title)
+        )
+        expected_starts = predictor.estimate_court(tournament_title, place, court)
         st.markdown("---")
         for idx, match in enumerate(pending_matches):
-            match_id, round_type, gender, match_type, player1, player2 = match
-            coll, _, colr = st.columns([2, 3, 5])
+            match_id, round_type, gender, match_type, player1, player2, version = match
+            coll, colm, colr = st.columns([2, 3, 5])
             with coll:
                 st.markdown(f"### 매치 {idx+1}")
+            with colm:
+                if match_id in expected_starts:
+                    st.caption(f"예상 시작 {format_time(expected_starts[match_id])}")
             with colr:
                 st.markdown(f"### **{round_type}** | **{gender}** | **{match_type}**")
 
@@ -303,24 +440,47 @@ def create_court_page(tournament_title, place, court):
             with col3:
                 st.markdown(f"### {player2}")
 
+            # 현재 코트에서 진행 중인 매치(대기열 첫 번째)는 실시간 점수 표시
+            if idx == 0:
+                live_score_section(match_id, player1, player2, is_admin, actor)
+
             if is_admin:
-                col1, col2, col3, col4 = st.columns([2, 2, 5, 2])
+                queued = result_queue.queued_results(st.session_state).get(match_id)
+                if queued:
+                    st.caption(
+                        f"⏳ 결과 {queued['score1']} : {queued['score2']} 저장 대기 중"
+                    )
+                col1, col2, col3, col4, _, col6 = st.columns([2, 2, 1, 1, 3, 2])
                 with col1:
                     if st.button(
                         "정보 수정", key=f"update_input_{match_id}", type="secondary"
                     ):
-                        edit_match_info(match_id)
+                        edit_match_info(match_id, version)
                 with col2:
                     if st.button(
                         "삭제", key=f"delete_match_{match_id}", type="secondary"
                     ):
-                        delete_match(match_id)
+                        if not delete_match(match_id, version, actor):
+                            st.toast("다른 관리자가 먼저 수정한 매치입니다. 다시 확인하세요.")
+                        st.rerun()
+                # 순서 바꾸기 (옮긴 매치 한 행만 씀)
+                with col3:
+                    if st.button("▲", key=f"move_up_{match_id}", disabled=idx == 0):
+                        match_store.move_match(match_id, idx - 1, actor)
                         st.rerun()
                 with col4:
+                    if st.button(
+                        "▼",
+                        key=f"move_down_{match_id}",
+                        disabled=idx == len(pending_matches) - 1,
+                    ):
+                        match_store.move_match(match_id, idx + 1, actor)
+                        st.rerun()
+                with col6:
                     if st.button(
                         "결과 입력", key=f"result_input_{match_id}", type="primary"
                     ):
-                        input_result_dialog(match_id)
+                        input_result_dialog(match_id, version)
 
             st.markdown("---")
     else:
@@ -1,11 +1,17 @@
 ### 비공식 그룹을 위한 템플릿
 
 import streamlit as st
-import sqlite3
 import os
-from datetime import datetime
+from datetime import datetime, time
 import pytz
 import yaml
+import backup
+import fixtures
+import match_store
+import result_queue
+import result_queue_ui
+import session_memory
+import swiss
 
 
 # 설정 파일 로드
@@ -27,104 +33,175 @@ seoul_tz = pytz.timezone("Asia/Seoul")
 
 # 데이터베이스 연결 및 테이블 생성 함수
 def init_db():
-    if not os.path.exists(DB_FOLDER):
-        os.makedirs(DB_FOLDER)
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """CREATE TABLE IF NOT EXISTS unofficial_group_matches
-                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
-                  group_name TEXT,
-                  player1 TEXT,
-                  score1 INTEGER,
-                  player2 TEXT,
-                  score2 INTEGER,
-                  date TEXT,
-                  status TEXT)"""
-    )
-    conn.commit()
-    conn.close()
+    match_store.init_db()
+    backup.start_scheduler()
 
 
 def register_match(group_name, player1, player2):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """INSERT INTO unofficial_group_matches (group_name, player1, player2, date, status)
-                 VALUES (?, ?, ?, ?, ?)""",
-        (
-            group_name,
-            player1,
-            player2,
-            datetime.now(seoul_tz).strftime("%Y-%m-%d %H:%M:%S"),
-            "pending",
-        ),
+    match_store.register_match(
+        match_store.GROUP, group_name, player1, player2, actor=group_name
     )
-    conn.commit()
-    conn.close()
 
 
-def get_pending_matches(group_name):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """SELECT id, player1, player2 
-                 FROM unofficial_group_matches 
-                 WHERE group_name = ? AND status = 'pending'
-                 ORDER BY date""",
-        (group_name,),
-    )
-    matches = c.fetchall()
-    conn.close()
-    return matches
-
-
-def input_result(match_id, score1, score2):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """UPDATE unofficial_group_matches 
-                 SET score1 = ?, score2 = ?, status = 'finished' 
-                 WHERE id = ?""",
-        (score1, score2, match_id),
+# 여러 매치를 한 번에 등록 (스위스 대진 등)
+def register_matches(group_name, pairs, round_type=None):
+    return match_store.register_matches(
+        match_store.GROUP,
+        group_name,
+        [
+            {"player1": player1, "player2": player2, "round_type": round_type}
+            for player1, player2 in pairs
+        ],
+        actor=group_name,
     )
-    conn.commit()
-    conn.close()
-
-
-def delete_match(match_id):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("DELETE FROM unofficial_group_matches WHERE id = ?", (match_id,))
-    conn.commit()
-    conn.close()
-
-
-def update_match(match_id, player1, player2):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """UPDATE unofficial_group_matches 
-                 SET player1 = ?, player2 = ? 
-                 WHERE id = ?""",
-        (player1, player2, match_id),
+
+
+def get_pending_matches(group_name):
+    pending_matches = match_store.get_pending_matches(match_store.GROUP, group_name)
+    return [
+        (match_id, player1, player2, version)
+        for match_id, _, _, _, player1, player2, version in pending_matches
+    ]
+
+
+def delete_match(match_id, version=None, actor=None):
+    return match_store.delete_match(match_id, version, actor)
+
+
+def update_match(match_id, player1, player2, version=None, actor=None):
+    return match_store.update_match(
+        match_id, version, actor, player1=player1, player2=player2
     )
-    conn.commit()
-    conn.close()
 
 
 def get_match_info(match_id):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute(
-        """SELECT player1, player2 
-                 FROM unofficial_group_matches 
-                 WHERE id = ?""",
-        (match_id,),
+    match_info = match_store.get_match_info(match_id)
+    return {"player1": match_info["player1"], "player2": match_info["player2"]}
+
+
+# 참가 선수 명단으로 대진표를 만들고 코트/시간에 배정한 뒤 한 번에 등록
+def fixture_section(group_name):
+    with st.expander("📋 대진표 자동 생성"):
+        roster = st.text_area("참가 선수 (한 줄에 한 명, 위에서부터 시드 순)", key="fixture_roster")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            mode = st.selectbox(
+                "방식", [fixtures.ROUND_ROBIN, fixtures.SWISS], key="fixture_mode"
+            )
+        with col2:
+            rounds = st.number_input(
+                "라운드 수 (0 = 전체)", min_value=0, step=1, key="fixture_rounds"
+            )
+        with col3:
+            courts = st.number_input(
+                "코트 수", min_value=1, value=3, step=1, key="fixture_courts"
+            )
+        col1, col2 = st.columns(2)
+        with col1:
+            start_time = st.time_input("시작 시각", value=time(19, 0), key="fixture_start")
+        with col2:
+            slot_minutes = st.number_input(
+                "경기당 시간(분)", min_value=5, value=20, step=5, key="fixture_minutes"
+            )
+
+        if st.button("대진표 만들기", key="fixture_preview"):
+            start_at = seoul_tz.localize(
+                datetime.combine(datetime.now(seoul_tz).date(), start_time)
+            ).timestamp()
+            st.session_state.fixture_plan = fixtures.make_fixtures(
+                [line.strip() for line in roster.splitlines()],
+                mode,
+                int(courts),
+                start_at,
+                int(slot_minutes) * 60,
+                int(rounds) or None,
+            )
+
+        plan = st.session_state.get("fixture_plan")
+        if plan:
+            st.caption(f"{len(plan)}경기, 시간대 {plan[-1]['slot']}개")
+            if rounds and max(fixture["round"] for fixture in plan) > rounds:
+                st.caption("쉰 선수끼리 보충 라운드를 하나 더 넣어 경기 수를 맞췄습니다.")
+            st.dataframe(
+                [
+                    {
+                        "시각": datetime.fromtimestamp(
+                            fixture["start_at"], seoul_tz
+                        ).strftime("%H:%M"),
+                        "코트": fixture["court"],
+                        "라운드": fixture["round"],
+                        "선수1": fixture["player1"],
+                        "선수2": fixture["player2"],
+                    }
+                    for fixture in plan
+                ],
+                hide_index=True,
+            )
+            st.caption(
+                "코트와 시각은 안내용입니다. 등록하면 이 순서대로 그룹 대기열 하나에 들어갑니다."
+            )
+            if st.button("대진표 등록", type="primary", key="fixture_register"):
+                fixtures.register_fixtures(group_name, plan, group_name)
+                del st.session_state.fixture_plan
+                st.toast(f"{len(plan)}경기를 등록했습니다.")
+                st.rerun()
+
+
+# 스위스 대진용 순위/레이팅 (그룹별로 모든 세션이 공유)
+@st.cache_resource
+def get_swiss_pairing(group_name):
+    return swiss.SwissPairing(
+        group_name, match_store.event_db_path(match_store.GROUP, group_name)
     )
-    match = c.fetchone()
-    conn.close()
-    return {"player1": match[0], "player2": match[1]}
+
+
+# 현재 순위로 다음 라운드 대진을 만들어 등록
+def swiss_section(group_name):
+    with st.expander("🔀 스위스 다음 라운드"):
+        pairing = get_swiss_pairing(group_name)
+        attendees = st.text_area(
+            "오늘 참가 선수 (한 줄에 한 명, 비우면 기록이 있는 모든 선수)",
+            key="swiss_attendees",
+        )
+        players = [line.strip() for line in attendees.splitlines() if line.strip()]
+
+        standings = pairing.standings(players or None)
+        if standings:
+            st.dataframe(
+                [
+                    {
+                        "순위": rank,
+                        "선수": player,
+                        "승점": points,
+                        "경기": games,
+                        "부크홀츠": buchholz,
+                        "레이팅": rating,
+                    }
+                    for rank, (player, points, games, buchholz, rating) in enumerate(
+                        standings, start=1
+                    )
+                ],
+                hide_index=True,
+            )
+
+        if st.button("다음 라운드 대진 만들기", key="swiss_preview"):
+            round_no = pairing.round_number(players or None)
+            pairs, bye = pairing.next_round(players or None)
+            st.session_state.swiss_plan = (round_no, pairs, bye)
+
+        plan = st.session_state.get("swiss_plan")
+        if plan:
+            round_no, pairs, bye = plan
+            st.markdown(f"**스위스 {round_no}라운드**")
+            for player1, player2 in pairs:
+                st.markdown(f"- {player1} VS {player2}")
+            if bye:
+                st.caption(f"이번 라운드 휴식: {bye}")
+            if pairs and st.button("대진 등록", type="primary", key="swiss_register"):
+                register_matches(group_name, pairs, f"스위스 {round_no}라운드")
+                del st.session_state.swiss_plan
+                st.toast(f"{len(pairs)}경기를 등록했습니다.")
+                st.rerun()
 
 
 def create_unofficial_group_page(group_name):
@@ -145,7 +222,7 @@ def create_unofficial_group_page(group_name):
     if is_admin:
         # 정보 수정 다이얼로그
         @st.dialog("매치 정보 수정")
-        def edit_match_info(match_id):
+        def edit_match_info(match_id, version):
             match_info = get_match_info(match_id)
 
             edited_player1 = st.text_input(
@@ -165,13 +242,17 @@ def create_unofficial_group_page(group_name):
                     st.rerun()
             with col2:
                 if st.button("수정", type="primary", key=f"edit_confirm_{match_id}"):
-                    update_match(match_id, edited_player1, edited_player2)
-                    st.toast("매치 정보가 수정되었습니다.")
-                    st.rerun()
+                    if update_match(
+                        match_id, edited_player1, edited_player2, version, group_name
+                    ):
+                        st.toast("매치 정보가 수정되었습니다.")
+                        st.rerun()
+                    else:
+                        st.error("다른 관리자가 먼저 수정했습니다. 창을 닫고 다시 시도하세요.")
 
         # 결과 입력 다이얼로그
         @st.dialog("결과 입력")
-        def input_result_dialog(match_id):
+        def input_result_dialog(match_id, version):
             match_info = get_match_info(match_id)
             st.subheader(f"{match_info['player1']} VS {match_info['player2']}")
 
@@ -194,9 +275,17 @@ def create_unofficial_group_page(group_name):
                 )
 
             if st.button("결과 저장", type="primary", key=f"save_result_{match_id}"):
-                input_result(match_id, score1, score2)
-                st.toast("결과가 저장되었습니다.")
-                st.rerun()
+                # 대기열에 먼저 넣어서 저장 중에 연결이 끊겨도 결과를 잃지 않음
+                result_queue.queue_result(
+                    st.session_state, match_id, score1, score2, version, group_name
+                )
+                outcome = (result_queue_ui.sync_results() or {}).get(match_id)
+                if outcome == result_queue.CONFLICT:
+                    st.error("다른 관리자가 먼저 수정했습니다. 창을 닫고 다시 시도하세요.")
+                else:
+                    if outcome == result_queue.APPLIED:
+                        st.toast("결과가 저장되었습니다.")
+                    st.rerun()
 
         # 입력 섹션
         st.subheader("매치 정보 입력")
@@ -217,12 +306,26 @@ def create_unofficial_group_page(group_name):
                 else:
                     st.toast("플레이어 이름을 모두 입력해주세요.")
 
+        fixture_section(group_name)
+        swiss_section(group_name)
+
+        for match_id in st.session_state.pop("result_conflicts", []):
+            st.error(
+                f"ID {match_id} 매치는 다른 관리자가 먼저 수정해서 결과를 저장하지 않았습니다."
+            )
+        result_queue_ui.result_queue_section()
+
     # 대기열 표시
     pending_matches = get_pending_matches(group_name)
+
+    # 끝나거나 삭제된 매치의 위젯 키 정리
+    session_memory.cleanup_match_keys(
+        st.session_state, [match[0] for match in pending_matches]
+    )
     if pending_matches:
         st.markdown("---")
         for idx, match in enumerate(pending_matches):
-            match_id, player1, player2 = match
+            match_id, player1, player2, version = match
             st.markdown(f"### 매치 {idx+1}")
 
             col1, col2, col3 = st.columns([2, 1, 2])
@@ -234,23 +337,29 @@ def create_unofficial_group_page(group_name):
                 st.markdown(f"### {player2}")
 
             if is_admin:
+                queued = result_queue.queued_results(st.session_state).get(match_id)
+                if queued:
+                    st.caption(
+                        f"⏳ 결과 {queued['score1']} : {queued['score2']} 저장 대기 중"
+                    )
                 col1, col2, col3 = st.columns([2, 2, 2])
                 with col1:
                     if st.button(
                         "정보 수정", key=f"update_input_{match_id}", type="secondary"
                     ):
-                        edit_match_info(match_id)
+                        edit_match_info(match_id, version)
                 with col2:
                     if st.button(
                         "삭제", key=f"delete_match_{match_id}", type="secondary"
                     ):
-                        delete_match(match_id)
+                        if not delete_match(match_id, version, group_name):
+                            st.toast("다른 관리자가 먼저 수정한 매치입니다. 다시 확인하세요.")
                         st.rerun()
                 with col3:
                     if st.button(
                         "결과 입력", key=f"result_input_{match_id}", type="primary"
                     ):
-                        input_result_dialog(match_id)
+                        input_result_dialog(match_id, version)
 
             st.markdown("---")
     else:
@@ -0,0 +1,102 @@
+import change_log
+import match_store
+from conftest import TITLE, by_label
+
+
+def register():
+    return match_store.register_match(
+        match_store.OFFICIAL, TITLE, "김", "이", place="중화", court="A"
+    )
+
+
+def test_requires_password(run_page):
+    at = run_page("admin")
+    assert not at.exception
+    assert at.text_input[0].label.startswith("데이터베이스 관리자 비밀번호")
+
+    at.text_input[0].set_value("wrong")
+    at.button[0].click().run()
+    assert at.error[0].value == "비밀번호가 올바르지 않습니다."
+
+    at.text_input[0].set_value("dbadmin")
+    at.button[0].click().run()
+    assert at.session_state["password_correct"]
+    assert not at.exception
+
+
+def test_delete_by_id_is_logged(run_page):
+    match_id = register()
+    at = run_page("admin", admin=True)
+    by_label(at.selectbox, "테이블 선택").set_value("match_store").run()
+    by_label(at.number_input, "삭제할 데이터의 ID를 입력하세요").set_value(match_id).run()
+    at.checkbox[0].check().run()
+    at.button(key="delete_by_id").click().run()
+    assert not at.exception
+    assert match_store.get_player_matches("김") == []
+    assert [change[4] for change in change_log.list_changes(match_id)] == [
+        "delete",
+        "insert",
+    ]
+
+
+def change_log_ids(at):
+    for dataframe in at.dataframe:
+        if "변경 내용" in dataframe.value.columns:
+            return dataframe.value["ID"].tolist()
+    return []
+
+
+def test_change_log_paging(run_page):
+    match_id = register()
+    for i in range(60):
+        match_store.update_match(match_id, player1=f"김{i}")
+    at = run_page("admin", admin=True)
+    first_page = change_log_ids(at)
+    assert len(first_page) == 50
+    assert first_page == sorted(first_page, reverse=True)
+
+    at.button(key="change_log_next").click().run()
+    second_page = change_log_ids(at)
+    assert len(second_page) == 11
+    assert max(second_page) < min(first_page)
+
+    at.button(key="change_log_first").click().run()
+    assert change_log_ids(at) == first_page
+
+
+def test_sharded_matches_are_listed_and_deleted(sharded, run_page):
+    match_id = register()
+    match_store.update_match(match_id, player1="박")
+    at = run_page("admin", admin=True)
+    by_label(at.selectbox, "테이블 선택").set_value("match_store").run()
+    assert at.session_state["admin_snapshot"][1]["id"].tolist() == [match_id]
+    # 매치를 지정하지 않은 변경 기록도 샤드에서 읽음
+    assert change_log_ids(at) == [2, 1]
+
+    by_label(at.number_input, "삭제할 데이터의 ID를 입력하세요").set_value(match_id).run()
+    at.checkbox[0].check().run()
+    at.button(key="delete_by_id").click().run()
+    assert not at.exception
+    assert match_store.get_player_matches("박") == []
+    assert [change[4] for change in change_log.list_changes()] == [
+        "delete",
+        "update",
+        "insert",
+    ]
+
+
+def test_delete_all_is_logged_and_audit_tables_are_hidden(run_page):
+    match_id = register()
+    at = run_page("admin", admin=True)
+    tables = by_label(at.selectbox, "테이블 선택").options
+    assert "match_store" in tables
+    assert "change_log" not in tables and "applied_results" not in tables
+
+    by_label(at.selectbox, "테이블 선택").set_value("match_store").run()
+    by_label(at.checkbox, "모든 데이터를 삭제하시겠습니까?").check().run()
+    at.button(key="delete_all").click().run()
+    assert not at.exception
+    assert match_store.get_player_matches("김") == []
+    changes = change_log.list_changes(match_id)
+    assert [change[4] for change in changes] == ["delete", "insert"]
+    assert '"player1": ["김", null]' in changes[0][5]
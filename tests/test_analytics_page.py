@@ -0,0 +1,25 @@
+import match_store
+from conftest import TITLE
+
+
+def test_empty_database(run_page):
+    at = run_page("analytics")
+    assert not at.exception
+
+
+def test_with_matches(run_page, seed_matches):
+    seed_matches(200, pending=3)
+    at = run_page("analytics")
+    assert not at.exception
+
+
+def test_admin_correction_refreshes_summaries(run_page):
+    match_id = match_store.register_match(match_store.OFFICIAL, TITLE, "김", "이")
+    match_store.input_result(match_id, 11, 3)
+    at = run_page("analytics")
+    assert set(at.multiselect[0].options) == {"김", "이"}
+    # 매치 수는 그대로인 수정
+    match_store.update_match(match_id, player2="박")
+    at.run()
+    assert not at.exception
+    assert set(at.multiselect[0].options) == {"김", "박"}
@@ -0,0 +1,84 @@
+import threading
+
+import change_log
+import match_store
+from conftest import TITLE
+
+THREADS = 8
+EDITS = 10
+
+
+def register():
+    return match_store.register_match(
+        match_store.OFFICIAL, TITLE, "0", "이", place="중화", court="A"
+    )
+
+
+def run_threads(target):
+    barrier = threading.Barrier(THREADS)
+    errors = []
+
+    def run(worker):
+        try:
+            barrier.wait()
+            target(worker)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+# 여러 스레드가 같은 매치의 player1 카운터를 읽고 1 올려서 version 조건부로 씀.
+# 늦게 읽은 쪽은 충돌로 실패하고 다시 읽으므로 잃어버리는 수정이 없어야 함
+def test_concurrent_updates_do_not_lose_writes():
+    match_id = register()
+    successes = []
+
+    def edit(worker):
+        for _ in range(EDITS):
+            while True:
+                info = match_store.get_match_info(match_id)
+                counter = int(info["player1"]) + 1
+                if match_store.update_match(
+                    match_id, info["version"], f"스레드{worker}", player1=str(counter)
+                ):
+                    successes.append(counter)
+                    break
+
+    run_threads(edit)
+
+    info = match_store.get_match_info(match_id)
+    assert len(successes) == THREADS * EDITS
+    assert sorted(successes) == list(range(1, THREADS * EDITS + 1))
+    assert int(info["player1"]) == info["version"] == len(successes)
+    changes = change_log.list_changes(match_id, limit=1000)
+    assert len([c for c in changes if c[4] == "update"]) == len(successes)
+
+
+def test_stale_version_is_rejected():
+    match_id = register()
+    stale = match_store.get_match_info(match_id)["version"]
+    assert match_store.update_match(match_id, stale, player1="박")
+    assert not match_store.update_match(match_id, stale, player1="최")
+    assert not match_store.delete_match(match_id, stale)
+    info = match_store.get_match_info(match_id)
+    assert (info["player1"], info["version"]) == ("박", stale + 1)
+
+
+# 같은 version 으로 동시에 삭제하면 한 번만 성공
+def test_concurrent_deletes_with_one_version():
+    match_id = register()
+    version = match_store.get_match_info(match_id)["version"]
+    results = []
+
+    def delete(worker):
+        results.append(match_store.delete_match(match_id, version))
+
+    run_threads(delete)
+    assert sorted(results) == [False] * (THREADS - 1) + [True]
+    assert [c[4] for c in change_log.list_changes(match_id)] == ["delete", "insert"]
@@ -0,0 +1,230 @@
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pandas as pd
+import pytest
+
+import change_log
+import live_score
+import match_store
+import wait_time
+from conftest import ROOT, TITLE, click_in_dialog
+
+
+def pending(court="A"):
+    return match_store.get_pending_matches(match_store.OFFICIAL, TITLE, "중화", court)
+
+
+def register(player1="김", player2="이"):
+    return match_store.register_match(
+        match_store.OFFICIAL,
+        TITLE,
+        player1,
+        player2,
+        place="중화",
+        court="A",
+        round_type="예선",
+        gender="남",
+        match_type="새내기부",
+    )
+
+
+def test_viewer_has_no_match_widgets(run_page):
+    match_id = register()
+    at = run_page("court")
+    assert not at.exception
+    assert any("김" in md.value for md in at.markdown)
+    assert [button.key for button in at.button] == []
+    assert f"result_input_{match_id}" not in at.session_state
+
+
+def test_register_match(run_page):
+    at = run_page("court", admin=True)
+    at.text_input(key="input_player1").set_value("김")
+    at.text_input(key="input_player2").set_value("이")
+    at.button(key="register_match").click().run()
+    assert not at.exception
+    assert [(m[4], m[5]) for m in pending()] == [("김", "이")]
+    assert pending("B") == []
+
+
+def test_register_requires_both_players(run_page):
+    at = run_page("court", admin=True)
+    at.text_input(key="input_player1").set_value("김")
+    at.button(key="register_match").click().run()
+    assert pending() == []
+    assert "플레이어 이름을 모두 입력해주세요." in [t.value for t in at.toast]
+
+
+def test_input_result(run_page):
+    match_id = register()
+    at = run_page("court", admin=True)
+    at.button(key=f"result_input_{match_id}").click().run()
+    at.number_input(key=f"score1_{match_id}").set_value(21)
+    at.number_input(key=f"score2_{match_id}").set_value(15)
+    click_in_dialog(at, f"result_input_{match_id}", f"save_result_{match_id}")
+    assert not at.exception
+    assert pending() == []
+    assert match_store.get_player_matches("김")[0][5:7] == (21, 15)
+
+
+def test_edit_match(run_page):
+    match_id = register()
+    at = run_page("court", admin=True)
+    at.button(key=f"update_input_{match_id}").click().run()
+    at.text_input(key=f"edit_player1_{match_id}").set_value("박")
+    at.selectbox(key=f"edit_round_type_{match_id}").set_value("결승")
+    click_in_dialog(at, f"update_input_{match_id}", f"edit_confirm_{match_id}")
+    assert not at.exception
+    info = match_store.get_match_info(match_id)
+    assert (info["player1"], info["round_type"], info["version"]) == ("박", "결승", 1)
+
+
+def test_delete_match(run_page):
+    match_id = register()
+    register("박", "최")
+    at = run_page("court", admin=True)
+    at.button(key=f"delete_match_{match_id}").click().run()
+    assert not at.exception
+    assert [(m[4], m[5]) for m in pending()] == [("박", "최")]
+
+
+def test_live_score_and_finish(run_page):
+    match_id = register()
+    at = run_page("court", admin=True)
+    at.button(key=f"live_plus1_{match_id}").click().run()
+    at.button(key=f"live_plus1_{match_id}").click().run()
+    at.button(key=f"live_plus2_{match_id}").click().run()
+    assert live_score.get_live_score(match_id) == (2, 1)
+    at.button(key=f"live_finish_{match_id}").click().run()
+    assert not at.exception
+    assert pending() == []
+    assert match_store.get_player_matches("김")[0][5:7] == (2, 1)
+
+
+def test_stale_match_keys_are_cleaned(run_page):
+    match_id = register()
+    at = run_page("court", admin=True)
+    at.button(key=f"result_input_{match_id}").click().run()
+    assert f"score1_{match_id}" in at.session_state
+    match_store.delete_match(match_id)
+    at.run()
+    assert f"score1_{match_id}" not in at.session_state
+
+
+def test_find_next_match(run_page):
+    register("김", "이")
+    register("박", "최")
+    at = run_page("court")
+    at.text_input(key="find_next_match").set_value("최").run()
+    assert not at.exception
+    assert any("2번째" in md.value and "박 VS 최" in md.value for md in at.markdown)
+
+
+def move_changes(match_id):
+    return [c for c in change_log.list_changes(match_id) if c[4] == "move"]
+
+
+def test_move_match_writes_one_row():
+    first, second, third = [register(f"선수{i}", f"상대{i}") for i in range(3)]
+    assert match_store.move_match(third, 0)
+    assert [m[0] for m in pending()] == [third, first, second]
+    assert match_store.move_match(first, 2)
+    assert [m[0] for m in pending()] == [third, second, first]
+    # 옮긴 매치만 기록되고 version 은 그대로
+    assert [len(move_changes(m)) for m in (first, second, third)] == [1, 0, 1]
+    assert match_store.get_match_info(third)["version"] == 0
+
+
+def test_move_match_renumbers_when_gap_is_used_up():
+    match_ids = [register(f"선수{i}", f"상대{i}") for i in range(3)]
+    # 마이그레이션 전 매치처럼 순서 값이 모두 0
+    conn = sqlite3.connect(match_store.DB_PATH)
+    conn.execute("UPDATE match_store SET queue_position = 0")
+    conn.commit()
+    conn.close()
+    assert match_store.move_match(match_ids[2], 1)
+    assert [m[0] for m in pending()] == [match_ids[0], match_ids[2], match_ids[1]]
+    # 다시 매긴 뒤에는 간격이 있어서 한 행만 씀
+    assert match_store.move_match(match_ids[1], 0)
+    assert [len(move_changes(m)) for m in match_ids] == [1, 2, 1]
+    match_store.input_result(match_ids[0], 11, 3)
+    assert not match_store.move_match(match_ids[0], 0)
+
+
+def test_move_buttons(run_page):
+    first = register("김", "이")
+    second = register("박", "최")
+    at = run_page("court", admin=True)
+    assert at.button(key=f"move_up_{first}").disabled
+    assert at.button(key=f"move_down_{second}").disabled
+    at.button(key=f"move_down_{first}").click().run()
+    assert not at.exception
+    assert [m[0] for m in pending()] == [second, first]
+    assert at.button(key=f"move_up_{second}").disabled
+
+
+def test_batch_results_skip_unfilled_rows():
+    # template 은 불러올 때 config.yaml 을 읽으므로 앱 폴더로 옮긴 뒤에 불러옴
+    import template
+
+    first, second, third = [register(f"선수{i}", f"상대{i}") for i in range(3)]
+    edited = pd.DataFrame(
+        {
+            "ID": [first, second, third],
+            "점수1": [11, None, 7],
+            "점수2": [5, 3, 11],
+        }
+    )
+    assert template.batch_results(pending(), edited) == [
+        (first, 11, 5, 0),
+        (third, 7, 11, 0),
+    ]
+
+
+def test_batch_mode(run_page):
+    match_id = register()
+    at = run_page("court", admin=True)
+    at.toggle(key="batch_mode").set_value(True).run()
+    assert not at.exception
+    assert f"result_input_{match_id}" not in [button.key for button in at.button]
+    at.button(key="save_batch_results").click().run()
+    assert "입력된 결과가 없습니다." in [t.value for t in at.toast]
+    assert [m[0] for m in pending()] == [match_id]
+
+
+# 코트 페이지 콜드 스타트에 pandas 가 다시 들어오지 않게 (새 프로세스에서 확인)
+def test_template_does_not_load_pandas():
+    code = (
+        f"import sys; sys.path.insert(0, {ROOT!r}); import template; "
+        "print('pandas' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_live_finish_needs_points(run_page):
+    live_score.init_db()
+    match_id = register()
+    with pytest.raises(ValueError):
+        live_score.finish_live_match(match_id)
+    at = run_page("court", admin=True)
+    at.button(key=f"live_finish_{match_id}").click().run()
+    assert not at.exception
+    assert at.toast[0].value == "기록된 점수가 없어 경기를 종료할 수 없습니다."
+    assert [m[0] for m in pending()] == [match_id]
+
+
+def test_idle_court_estimates_start_from_now(seed_matches):
+    # 마지막 경기가 한참 전에 끝난 코트의 첫 대기 매치는 지금부터
+    seed_matches(3, pending=2)
+    now = time.time() + 3600
+    predictor = wait_time.WaitTimePredictor(match_store.DB_PATH)
+    estimates = predictor.estimate_court(TITLE, "중화", "A", now=now)
+    first, second = sorted(estimates.values())
+    assert first == now
+    assert second == now + predictor.expected_duration("예선", "새내기부")
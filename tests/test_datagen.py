@@ -0,0 +1,46 @@
+import sqlite3
+from datetime import date
+
+import datagen
+import match_store
+from conftest import CONFIG, TITLE
+
+
+def generate(path, seed):
+    datagen.generate(
+        CONFIG,
+        str(path),
+        tournaments=3,
+        matches=60,
+        groups=1,
+        group_matches=40,
+        pending=5,
+        seed=seed,
+        end_date=date(2024, 9, 29),
+    )
+    conn = sqlite3.connect(path)
+    rows = conn.execute("SELECT * FROM match_store ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+
+def test_same_seed_same_data(tmp_path):
+    first = generate(tmp_path / "a.sqlite", 7)
+    assert first == generate(tmp_path / "b.sqlite", 7)
+    assert first != generate(tmp_path / "c.sqlite", 8)
+
+
+def test_generated_matches(tmp_path):
+    rows = generate(tmp_path / "a.sqlite", 1)
+    assert len(rows) == 3 * 60 + 40
+    official = [row for row in rows if row[1] == match_store.OFFICIAL]
+    pending = [row for row in official if row[12] == "pending"]
+    assert len(pending) == 5
+    assert {row[2] for row in pending} == {TITLE}
+    assert {row[5] for row in official} == set(CONFIG["round_types"])
+    for row in official:
+        assert row[8] != row[9]
+        if row[12] == "finished":
+            assert max(row[10], row[11]) >= 11
+            assert abs(row[10] - row[11]) >= 2
+            assert row[13] <= row[14] < row[15]
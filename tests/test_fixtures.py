@@ -0,0 +1,61 @@
+from collections import Counter
+
+import fixtures
+
+
+def players(count):
+    return [f"선수{i}" for i in range(count)]
+
+
+def slots(plan):
+    by_slot = {}
+    for fixture in plan:
+        by_slot.setdefault(fixture["slot"], []).extend(
+            (fixture["player1"], fixture["player2"])
+        )
+    return by_slot
+
+
+def test_round_robin_plays_everyone_once():
+    for count in (2, 7, 10):
+        plan = fixtures.make_fixtures(players(count), fixtures.ROUND_ROBIN, 2, 0, 600)
+        pairs = [frozenset((f["player1"], f["player2"])) for f in plan]
+        assert len(pairs) == len(set(pairs)) == count * (count - 1) // 2
+
+
+def test_limited_rounds_balance_games():
+    plan = fixtures.make_fixtures(players(12), fixtures.ROUND_ROBIN, 3, 0, 600, rounds=4)
+    games = Counter()
+    for fixture in plan:
+        games.update((fixture["player1"], fixture["player2"]))
+    assert set(games.values()) == {4}
+
+
+def test_limited_rounds_balance_odd_roster():
+    for count, rounds, expected in ((5, 2, {2: 5}), (101, 5, {5: 100, 4: 1})):
+        plan = fixtures.make_fixtures(
+            players(count), fixtures.ROUND_ROBIN, 4, 0, 600, rounds=rounds
+        )
+        games = Counter()
+        for fixture in plan:
+            games.update((fixture["player1"], fixture["player2"]))
+        # 쉰 선수끼리의 보충 라운드 (인원과 라운드 수가 모두 홀수면 한 명은 한 경기 적음)
+        assert Counter(games.values()) == expected
+        pairs = [frozenset((f["player1"], f["player2"])) for f in plan]
+        assert len(pairs) == len(set(pairs))
+        assert max(f["round"] for f in plan) == rounds + 1
+
+
+def test_schedule_packs_courts_without_back_to_back():
+    plan = fixtures.make_fixtures(players(120), fixtures.ROUND_ROBIN, 4, 1000, 900)
+    by_slot = slots(plan)
+    for slot, slot_players in by_slot.items():
+        assert len(slot_players) == len(set(slot_players)) <= 8
+        assert not set(slot_players) & set(by_slot.get(slot + 1, []))
+    assert len(by_slot) == -(-len(plan) // 4)
+    assert plan[-1]["start_at"] == 1000 + (len(by_slot) - 1) * 900
+
+
+def test_swiss_first_round_pairs_halves():
+    plan = fixtures.make_fixtures(list("ABCDE"), fixtures.SWISS, 5, 0, 600)
+    assert [(f["player1"], f["player2"]) for f in plan] == [("A", "C"), ("B", "D")]
@@ -0,0 +1,95 @@
+import match_store
+from conftest import GROUP_NAME, click_in_dialog
+
+
+def pending():
+    return match_store.get_pending_matches(match_store.GROUP, GROUP_NAME)
+
+
+def register(player1="김", player2="이"):
+    return match_store.register_match(match_store.GROUP, GROUP_NAME, player1, player2)
+
+
+def test_viewer_sees_queue(run_page):
+    register()
+    at = run_page("group")
+    assert not at.exception
+    assert any("김" in md.value for md in at.markdown)
+    assert [button.key for button in at.button] == []
+
+
+def test_register_match(run_page):
+    at = run_page("group", admin=True)
+    at.text_input(key="input_player1").set_value("김")
+    at.text_input(key="input_player2").set_value("이")
+    at.button(key="register_match").click().run()
+    assert not at.exception
+    assert [(m[4], m[5]) for m in pending()] == [("김", "이")]
+
+
+def test_input_result(run_page):
+    match_id = register()
+    at = run_page("group", admin=True)
+    at.button(key=f"result_input_{match_id}").click().run()
+    at.number_input(key=f"score1_{match_id}").set_value(11)
+    at.number_input(key=f"score2_{match_id}").set_value(21)
+    click_in_dialog(at, f"result_input_{match_id}", f"save_result_{match_id}")
+    assert not at.exception
+    assert pending() == []
+    assert match_store.get_player_matches("이")[0][5:7] == (11, 21)
+
+
+def test_edit_match(run_page):
+    match_id = register()
+    at = run_page("group", admin=True)
+    at.button(key=f"update_input_{match_id}").click().run()
+    at.text_input(key=f"edit_player2_{match_id}").set_value("최")
+    click_in_dialog(at, f"update_input_{match_id}", f"edit_confirm_{match_id}")
+    assert not at.exception
+    assert match_store.get_match_info(match_id)["player2"] == "최"
+
+
+def test_delete_match(run_page):
+    match_id = register()
+    at = run_page("group", admin=True)
+    at.button(key=f"delete_match_{match_id}").click().run()
+    assert not at.exception
+    assert pending() == []
+
+
+def test_register_fixtures(run_page):
+    at = run_page("group", admin=True)
+    at.text_area(key="fixture_roster").set_value("김\n이\n박\n최")
+    at.number_input(key="fixture_courts").set_value(2)
+    at.button(key="fixture_preview").click().run()
+    assert not at.exception
+    assert len(at.session_state["fixture_plan"]) == 6
+
+    at.button(key="fixture_register").click().run()
+    assert not at.exception
+    queue = pending()
+    assert len(queue) == 6
+    assert [(m[4], m[5]) for m in queue[:2]] == [("김", "최"), ("이", "박")]
+    assert {m[1] for m in queue} == {"1라운드", "2라운드", "3라운드"}
+
+
+def test_swiss_next_round(run_page):
+    for player1, player2, score1, score2 in (
+        ("김", "이", 11, 3),
+        ("박", "최", 11, 5),
+    ):
+        match_store.input_result(register(player1, player2), score1, score2)
+    at = run_page("group", admin=True)
+    at.button(key="swiss_preview").click().run()
+    assert not at.exception
+    round_no, pairs, bye = at.session_state["swiss_plan"]
+    assert round_no == 2 and bye is None
+    # 승자끼리, 패자끼리 (이미 만난 상대는 피함)
+    assert {frozenset(pair) for pair in pairs} == {
+        frozenset(("김", "박")),
+        frozenset(("이", "최")),
+    }
+
+    at.button(key="swiss_register").click().run()
+    assert not at.exception
+    assert {m[1] for m in pending()} == {"스위스 2라운드"}
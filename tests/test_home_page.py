@@ -0,0 +1,15 @@
+def test_admin_mode_toggle(run_page):
+    at = run_page("home")
+    assert not at.exception
+    assert not at.session_state["admin_mode"]
+
+    at.text_input[0].set_value("wrong")
+    at.button[0].click().run()
+    assert not at.session_state["admin_mode"]
+
+    at.text_input[0].set_value("admin")
+    at.button[0].click().run()
+    assert at.session_state["admin_mode"]
+
+    at.button[0].click().run()
+    assert not at.session_state["admin_mode"]
@@ -0,0 +1,67 @@
+import sqlite3
+import threading
+import time
+
+import db_migrations
+import match_store
+
+
+# 이전 버전 DB: matches 테이블과 (아직 비어 있는) match_store
+def create_legacy_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute(match_store.MATCH_STORE_TABLE_SQL)
+    conn.execute(
+        """CREATE TABLE matches
+                 (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                  tournament_title TEXT, place TEXT, court TEXT,
+                  player1 TEXT, player2 TEXT, status TEXT, created_at INTEGER)"""
+    )
+    conn.execute(
+        """INSERT INTO matches
+                 (id, tournament_title, place, court, player1, player2, status, created_at)
+                 VALUES (5000, '옛 대회', '중화', 'A', '김', '이', 'pending', 1)"""
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_migration_waits_for_another_session(app_dir):
+    path = str(app_dir / "legacy.sqlite")
+    create_legacy_db(path)
+
+    # 먼저 잠금을 잡은 세션이 옮기는 동안 다른 세션은 확인을 마치고 잠금을 기다림
+    first = sqlite3.connect(path, isolation_level="")
+    first.execute("BEGIN IMMEDIATE")
+    results = []
+    errors = []
+
+    def second_session():
+        conn = sqlite3.connect(path, timeout=10, isolation_level="")
+        try:
+            results.append(db_migrations.migrate_to_match_store(conn))
+        except Exception as error:
+            errors.append(error)
+        finally:
+            conn.close()
+
+    thread = threading.Thread(target=second_session)
+    thread.start()
+    time.sleep(0.3)
+    first.execute(
+        """INSERT INTO match_store
+                 (id, event_type, event_name, place, court, player1, player2,
+                  status, created_at)
+                 SELECT id, 'official', tournament_title, place, court, player1,
+                        player2, status, created_at
+                 FROM matches"""
+    )
+    first.execute("DROP TABLE matches")
+    first.execute("COMMIT")
+    first.close()
+    thread.join()
+
+    assert errors == []
+    assert results == [False]
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM match_store").fetchone()[0] == 1
+    conn.close()
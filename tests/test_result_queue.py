@@ -0,0 +1,143 @@
+import sqlite3
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import change_log
+import match_store
+import result_queue
+from conftest import ROOT, TITLE, click_in_dialog
+
+
+def register(player1="김", player2="이"):
+    return match_store.register_match(
+        match_store.OFFICIAL, TITLE, player1, player2, place="중화", court="A"
+    )
+
+
+def result_changes(match_id):
+    return [c for c in change_log.list_changes(match_id) if c[4] == "result"]
+
+
+@pytest.fixture
+def batcher():
+    return result_queue.ResultBatcher(batch_wait=0.05)
+
+
+def test_same_key_is_applied_once():
+    match_id = register()
+    state = {}
+    entry = result_queue.queue_result(state, match_id, 11, 5, version=0)
+    # 서버에는 반영됐지만 응답을 받지 못한 경우
+    assert result_queue.apply_results([entry]) == {entry["key"]: result_queue.APPLIED}
+    assert result_queue.apply_results([entry, dict(entry)]) == {
+        entry["key"]: result_queue.APPLIED
+    }
+    assert match_store.get_match_info(match_id)["version"] == 1
+    assert len(result_changes(match_id)) == 1
+
+
+def test_stale_version_is_a_conflict(batcher):
+    match_id = register()
+    match_store.update_match(match_id, player1="박")
+    state = {}
+    result_queue.queue_result(state, match_id, 11, 5, version=0)
+    assert result_queue.sync(state, batcher) == {match_id: result_queue.CONFLICT}
+    assert result_queue.queued_results(state) == {}
+    assert result_changes(match_id) == []
+
+
+def test_failed_sync_keeps_results(monkeypatch, batcher):
+    match_id = register()
+    state = {}
+    result_queue.queue_result(state, match_id, 11, 5, version=0)
+
+    def locked(entries):
+        raise sqlite3.OperationalError("database is locked")
+
+    apply_results = result_queue.apply_results
+    monkeypatch.setattr(result_queue, "apply_results", locked)
+    with pytest.raises(sqlite3.OperationalError):
+        result_queue.sync(state, batcher)
+    assert result_queue.queued_results(state)[match_id]["attempts"] == 1
+
+    monkeypatch.setattr(result_queue, "apply_results", apply_results)
+    assert result_queue.sync(state, batcher) == {match_id: result_queue.APPLIED}
+    assert result_queue.queued_results(state) == {}
+
+
+def test_concurrent_submissions_share_transactions(batcher):
+    match_ids = [register(f"선수{i}", f"상대{i}") for i in range(40)]
+    outcomes = {}
+    barrier = threading.Barrier(len(match_ids))
+
+    def referee(match_id):
+        state = {}
+        result_queue.queue_result(state, match_id, 11, 3, version=0)
+        barrier.wait()
+        outcomes.update(result_queue.sync(state, batcher))
+
+    threads = [threading.Thread(target=referee, args=(m,)) for m in match_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert outcomes == {match_id: result_queue.APPLIED for match_id in match_ids}
+    assert batcher.batches < len(match_ids)
+    assert match_store.get_pending_matches(match_store.OFFICIAL, TITLE, "중화", "A") == []
+
+
+def test_court_page_keeps_unsaved_result(run_page, monkeypatch):
+    match_id = register()
+
+    def offline(entries):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(result_queue, "apply_results", offline)
+    at = run_page("court", admin=True)
+    at.button(key=f"result_input_{match_id}").click().run()
+    at.number_input(key=f"score1_{match_id}").set_value(11)
+    at.number_input(key=f"score2_{match_id}").set_value(9)
+    click_in_dialog(at, f"result_input_{match_id}", f"save_result_{match_id}")
+    assert not at.exception
+    assert any("저장하지 못한 결과 1건" in w.value for w in at.warning)
+    assert any("11 : 9 저장 대기 중" in c.value for c in at.caption)
+    assert match_store.get_match_info(match_id)["version"] == 0
+    assert at.session_state["result_queue"][match_id]["score1"] == 11
+
+
+def test_court_page_retries_queued_result(run_page, monkeypatch):
+    match_id = register()
+    state = {}
+    result_queue.queue_result(state, match_id, 11, 9, version=0)
+
+    def offline(entries):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    apply_results = result_queue.apply_results
+    monkeypatch.setattr(result_queue, "apply_results", offline)
+    at = run_page("court", admin=True, **state)
+    assert not at.exception
+    assert any("저장하지 못한 결과 1건" in w.value for w in at.warning)
+
+    monkeypatch.setattr(result_queue, "apply_results", apply_results)
+    at.button(key="retry_results").click().run()
+    assert not at.exception
+    assert match_store.get_player_matches("김")[0][5:7] == (11, 9)
+    assert at.session_state["result_queue"] == {}
+    assert not at.warning
+
+
+# 데이터 모듈은 CLI 스크립트(datagen, 샤드 나누기)에서도 쓰므로 Streamlit 을 불러오지 않음
+def test_data_modules_do_not_load_streamlit():
+    code = (
+        f"import sys; sys.path.insert(0, {ROOT!r}); "
+        "import datagen, match_store, result_queue, shards; "
+        "print('streamlit' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,102 @@
+import sqlite3
+
+import archive
+import datagen
+import match_store
+import search
+from conftest import CONFIG, TITLE, by_label
+
+
+def register(player1, player2, event_type=match_store.OFFICIAL, event_name=TITLE):
+    place = "중화" if event_type == match_store.OFFICIAL else None
+    return match_store.register_match(
+        event_type, event_name, player1, player2, place=place
+    )
+
+
+def check_index():
+    conn = sqlite3.connect(match_store.DB_PATH)
+    conn.execute("INSERT INTO match_search (match_search) VALUES ('integrity-check')")
+    conn.close()
+
+
+def test_partial_korean_names():
+    kim = register("김민수", "이영희")
+    park = register("박민수", "최지우", match_store.GROUP, "중화랭킹전")
+    assert search.search_ids("김민수") == [kim]
+    # 두 글자는 trigram 대신 LIKE 로 찾음
+    assert sorted(search.search_ids("민수")) == [kim, park]
+    assert search.search_ids("민수", event_type=match_store.GROUP) == [park]
+    # 여러 단어는 모두 들어 있어야 함 (대회명 + 선수)
+    assert search.search_ids("랭킹전 민수") == [park]
+    assert search.search_ids("중화", columns=search.PLAYER_COLUMNS) == []
+    assert search.search_ids('"%_') == []
+
+
+def test_ranked_by_relevance():
+    register("김민수", "이영희")
+    both = register("김민수", "김민수아")
+    assert search.search_ids("김민수")[0] == both
+
+
+def test_triggers_follow_legacy_views():
+    conn = sqlite3.connect(match_store.DB_PATH)
+    c = conn.cursor()
+    c.execute(
+        """INSERT INTO matches (tournament_title, place, court, player1, player2, status, created_at)
+                 VALUES (?, '중화', 'A', '김민수', '이영희', 'pending', 0)""",
+        (TITLE,),
+    )
+    match_id = c.execute("SELECT MAX(id) FROM match_store").fetchone()[0]
+    c.execute(
+        """INSERT INTO unofficial_group_matches (group_name, player1, player2, status, created_at)
+                 VALUES ('중화랭킹전', '정하늘', '이영희', 'pending', 0)"""
+    )
+    conn.commit()
+    assert search.search_ids("정하늘") != []
+
+    c.execute("UPDATE matches SET player1 = '최민수' WHERE id = ?", (match_id,))
+    c.execute("DELETE FROM unofficial_group_matches")
+    conn.commit()
+    conn.close()
+    assert search.search_ids("김민수") == []
+    assert search.search_ids("최민수") == [match_id]
+    assert search.search_ids("정하늘") == []
+    check_index()
+
+
+def test_archive_removes_from_index():
+    match_id = register("김민수", "이영희")
+    match_store.input_result(match_id, 11, 5)
+    archive.archive_tournament(TITLE)
+    assert search.search_ids("김민수") == []
+    check_index()
+
+
+def test_datagen_rebuilds_index():
+    datagen.generate(
+        CONFIG, match_store.DB_PATH, tournaments=2, matches=50, groups=1, group_matches=20
+    )
+    conn = sqlite3.connect(match_store.DB_PATH)
+    player = conn.execute("SELECT player1 FROM match_store LIMIT 1").fetchone()[0]
+    expected = conn.execute(
+        "SELECT COUNT(*) FROM match_store WHERE player1 LIKE ? OR player2 LIKE ?",
+        (f"%{player}%", f"%{player}%"),
+    ).fetchone()[0]
+    conn.close()
+    assert len(search.search_ids(player, columns=search.PLAYER_COLUMNS)) == expected
+    # 생성 뒤에도 트리거가 다시 살아 있어야 함
+    new_id = register("새선수", "이영희")
+    assert search.search_ids("새선수") == [new_id]
+    check_index()
+
+
+def test_admin_search(run_page):
+    register("김민수", "이영희")
+    register("박민수", "최지우", match_store.GROUP, "중화랭킹전")
+    at = run_page("admin", admin=True)
+    by_label(at.text_input, "선수 이름, 대회명, 장소").set_value("민수").run()
+    assert not at.exception
+    results = next(df.value for df in at.dataframe if "선수1" in df.value.columns)
+    assert set(results["선수1"]) == {"김민수", "박민수"}
+    assert "match_search" not in by_label(at.selectbox, "테이블 선택").options
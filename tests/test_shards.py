@@ -0,0 +1,187 @@
+import os
+import sqlite3
+import threading
+
+import pytest
+
+import backup
+import change_log
+import live_score
+import match_store
+import search
+import shards
+from conftest import GROUP_NAME, TITLE, click_in_dialog
+
+OTHER_TITLE = "다른 대회"
+
+
+def register(title=TITLE, player1="김민수", player2="이영희"):
+    return match_store.register_match(
+        match_store.OFFICIAL, title, player1, player2, place="중화", court="A"
+    )
+
+
+def count_rows(path, event_name):
+    conn = sqlite3.connect(path)
+    count = conn.execute(
+        "SELECT COUNT(*) FROM match_store WHERE event_name = ?", (event_name,)
+    ).fetchone()[0]
+    conn.close()
+    return count
+
+
+def test_events_get_their_own_files(sharded):
+    first = register()
+    other = register(OTHER_TITLE)
+    group = match_store.register_match(match_store.GROUP, GROUP_NAME, "박", "최")
+
+    paths = {shards.match_path(match_id) for match_id in (first, other, group)}
+    assert len(paths) == 3
+    assert all(os.path.exists(path) for path in paths)
+    assert all(match_id >= shards.ID_SPAN for match_id in (first, other, group))
+    assert count_rows(match_store.DB_PATH, TITLE) == 0
+    assert count_rows(shards.event_path(match_store.OFFICIAL, TITLE), TITLE) == 1
+
+    # id 만 받는 쓰기도 해당 샤드로 감
+    assert match_store.update_match(first, player2="이수정")
+    assert match_store.input_result(first, 11, 5)
+    pending = match_store.get_pending_matches(match_store.OFFICIAL, OTHER_TITLE, "중화", "A")
+    assert [match[0] for match in pending] == [other]
+    assert match_store.get_pending_matches(match_store.OFFICIAL, TITLE, "중화", "A") == []
+    assert [change[4] for change in change_log.list_changes(first)] == [
+        "result",
+        "update",
+        "insert",
+    ]
+    assert match_store.delete_match(group)
+
+
+def test_existing_rows_move_into_new_shard(app_dir):
+    legacy = register()
+    match_store.input_result(legacy, 11, 7)
+    live_score.init_db()
+    pending = register()
+    live_score.add_point(pending, 1)
+
+    with open("config.yaml", "a") as file:
+        file.write("sharding: true\n")
+    shards.reset()
+    register()
+
+    shard_id = shards.shard_id(match_store.OFFICIAL, TITLE)
+    offset = shard_id * shards.ID_SPAN
+    assert count_rows(match_store.DB_PATH, TITLE) == 0
+    assert match_store.get_match_info(legacy + offset)["player1"] == "김민수"
+    assert [change[4] for change in change_log.list_changes(legacy + offset)] == [
+        "result",
+        "insert",
+    ]
+    assert live_score.get_live_score(pending + offset) == (1, 0)
+    assert len(search.search_ids("김민수")) == 3
+    # 새 id 는 옮긴 id 뒤에서 이어짐
+    assert max(search.search_ids("김민수")) > pending + offset
+
+
+def test_player_record_fans_out(sharded):
+    for title, score in ((TITLE, 5), (OTHER_TITLE, 11)):
+        match_id = register(title)
+        match_store.input_result(match_id, 11, score)
+    match_store.register_match(match_store.GROUP, GROUP_NAME, "김민수", "박")
+
+    matches = match_store.get_player_matches("김민수")
+    assert [m[2] for m in matches] == [GROUP_NAME, TITLE, OTHER_TITLE]
+    assert search.search_ids("김민수", status="finished") != []
+    assert len(search.search_ids("김민수")) == 3
+
+
+def test_pool_is_bounded(tmp_path):
+    paths = []
+    for i in range(4):
+        path = str(tmp_path / f"{i}.sqlite")
+        sqlite3.connect(path).close()
+        paths.append(path)
+    pool = shards.ShardPool(max_open=2)
+    for path in paths:
+        with pool.connection(path):
+            pass
+    assert pool.open_count == 2
+
+    # 두 연결이 모두 사용 중이면 반납될 때까지 기다림
+    held = [pool.acquire(paths[0]), pool.acquire(paths[1])]
+    acquired = threading.Event()
+
+    def worker():
+        with pool.connection(paths[2]):
+            acquired.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    assert not acquired.wait(0.2)
+    pool.release(paths[0], held[0])
+    assert acquired.wait(5)
+    thread.join()
+    pool.release(paths[1], held[1])
+    assert pool.open_count == 2
+    pool.close()
+    assert pool.open_count == 0
+
+
+def test_fan_out_propagates_errors(sharded):
+    register()
+    with pytest.raises(sqlite3.OperationalError):
+        shards.fan_out("SELECT * FROM missing_table")
+
+
+def test_stats_page_reads_all_shards(sharded, run_page):
+    for title in (TITLE, OTHER_TITLE):
+        match_store.input_result(register(title), 11, 3)
+    at = run_page("stats")
+    assert not at.exception
+    assert set(at.dataframe[0].value["tournament_title"]) == {TITLE, OTHER_TITLE}
+
+
+def test_analytics_page_reads_all_shards(sharded, run_page):
+    match_store.input_result(register(TITLE, "김", "이"), 11, 3)
+    match_store.input_result(register(OTHER_TITLE, "박", "최"), 11, 9)
+    at = run_page("analytics")
+    assert not at.exception
+    assert set(at.multiselect[0].options) == {"김", "이", "박", "최"}
+
+
+def test_court_page_on_shard(sharded, run_page):
+    match_id = register()
+    at = run_page("court", admin=True)
+    assert not at.exception
+    at.button(key=f"result_input_{match_id}").click().run()
+    at.number_input(key=f"score1_{match_id}").set_value(11)
+    at.number_input(key=f"score2_{match_id}").set_value(4)
+    click_in_dialog(at, f"result_input_{match_id}", f"save_result_{match_id}")
+    assert not at.exception
+    assert match_store.get_player_matches("김민수")[0][8] == "finished"
+
+
+def test_backup_and_restore_cover_all_shards(sharded):
+    first = register()
+    name = backup.create_backup("manual")
+    assert backup.list_backups()[0]["shards"] == 1
+
+    # 백업 뒤: 기존 샤드의 결과 입력 + 새 대회 샤드
+    match_store.input_result(first, 11, 3)
+    later = register(OTHER_TITLE)
+    later_path = shards.match_path(later)
+
+    backup.restore_backup(name)
+    assert match_store.get_match_info(first)["version"] == 0
+    pending = match_store.get_pending_matches(match_store.OFFICIAL, TITLE, "중화", "A")
+    assert [match[0] for match in pending] == [first]
+    assert not os.path.exists(later_path)
+    assert shards.all_paths(match_store.OFFICIAL)[-1] == shards.match_path(first)
+
+    # 복원 직전 백업으로 되돌리면 새 대회 샤드도 돌아옴
+    before_restore = next(
+        b for b in backup.list_backups() if b["reason"] == "before-restore"
+    )
+    assert before_restore["shards"] == 2
+    backup.restore_backup(before_restore["name"])
+    assert match_store.get_match_info(first)["version"] == 1
+    assert match_store.get_match_info(later)["player1"] == "김민수"
@@ -0,0 +1,43 @@
+import match_store
+from conftest import by_label
+
+
+def test_empty_database(run_page):
+    at = run_page("stats")
+    assert not at.exception
+
+
+def test_filter_by_player(run_page, seed_matches):
+    seed_matches(30)
+    at = run_page("stats")
+    assert not at.exception
+    assert len(at.dataframe[0].value) == 30
+
+    by_label(at.text_input, "선수 이름 검색").set_value("선수3")
+    by_label(at.button, "검색").click().run()
+    filtered = at.dataframe[0].value
+    assert len(filtered) > 0
+    assert all(
+        "선수3" in row.player1 or "선수3" in row.player2
+        for row in filtered.itertuples()
+    )
+
+
+def test_filter_by_court(run_page, seed_matches):
+    seed_matches(30)
+    at = run_page("stats")
+    by_label(at.selectbox, "코트").set_value("B")
+    by_label(at.button, "검색").click().run()
+    assert set(at.dataframe[0].value["court"]) == {"B"}
+    assert len(at.dataframe[0].value) == 10
+
+
+def test_player_record(run_page):
+    for score1, score2 in ((21, 10), (5, 21)):
+        match_id = match_store.register_match(match_store.GROUP, "중화랭킹전", "김", "이")
+        match_store.input_result(match_id, score1, score2)
+    at = run_page("stats")
+    at.text_input(key="record_player").set_value("김").run()
+    assert not at.exception
+    metrics = {metric.label: metric.value for metric in at.metric}
+    assert metrics == {"경기 수": "2", "승": "1", "패": "1"}
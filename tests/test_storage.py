@@ -0,0 +1,224 @@
+import os
+import sqlite3
+
+import pandas as pd
+import pytest
+import yaml
+
+import backup
+import change_log
+import live_score
+import match_store
+import result_queue
+import search
+import shards
+import storage
+from conftest import CONFIG, TITLE, by_label
+
+# PostgreSQL 테스트 서버: SQUASH_TEST_POSTGRES_DSN 이 있으면 그 서버(테이블을 지우고 다시 만듦),
+# 없으면 pgserver 로 임시 폴더에 내장 PostgreSQL 을 띄움 (requirements-dev.txt)
+# SQUASH_TEST_POSTGRES_DSN=postgresql://postgres@localhost/squash_test python -m pytest
+POSTGRES_DSN = os.environ.get("SQUASH_TEST_POSTGRES_DSN")
+
+
+def write_config(app_dir, **extra):
+    with open(app_dir / "config.yaml", "w") as file:
+        yaml.safe_dump({**CONFIG, **extra}, file, allow_unicode=True)
+    storage.reset()
+    shards.reset()
+
+
+@pytest.fixture(scope="session")
+def postgres_dsn(tmp_path_factory):
+    pytest.importorskip("psycopg")
+    if POSTGRES_DSN:
+        yield POSTGRES_DSN
+        return
+    pgserver = pytest.importorskip("pgserver")
+    server = pgserver.get_server(tmp_path_factory.mktemp("pgdata"), cleanup_mode="stop")
+    yield server.get_uri()
+    server.cleanup()
+
+
+@pytest.fixture
+def postgres(app_dir, postgres_dsn):
+    write_config(
+        app_dir,
+        storage={"backend": "postgres", "dsn": postgres_dsn, "pool_size": 4},
+    )
+    conn = storage.connect()
+    conn.execute("DROP VIEW IF EXISTS matches, unofficial_group_matches")
+    conn.execute(
+        """DROP TABLE IF EXISTS match_store, change_log, applied_results,
+                 score_events, score_snapshots"""
+    )
+    conn.close()
+    match_store.init_db()
+    yield app_dir
+    storage.reset()
+
+
+def register(player1="김", player2="이", place="중화"):
+    return match_store.register_match(
+        match_store.OFFICIAL, TITLE, player1, player2, place=place, court="A"
+    )
+
+
+def test_sql_is_translated_for_postgres():
+    assert storage.to_postgres("BEGIN IMMEDIATE") == "BEGIN"
+    assert storage.to_postgres("WHERE place IS ? AND player1 IS NOT ?") == (
+        "WHERE place IS NOT DISTINCT FROM %s AND player1 IS DISTINCT FROM %s"
+    )
+    assert storage.to_postgres("ON prev.court IS m.court") == (
+        "ON prev.court IS NOT DISTINCT FROM m.court"
+    )
+    assert storage.to_postgres("WHERE a IS NULL AND b IS NOT NULL") == (
+        "WHERE a IS NULL AND b IS NOT NULL"
+    )
+    assert storage.to_postgres("SELECT 'a?b', name LIKE 'x%' AND name LIKE ?") == (
+        "SELECT 'a?b', name LIKE 'x%%' AND name LIKE %s"
+    )
+
+
+def test_unknown_backend_is_rejected(app_dir):
+    write_config(app_dir, storage={"backend": "mysql"})
+    with pytest.raises(ValueError):
+        storage.connect()
+
+
+def test_read_frame_streams_in_chunks(seed_matches):
+    seed_matches(23)
+    sql = "SELECT * FROM matches WHERE status = 'finished' ORDER BY id"
+    conn = sqlite3.connect(match_store.DB_PATH)
+    expected = pd.read_sql_query(sql, conn)
+    conn.close()
+
+    conn = storage.connect()
+    sizes = [len(rows) for _, rows in storage.stream(conn, sql, chunk_size=5)]
+    conn.close()
+    assert sizes == [5, 5, 5, 5, 3]
+    pd.testing.assert_frame_equal(storage.read_frame(sql, chunk_size=5), expected)
+
+    empty = storage.read_frame("SELECT * FROM matches WHERE id < ?", (0,))
+    assert empty.empty
+    assert list(empty.columns) == list(expected.columns)
+
+
+def test_modules_keep_their_own_db_path(app_dir, monkeypatch):
+    match_id = register()
+    assert search.search_ids("김") == [match_id]
+    # 벤치마크처럼 모듈의 DB_PATH 를 다른 파일로 바꾸면 그 파일을 씀
+    other = str(app_dir / "other.sqlite")
+    match_store.init_db(other)
+    monkeypatch.setattr(search, "DB_PATH", other)
+    assert search.search_ids("김") == []
+    monkeypatch.setattr(live_score, "DB_PATH", other)
+    live_score.init_db()
+    live_score.add_point(match_id, 1)
+    conn = sqlite3.connect(other)
+    assert conn.execute("SELECT COUNT(*) FROM score_events").fetchone() == (1,)
+    conn.close()
+
+
+def test_admin_page_quotes_table_names(run_page):
+    table = 'scores "2024"'
+    conn = sqlite3.connect(match_store.DB_PATH)
+    conn.execute(
+        f"CREATE TABLE {storage.quote_identifier(table)} (id INTEGER PRIMARY KEY, value TEXT)"
+    )
+    conn.executemany(
+        f"INSERT INTO {storage.quote_identifier(table)} (value) VALUES (?)",
+        [("a",), ("b",)],
+    )
+    conn.commit()
+    conn.close()
+
+    at = run_page("admin", admin=True)
+    by_label(at.selectbox, "테이블 선택").set_value(table).run()
+    assert not at.exception
+    assert at.dataframe[0].value["value"].tolist() == ["a", "b"]
+    by_label(at.number_input, "삭제할 데이터의 ID를 입력하세요").set_value(1).run()
+    at.checkbox[0].check().run()
+    at.button(key="delete_by_id").click().run()
+    assert not at.exception
+    conn = storage.connect()
+    assert storage.primary_key(conn, table) == "id"
+    assert conn.execute(
+        f"SELECT value FROM {storage.quote_identifier(table)}"
+    ).fetchall() == [("b",)]
+    conn.close()
+
+
+def test_backup_scheduler_skips_postgres(postgres, monkeypatch):
+    monkeypatch.setattr(backup, "_scheduler_started", False)
+    assert backup.start_scheduler() is False
+    assert backup._scheduler_started is False
+
+
+def test_postgres_match_lifecycle(postgres):
+    first = register()
+    second = register("박", "최", place=None)
+    pending = match_store.get_pending_matches(match_store.OFFICIAL, TITLE, "중화", "A")
+    assert [match[0] for match in pending] == [first]
+    # place 가 NULL 인 대기열
+    pending = match_store.get_pending_matches(match_store.OFFICIAL, TITLE, None, "A")
+    assert [match[0] for match in pending] == [second]
+
+    assert not match_store.update_match(first, version=5, player1="김민수")
+    assert match_store.update_match(first, version=0, player1="김민수")
+    assert match_store.input_result(first, 11, 7, version=1)
+    assert match_store.get_player_matches("김민수")[0][5:9] == (11, 7, "이", "finished")
+    assert [change[4] for change in change_log.list_changes(first)] == [
+        "result",
+        "update",
+        "insert",
+    ]
+    assert change_log.get_match_state_at(first, 0) is None
+    assert search.search_ids("김민") == [first]
+
+
+def test_postgres_live_score_and_result_queue(postgres):
+    match_id = register()
+    live_score.init_db()
+    for _ in range(live_score.SNAPSHOT_INTERVAL + 2):
+        live_score.add_point(match_id, 1)
+    live_score.add_point(match_id, 2)
+    assert live_score.get_live_score(match_id) == (live_score.SNAPSHOT_INTERVAL + 2, 1)
+    assert live_score.finish_live_match(match_id) == (live_score.SNAPSHOT_INTERVAL + 2, 1)
+
+    other = register("박", "최")
+    state = {}
+    entry = result_queue.queue_result(state, other, 11, 3, version=0)
+    assert result_queue.apply_results([entry, dict(entry)]) == {
+        entry["key"]: result_queue.APPLIED
+    }
+    assert match_store.get_match_info(other)["version"] == 1
+
+
+def test_postgres_schema_runs_once_per_process(postgres, monkeypatch):
+    # 페이지가 다시 실행될 때마다 부르는 init_db 는 DDL 을 다시 돌리지 않음
+    monkeypatch.setattr(storage, "POSTGRES_SCHEMA_SQL", ["SELECT 1 / 0"])
+    match_store.init_db()
+    live_score.init_db()
+    storage.reset()
+    with pytest.raises(Exception):
+        match_store.init_db()
+
+
+def test_postgres_pages(postgres, run_page):
+    for i in range(3):
+        match_store.input_result(register(f"선수{i}", f"상대{i}"), 11, i)
+    pending = register()
+
+    at = run_page("stats")
+    assert not at.exception
+    assert len(at.dataframe[0].value) == 3
+
+    at = run_page("court", admin=True)
+    assert not at.exception
+    assert at.button(key=f"result_input_{pending}")
+
+    at = run_page("admin", admin=True)
+    assert not at.exception
+    assert "match_store" in by_label(at.selectbox, "테이블 선택").options
+    assert any("pg_dump" in info.value for info in at.info)
@@ -0,0 +1,69 @@
+import random
+import sqlite3
+
+import match_store
+import swiss
+
+GROUP = "스위스 테스트"
+
+
+def play_round(pairing, players, rng):
+    pairs, bye = pairing.next_round(players)
+    match_ids = match_store.register_matches(
+        match_store.GROUP,
+        GROUP,
+        [{"player1": player1, "player2": player2} for player1, player2 in pairs],
+    )
+    for match_id in match_ids:
+        if rng.random() < 0.5:
+            match_store.input_result(match_id, 11, rng.randint(0, 9))
+        else:
+            match_store.input_result(match_id, rng.randint(0, 9), 11)
+    return pairs, bye
+
+
+def test_incremental_standings_match_rebuild():
+    rng = random.Random(3)
+    players = [f"선수{i}" for i in range(41)]
+    pairing = swiss.SwissPairing(GROUP, match_store.DB_PATH)
+    byes = []
+    seen = set()
+    for _ in range(6):
+        pairs, bye = play_round(pairing, players, rng)
+        byes.append(bye)
+        assert len(pairs) == 20
+        for pair in pairs:
+            assert frozenset(pair) not in seen
+            seen.add(frozenset(pair))
+    assert len(set(byes)) == 6
+
+    fresh = swiss.SwissPairing(GROUP, match_store.DB_PATH)
+    assert pairing.standings() == fresh.standings()
+
+
+def test_result_edit_rebuilds_standings():
+    pairing = swiss.SwissPairing(GROUP, match_store.DB_PATH)
+    match_id = match_store.register_matches(
+        match_store.GROUP, GROUP, [{"player1": "김", "player2": "이"}]
+    )[0]
+    match_store.input_result(match_id, 11, 2)
+    assert pairing.standings()[0][:3] == ("김", 1, 1)
+
+    # 관리자 페이지에서 결과를 뒤집으면 전체를 다시 읽음
+    conn = sqlite3.connect(match_store.DB_PATH)
+    conn.execute(
+        "UPDATE match_store SET score1 = 2, score2 = 11, version = version + 1 WHERE id = ?",
+        (match_id,),
+    )
+    conn.commit()
+    conn.close()
+    assert pairing.standings()[0][:3] == ("이", 1, 1)
+
+
+def test_next_round_does_not_add_checked_in_players():
+    pairing = swiss.SwissPairing(GROUP, match_store.DB_PATH)
+    pairs, bye = pairing.next_round(["김", "이", "박"])
+    assert len(pairs) == 1 and bye is not None
+    # 대진만 만들고 등록하지 않았으면 순위표에 아무도 없음
+    assert pairing.standings() == []
+    assert pairing.round_number(["김"]) == 1
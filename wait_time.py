@@ -0,0 +1,152 @@
+### 대기 시간 예측 및 선수별 다음 경기 찾기
+
+# 모든 접속자가 하나의 예측기를 공유한다 (template 에서 st.cache_resource 로 보관).
+# 다른 연결의 커밋은 PRAGMA data_version (PostgreSQL 은 change_log) 으로 감지하고,
+# 바뀐 경우에만 새로 끝난 매치의 경기 시간과 대기열을 다시 읽는다.
+
+import os
+import threading
+import storage
+import time
+
+# 데이터베이스 설정
+DB_FOLDER = "db"
+DB_FILE = "db.sqlite"
+DB_PATH = os.path.join(DB_FOLDER, DB_FILE)
+
+# 기록이 전혀 없을 때 사용하는 기본 경기 시간 (초)
+DEFAULT_DURATION = 20 * 60
+
+
+def normalize_name(name):
+    return name.strip().casefold()
+
+
+class WaitTimePredictor:
+    def __init__(self, db_path=DB_PATH):
+        self.conn = storage.connect_shared(db_path)
+        self.lock = threading.Lock()
+        self.data_version = None
+        # (finished_at, id) 기준으로 어디까지 읽었는지
+        self.watermark = (0, 0)
+        # (round_type, match_type) / round_type / 전체 -> [경기 수, 총 시간]
+        self.duration_stats = {}
+        # (tournament_title, place, court) -> 마지막 종료 시각
+        self.court_last_finished = {}
+        # (tournament_title, place, court) -> 대기 매치 목록 (get_pending_matches 순서)
+        self.queues = {}
+        # 선수 이름 -> [(코트, 대기열 위치)]
+        self.player_index = {}
+
+    def _add_duration(self, key, seconds):
+        stats = self.duration_stats.setdefault(key, [0, 0])
+        stats[0] += 1
+        stats[1] += seconds
+
+    # 새로 끝난 매치만 읽어서 통계에 더함
+    def _load_new_results(self):
+        finished_at, last_id = self.watermark
+        c = self.conn.cursor()
+        c.execute(
+            """SELECT id, tournament_title, place, court, round_type, match_type,
+                      started_at, finished_at
+                     FROM matches
+                     WHERE status = 'finished' AND finished_at IS NOT NULL
+                       AND (finished_at > ? OR (finished_at = ? AND id > ?))
+                     ORDER BY finished_at, id""",
+            (finished_at, finished_at, last_id),
+        )
+        for row in c.fetchall():
+            match_id, title, place, court, round_type, match_type = row[:6]
+            started_at, finished_at = row[6:]
+            court_key = (title, place, court)
+            self.court_last_finished[court_key] = max(
+                finished_at, self.court_last_finished.get(court_key, 0)
+            )
+            if started_at is not None and finished_at > started_at:
+                seconds = finished_at - started_at
+                self._add_duration((round_type, match_type), seconds)
+                self._add_duration(round_type, seconds)
+                self._add_duration(None, seconds)
+            self.watermark = (finished_at, match_id)
+
+    # 대기열과 선수 색인 재구성 (대기 매치만 읽으므로 작음)
+    def _load_queues(self):
+        c = self.conn.cursor()
+        c.execute(
+            """SELECT id, event_name, place, court, round_type, match_type,
+                      player1, player2
+                     FROM match_store
+                     WHERE event_type = 'official' AND status = 'pending'
+                     ORDER BY queue_position, created_at, id"""
+        )
+        queues = {}
+        player_index = {}
+        for row in c.fetchall():
+            match_id, title, place, court, round_type, match_type, p1, p2 = row
+            court_key = (title, place, court)
+            queue = queues.setdefault(court_key, [])
+            for player in (p1, p2):
+                if player:
+                    player_index.setdefault(normalize_name(player), []).append(
+                        (court_key, len(queue))
+                    )
+            queue.append((match_id, round_type, match_type, p1, p2))
+        self.queues = queues
+        self.player_index = player_index
+
+    def refresh(self):
+        with self.lock:
+            c = self.conn.cursor()
+            data_version = storage.data_version(c)
+            if data_version == self.data_version:
+                return
+            self._load_new_results()
+            self._load_queues()
+            self.data_version = data_version
+
+    def expected_duration(self, round_type, match_type):
+        for key in ((round_type, match_type), round_type, None):
+            stats = self.duration_stats.get(key)
+            if stats:
+                return stats[1] / stats[0]
+        return DEFAULT_DURATION
+
+    # 코트 대기열의 매치별 예상 시작 시각 (epoch 초)
+    def estimate_court(self, tournament_title, place, court, now=None):
+        self.refresh()
+        now = now or time.time()
+        court_key = (tournament_title, place, court)
+        queue = self.queues.get(court_key, [])
+        # 코트가 비는 시각(마지막 종료 시각과 지금 중 늦은 쪽)부터 차례로 진행
+        start = max(now, self.court_last_finished.get(court_key, now))
+        estimates = {}
+        for match_id, round_type, match_type, _, _ in queue:
+            estimates[match_id] = start
+            start += self.expected_duration(round_type, match_type)
+        return estimates
+
+    # 선수 이름으로 모든 코트에서 다음 경기 찾기
+    def find_next_matches(self, player_name, now=None):
+        self.refresh()
+        results = []
+        for court_key, position in self.player_index.get(
+            normalize_name(player_name), []
+        ):
+            match_id, round_type, match_type, p1, p2 = self.queues[court_key][position]
+            estimates = self.estimate_court(*court_key, now=now)
+            results.append(
+                {
+                    "match_id": match_id,
+                    "tournament_title": court_key[0],
+                    "place": court_key[1],
+                    "court": court_key[2],
+                    "position": position + 1,
+                    "round_type": round_type,
+                    "match_type": match_type,
+                    "player1": p1,
+                    "player2": p2,
+                    "expected_start": estimates[match_id],
+                }
+            )
+        return sorted(results, key=lambda result: result["expected_start"])